@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmarks
+Author: Prakhar Madnani
+Micro-benchmarks for the CPU-bound parts of the enrichment pipeline
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+import contact_scanner
+import keyword_matcher
+from keyword_matcher import KEYWORDS, KeywordMatcher
+from parsed_page import ParsedPage, PARSER_BACKENDS
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data', 'html_corpus')
+
+
+def load_corpus():
+    """Corpus pages plus one large synthetic page built from them"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages[os.path.basename(path)] = f.read()
+    sections = ''.join(
+        f'<section id="s{i}"><h2>Section {i}</h2><p>Our software platform helps teams automate billing. '
+        f'Call 415-555-{i % 10000:04d}.</p><a href="/p/{i}">Read more</a></section>'
+        for i in range(3000)
+    )
+    pages['synthetic_large.html'] = f'<html><head><title>Large</title></head><body>{sections}</body></html>'
+    return pages
+
+
+def bench_parsers(repeat: int):
+    """Time a full parse plus every ParsedPage view per backend"""
+    pages = load_corpus()
+    total_kb = sum(len(html) for html in pages.values()) / 1024
+    print(f"Parser backends over {len(pages)} pages ({total_kb:.0f} KB), best of {repeat}\n")
+    print(f"{'page':<24}" + ''.join(f"{backend:>14}" for backend in PARSER_BACKENDS))
+
+    totals = dict.fromkeys(PARSER_BACKENDS, 0.0)
+    for name, html in pages.items():
+        row = f"{name:<24}"
+        for backend in PARSER_BACKENDS:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                page = ParsedPage(html, backend=backend)
+                page.title, page.meta, page.visible_text, page.anchors, page.json_ld
+                best = min(best, time.perf_counter() - start)
+            totals[backend] += best
+            row += f"{best * 1000:>12.2f}ms"
+        print(row)
+
+    baseline = totals[PARSER_BACKENDS[-1]]
+    print(f"\n{'total':<24}" + ''.join(f"{totals[b] * 1000:>12.2f}ms" for b in PARSER_BACKENDS))
+    print(f"{'speedup':<24}" + ''.join(f"{baseline / totals[b]:>13.1f}x" for b in PARSER_BACKENDS))
+
+
+def _best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_keywords(repeat: int):
+    """Per-keyword str.count scans versus one automaton pass and the str.find fallback, for two table sizes"""
+    text_lower = ' '.join(ParsedPage(html).text_lower for html in load_corpus().values())
+    rng = random.Random(7)
+    synthetic = {''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+                 for _ in range(3000)}
+    print(f"Keyword counting over {len(text_lower) / 1024:.0f} KB of visible text, best of {repeat}\n")
+    print(f"{'table':<28}{'terms':>8}{'str.count':>14}{'automaton':>14}{'fallback':>14}")
+
+    for name, terms in (('shipped config', KEYWORDS.matcher.terms), ('synthetic', sorted(synthetic))):
+        naive = _best_time(lambda: {term: text_lower.count(term) for term in terms}, repeat)
+        matcher = KeywordMatcher(terms)
+        native = _best_time(lambda: matcher.count(text_lower), repeat)
+        available = keyword_matcher.AHOCORASICK_AVAILABLE
+        keyword_matcher.AHOCORASICK_AVAILABLE = False
+        try:
+            fallback_matcher = KeywordMatcher(terms)
+        finally:
+            keyword_matcher.AHOCORASICK_AVAILABLE = available
+        fallback = _best_time(lambda: fallback_matcher.count(text_lower), repeat)
+        print(f"{name:<28}{len(terms):>8}{naive * 1000:>12.2f}ms{native * 1000:>12.2f}ms{fallback * 1000:>12.2f}ms")
+
+
+# Verbatim copies of the original LeadEnricher._extract_emails (minus the validation both versions share),
+# _extract_phones and _extract_linkedin, run on the same raw HTML and BeautifulSoup tree they were given
+def _baseline_emails(soup, text):
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails = re.findall(email_pattern, text)
+    return emails
+
+
+def _baseline_phones(text):
+    phone_patterns = [
+        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+        r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b',
+        r'\b\+\d{1,3}[-.]?\d{3,4}[-.]?\d{3,4}[-.]?\d{3,4}\b'
+    ]
+
+    phones = []
+    for pattern in phone_patterns:
+        phones.extend(re.findall(pattern, text))
+        if len(phones) >= 2:
+            break
+
+    return list(set(phones))[:2]
+
+
+def _baseline_linkedin(soup, domain):
+    linkedin_patterns = [
+        r'linkedin\.com/company/[^"\s]+',
+        r'linkedin\.com/in/[^"\s]+',
+        r'www\.linkedin\.com/company/[^"\s]+'
+    ]
+
+    all_links = soup.find_all('a', href=True)
+    for link in all_links:
+        href = link.get('href', '')
+        for pattern in linkedin_patterns:
+            match = re.search(pattern, href)
+            if match:
+                return f"https://{match.group(0)}" if not match.group(0).startswith('http') else match.group(0)
+
+    page_text = soup.get_text()
+    for pattern in linkedin_patterns:
+        match = re.search(pattern, page_text)
+        if match:
+            return f"https://{match.group(0)}"
+
+    return ''
+
+
+def _baseline_contacts(soup, html):
+    return _baseline_emails(soup, html), _baseline_phones(html), _baseline_linkedin(soup, '')
+
+
+def bench_contacts(repeat: int):
+    """The original email, phone and LinkedIn extractors versus the single-pass contact scanner, per page.
+
+    Both sides get their input already parsed (a BeautifulSoup tree for the original
+    code, a ParsedPage for the scanner), so only contact extraction is timed.
+    """
+    pages = load_corpus()
+    links = ''.join(f'<a href="https://partner{i}.example.com/p/{i}">Partner {i}</a>' for i in range(3000))
+    pages['synthetic_links.html'] = f'<html><body><p>Partners</p>{links}</body></html>'
+    # A minified token or data blob in visible text made the old email pattern quadratic
+    pages['synthetic_token.html'] = f'<html><body><p>Build {"v1.a-" * 4000}</p></body></html>'
+    print(f"Contact extraction, best of {repeat}\n")
+    print(f"{'page':<24}{'size':>8}{'original':>14}{'scanner':>14}{'speedup':>10}")
+
+    for name, html in pages.items():
+        soup = BeautifulSoup(html, 'html.parser')
+        page = ParsedPage(html)
+        page.visible_text, page.hrefs, page.json_ld
+        original = _best_time(lambda: _baseline_contacts(soup, html), repeat)
+        scanner = _best_time(lambda: contact_scanner.scan_page(page), repeat)
+        print(f"{name:<24}{len(html) // 1024:>6}KB{original * 1000:>12.2f}ms{scanner * 1000:>12.2f}ms"
+              f"{original / scanner:>9.1f}x")
+
+
+BENCHMARKS = {
+    'parsers': bench_parsers,
+    'keywords': bench_keywords,
+    'contacts': bench_contacts
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmark', nargs='?', choices=sorted(BENCHMARKS), default='parsers')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Playwright Browser Pool
+Author: Prakhar Madnani
+Long-lived Chromium browsers that hand out fresh, isolated contexts per domain
+"""
+
+import asyncio
+import atexit
+import sys
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+DEFAULT_LAUNCH_ARGS = ['--no-sandbox', '--disable-dev-shm-usage']
+DEFAULT_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+DEFAULT_BROWSERS = 1
+DEFAULT_MAX_PAGES_PER_BROWSER = 100
+
+# Extraction only reads text, anchors and script[src], so these never need to load
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+DEFAULT_BLOCKED_HOSTS = frozenset({
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'googleadservices.com', 'facebook.net',
+    'connect.facebook.net', 'hotjar.com', 'segment.com', 'segment.io',
+    'mixpanel.com', 'fullstory.com', 'clarity.ms', 'bat.bing.com',
+    'ads.linkedin.com', 'snap.licdn.com', 'adservice.google.com',
+    'hs-analytics.net', 'hs-banner.com', 'quantserve.com', 'scorecardresearch.com',
+    'taboola.com', 'outbrain.com', 'criteo.com', 'adroll.com'
+})
+
+
+@dataclass
+class ResourceBlockingPolicy:
+    """Which requests a pooled context aborts before they reach the network"""
+    blocked_resource_types: FrozenSet[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    blocked_hosts: FrozenSet[str] = DEFAULT_BLOCKED_HOSTS
+    enabled: bool = True
+
+    def is_blocked_host(self, host: str) -> bool:
+        host = host.lower()
+        while host:
+            if host in self.blocked_hosts:
+                return True
+            _, _, host = host.partition('.')
+        return False
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if not self.enabled:
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return self.is_blocked_host(urlparse(url).hostname or '')
+
+
+@dataclass
+class PageSession:
+    """A fresh page inside its own isolated browser context"""
+    page: Any
+    context: Any
+    domain: str = ""
+    blocked_requests: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    script_urls: List[str] = field(default_factory=list)
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retired = False
+
+
+class AsyncBrowserPool:
+    """Keeps a few Chromium browsers alive and recycles them after a page budget"""
+
+    def __init__(self, browsers: int = DEFAULT_BROWSERS,
+                 max_pages_per_browser: int = DEFAULT_MAX_PAGES_PER_BROWSER,
+                 launch_args: Optional[List[str]] = None,
+                 context_options: Optional[Dict] = None,
+                 blocking_policy: Optional[ResourceBlockingPolicy] = None):
+        self.size = max(1, int(browsers))
+        self.max_pages_per_browser = max(1, int(max_pages_per_browser))
+        self.launch_args = launch_args if launch_args is not None else list(DEFAULT_LAUNCH_ARGS)
+        self.context_options = context_options if context_options is not None else dict(DEFAULT_CONTEXT_OPTIONS)
+        self.blocking_policy = blocking_policy if blocking_policy is not None else ResourceBlockingPolicy()
+        self.browsers_launched = 0
+        self.pages_served = 0
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=True, args=self.launch_args)
+        self.browsers_launched += 1
+        entry = _PooledBrowser(browser)
+        self._browsers.append(entry)
+        return entry
+
+    async def _retire(self, entry: _PooledBrowser):
+        entry.retired = True
+        if entry in self._browsers:
+            self._browsers.remove(entry)
+        if entry.active == 0:
+            try:
+                await entry.browser.close()
+            except Exception:
+                pass
+
+    async def _checkout(self) -> _PooledBrowser:
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright is not installed")
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            for entry in list(self._browsers):
+                if not entry.browser.is_connected() or entry.pages_served >= self.max_pages_per_browser:
+                    await self._retire(entry)
+
+            if len(self._browsers) < self.size:
+                entry = await self._launch()
+            else:
+                entry = min(self._browsers, key=lambda b: b.active)
+
+            entry.pages_served += 1
+            entry.active += 1
+            self.pages_served += 1
+            return entry
+
+    async def _checkin(self, entry: _PooledBrowser):
+        entry.active -= 1
+        if entry.retired and entry.active == 0:
+            try:
+                await entry.browser.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def session(self, domain: str = ""):
+        """Yield a PageSession in a brand-new context; the context is closed afterwards"""
+        entry = await self._checkout()
+        context = None
+        try:
+            context = await entry.browser.new_context(**self.context_options)
+            session = PageSession(page=None, context=context, domain=domain)
+            if self.blocking_policy.enabled:
+                await context.route('**/*', self._route_handler(session))
+            session.page = await context.new_page()
+            yield session
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await self._checkin(entry)
+
+    def _route_handler(self, session: PageSession):
+        policy = self.blocking_policy
+
+        async def handle(route):
+            request = route.request
+            resource_type = request.resource_type
+            # Script URLs are kept even when blocked so tech detection still sees them
+            if resource_type == 'script':
+                session.script_urls.append(request.url)
+            # Never abort the top-level document, even when the domain itself is on the blocklist
+            is_main_document = request.is_navigation_request() and request.frame.parent_frame is None
+            if not is_main_document and policy.should_block(resource_type, request.url):
+                session.blocked_requests += 1
+                session.blocked_by_type[resource_type] = session.blocked_by_type.get(resource_type, 0) + 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        return handle
+
+    async def close(self):
+        """Close every browser and stop Playwright"""
+        self._closed = True
+        for entry in list(self._browsers):
+            entry.active = 0
+            await self._retire(entry)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+class BrowserPool:
+    """Thread-safe synchronous front-end that drives an AsyncBrowserPool on its own event loop"""
+
+    def __init__(self, **pool_options):
+        self.pool_options = pool_options
+        self._pool: Optional[AsyncBrowserPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            # Playwright talks to Chromium over subprocess pipes, which on Windows need the Proactor loop
+            self._loop = asyncio.ProactorEventLoop() if sys.platform == 'win32' else asyncio.new_event_loop()
+            self._pool = AsyncBrowserPool(**self.pool_options)
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name='browser-pool', daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        if self._pool is None:
+            return {'browsers_launched': 0, 'pages_served': 0}
+        return {
+            'browsers_launched': self._pool.browsers_launched,
+            'pages_served': self._pool.pages_served
+        }
+
+    def run(self, func: Callable[[PageSession], Awaitable[Any]], domain: str = "",
+            timeout: Optional[float] = None) -> Any:
+        """Run ``await func(session)`` on a pooled page and return its result"""
+        self._ensure_started()
+
+        async def job():
+            async with self._pool.session(domain) as session:
+                return await func(session)
+
+        return asyncio.run_coroutine_threadsafe(job(), self._loop).result(timeout)
+
+    def close(self):
+        """Shut down browsers and the event-loop thread; safe to call more than once"""
+        with self._lock:
+            loop, pool, thread = self._loop, self._pool, self._thread
+            self._loop = self._pool = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(pool.close(), loop).result(30)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+_shared_pools: List[BrowserPool] = []
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(**pool_options) -> BrowserPool:
+    """Return the process-wide BrowserPool for these options, creating it on first use.
+
+    Callers asking for different launch or context options get their own pool.
+    """
+    with _shared_pool_lock:
+        for pool in _shared_pools:
+            if pool.pool_options == pool_options:
+                return pool
+        pool = BrowserPool(**pool_options)
+        _shared_pools.append(pool)
+        return pool
@@ -0,0 +1,141 @@
+"""
+Contact Scanner
+Author: Prakhar Madnani
+Precompiled single-pass extraction of emails, phones, social profiles and locations
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Hostname (without www.) to social network; one subdomain such as uk.linkedin.com resolves through its parent
+SOCIAL_HOSTS = {
+    'linkedin.com': 'linkedin',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'facebook.com': 'facebook',
+    'fb.com': 'facebook',
+    'instagram.com': 'instagram'
+}
+
+# Only these paths count as a profile; anything else on the host is a share button or a help page
+SOCIAL_PROFILE_PREFIXES = {
+    'linkedin': ('/company/', '/in/')
+}
+SOCIAL_SKIP_PREFIXES = ('/share', '/intent/', '/sharer', '/dialog/', '/home')
+
+# Every contact starts where a run of word characters starts, so one shared lookbehind
+# rejects most positions at once. It also keeps a long run of word characters with no @
+# linear: only the first position of the run is tried, not every suffix of it.
+_CONTACT_START = r'(?<![\w.%+-])'
+_EMAIL = r'[._%+-]*(?P<email>[A-Za-z0-9][A-Za-z0-9._%+-]*@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b'
+_PHONE = (r'(?P<phone>\+\d{1,3}[-.]?\d{3,4}[-.]?\d{3,4}[-.]?\d{3,4}'
+          r'|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
+          r'|\d{3}[-.]?\d{3}[-.]?\d{4})\b')
+_SOCIAL = (r'(?P<social>(?i:(?:https?://)?(?:www\.|m\.|[a-z]{2}\.)?(?:'
+           + '|'.join(re.escape(host) for host in SOCIAL_HOSTS)
+           + r'))/[^\s"\'<>]+)')
+
+# Emails, phones and social URLs in one finditer pass over the text
+CONTACT_PATTERN = re.compile(f"{_CONTACT_START}(?:{_EMAIL}|{_PHONE}|{_SOCIAL})")
+EMAIL_PATTERN = re.compile(_CONTACT_START + _EMAIL)
+_URL_AUTHORITY = re.compile(r'(?:https?:)?//([^/?#]*)', re.IGNORECASE)
+
+# Tried in order; the first pattern with a match wins
+LOCATION_PATTERNS = [
+    re.compile(r'(?:located in|based in|headquarters in)\s+([A-Z][a-z]+(?:,\s*[A-Z]{2})?)', re.IGNORECASE),
+    re.compile(r'\b([A-Z][a-z]+,\s*[A-Z]{2})\s*\d{5}', re.IGNORECASE),
+    re.compile(r'\b([A-Z][a-z]+(?:,\s*[A-Z][a-z]+)*)\s*office', re.IGNORECASE)
+]
+
+
+def social_network(url: str) -> Optional[str]:
+    """Network a profile URL belongs to, or None for other links and share buttons"""
+    if not url.startswith(('http://', 'https://', '//')):
+        # Scheme-less links such as www.linkedin.com/company/acme; relative paths and mailto: never match
+        if ':' in url or url.startswith(('/', '#', '.', '?')):
+            return None
+        url = '//' + url
+    match = _URL_AUTHORITY.match(url)
+    if not match:
+        return None
+
+    host = match.group(1).rpartition('@')[2].partition(':')[0].lower()
+    network = SOCIAL_HOSTS.get(host) or SOCIAL_HOSTS.get(host.partition('.')[2])
+    if not network:
+        return None
+
+    path = url[match.end():].split('?', 1)[0].split('#', 1)[0].lower()
+    if len(path) <= 1 or path.startswith(SOCIAL_SKIP_PREFIXES):
+        return None
+    prefixes = SOCIAL_PROFILE_PREFIXES.get(network)
+    if prefixes and not path.startswith(prefixes):
+        return None
+    return network
+
+
+def _absolute(url: str) -> str:
+    if url.startswith('//'):
+        return 'https:' + url
+    return url if url.startswith(('http://', 'https://')) else 'https://' + url
+
+
+@dataclass
+class ContactScan:
+    """Contacts found on a page, de-duplicated in document order"""
+    emails: List[str] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    social: Dict[str, str] = field(default_factory=dict)
+
+    def add_social(self, url: str):
+        network = social_network(url)
+        if network and network not in self.social:
+            self.social[network] = _absolute(url.rstrip('.,;)'))
+
+    @property
+    def linkedin(self) -> str:
+        return self.social.get('linkedin', '')
+
+
+def scan_text(text: str, scan: Optional[ContactScan] = None) -> ContactScan:
+    """Collect emails, phones and social URLs from text with a single regex pass"""
+    scan = scan or ContactScan()
+    emails, phones = dict.fromkeys(scan.emails), dict.fromkeys(scan.phones)
+    for match in CONTACT_PATTERN.finditer(text or ''):
+        kind = match.lastgroup
+        if kind == 'email':
+            emails.setdefault(match.group('email'))
+        elif kind == 'phone':
+            phones.setdefault(match.group('phone'))
+        else:
+            scan.add_social(match.group('social'))
+    scan.emails, scan.phones = list(emails), list(phones)
+    return scan
+
+
+def scan_links(urls: Iterable[str], scan: Optional[ContactScan] = None) -> ContactScan:
+    """Index link targets by hostname; the first profile per network wins"""
+    scan = scan or ContactScan()
+    for url in urls:
+        if isinstance(url, str):
+            scan.add_social(url.strip())
+    return scan
+
+
+def scan_page(page) -> ContactScan:
+    """Contacts from a ParsedPage: anchors and JSON-LD first, then one pass over the visible text"""
+    scan = scan_links(page.hrefs + page.json_ld_values('sameAs'))
+    structured = [value for key in ('email', 'telephone') for value in page.json_ld_values(key)
+                  if isinstance(value, str)]
+    text = ' '.join(page.hrefs_with_scheme('mailto') + page.hrefs_with_scheme('tel') + structured +
+                    [page.visible_text])
+    return scan_text(text, scan)
+
+
+def find_location(text: str) -> str:
+    """First 'based in', 'City, ST 12345' or 'City office' phrase in the text"""
+    for pattern in LOCATION_PATTERNS:
+        match = pattern.search(text or '')
+        if match and match.group(1).lower() != 'offices':
+            return match.group(1)
+    return ''
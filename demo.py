@@ -6,28 +6,27 @@ Demonstrates both standard and Playwright extraction capabilities
 """
 
 import requests
-from bs4 import BeautifulSoup
-import re
 import json
 import time
 from typing import Dict, List
-from email_validator import validate_email, EmailNotValidError
 
 # Check for Playwright availability
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+from browser_pool import PLAYWRIGHT_AVAILABLE, get_browser_pool
+from page_readiness import goto_and_wait
+from email_validation import get_email_validator
+from http_client import get_http_client
+from parsed_page import ParsedPage
+from keyword_matcher import KEYWORDS
+from contact_scanner import find_location, scan_page
+from scoring_engine import SCORING
 
 class LeadGeneratorDemo:
     """Enhanced demo class showcasing dual extraction modes"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.http = get_http_client()
+        self.email_validator = get_email_validator()
+        self.browser_pool = get_browser_pool()
     
     def extract_company_info(self, domain: str, use_playwright: bool = False) -> Dict:
         """Extract company information with optional Playwright support"""
@@ -39,96 +38,110 @@ class LeadGeneratorDemo:
             return self._extract_with_requests(domain)
     
     def _extract_with_playwright(self, domain: str) -> Dict:
-        """Advanced extraction using Playwright"""
+        """Advanced extraction using a pooled Playwright page"""
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                
-                url = f"https://{domain}" if not domain.startswith('http') else domain
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                page.wait_for_timeout(2000)  # Wait for dynamic content
-                
-                # Extract data using JavaScript
-                title = page.title()
-                content = page.content()
-                
-                # Extract emails using JavaScript execution
-                emails = page.evaluate("""
-                    () => {
-                        const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
-                        const text = document.body.innerText || '';
-                        const emails = text.match(emailRegex) || [];
-                        return [...new Set(emails)].slice(0, 5);
-                    }
-                """)
-                
-                # Extract phone numbers
-                phones = page.evaluate("""
-                    () => {
-                        const phoneRegex = /(\\+?\\d{1,3}[-.]?)?\\(?\\d{3}\\)?[-.]?\\d{3}[-.]?\\d{4}/g;
-                        const text = document.body.innerText || '';
-                        const phones = text.match(phoneRegex) || [];
-                        return [...new Set(phones)].slice(0, 3);
-                    }
-                """)
-                
-                # Extract technology stack
-                tech_stack = page.evaluate("""
-                    () => {
-                        const scripts = Array.from(document.querySelectorAll('script[src]'));
-                        const technologies = [];
-                        
-                        scripts.forEach(script => {
-                            const src = script.src.toLowerCase();
-                            if (src.includes('react')) technologies.push('React');
-                            if (src.includes('angular')) technologies.push('Angular');
-                            if (src.includes('vue')) technologies.push('Vue.js');
-                            if (src.includes('jquery')) technologies.push('jQuery');
-                            if (src.includes('bootstrap')) technologies.push('Bootstrap');
-                        });
-                        
-                        return [...new Set(technologies)];
-                    }
-                """)
-                
-                browser.close()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                return {
-                    'domain': domain,
-                    'title': self._clean_title(title),
-                    'description': self._extract_meta_description(soup),
-                    'emails': self._filter_emails(emails),
-                    'phones': phones[:2],
-                    'linkedin': self._extract_linkedin(soup),
-                    'industry': self._classify_industry(content),
-                    'location': self._extract_location(content),
-                    'technology_stack': tech_stack,
-                    'extraction_method': 'Playwright'
-                }
+            scraped = self.browser_pool.run(self._scrape_page, domain)
+            page = ParsedPage(scraped['content'], domain)
+            
+            result = {
+                'domain': domain,
+                'title': self._clean_title(scraped['title']),
+                'description': self._extract_meta_description(page),
+                'emails': self._filter_emails(scraped['emails']),
+                'phones': scraped['phones'][:2],
+                'linkedin': scan_page(page).linkedin,
+                'industry': self._classify_industry(page.text_lower),
+                'location': self._extract_location(page.visible_text),
+                'technology_stack': scraped['tech_stack'],
+                'extraction_method': 'Playwright',
+                'blocked_requests': scraped['blocked_requests']
+            }
+            result.update(scraped['readiness'])
+            return result
                 
         except Exception as e:
             print(f"❌ Playwright extraction failed: {str(e)}")
             return self._extract_with_requests(domain)
     
+    async def _scrape_page(self, session) -> Dict:
+        """Collect raw page data on the browser pool's event loop"""
+        page = session.page
+        
+        domain = session.domain
+        url = f"https://{domain}" if not domain.startswith('http') else domain
+        readiness = await goto_and_wait(page, url)  # Wait for dynamic content
+        
+        # Extract data using JavaScript
+        title = await page.title()
+        content = await page.content()
+        
+        # Extract emails using JavaScript execution
+        emails = await page.evaluate("""
+            () => {
+                const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
+                const text = document.body.innerText || '';
+                const emails = text.match(emailRegex) || [];
+                return [...new Set(emails)].slice(0, 5);
+            }
+        """)
+        
+        # Extract phone numbers
+        phones = await page.evaluate("""
+            () => {
+                const phoneRegex = /(\\+?\\d{1,3}[-.]?)?\\(?\\d{3}\\)?[-.]?\\d{3}[-.]?\\d{4}/g;
+                const text = document.body.innerText || '';
+                const phones = text.match(phoneRegex) || [];
+                return [...new Set(phones)].slice(0, 3);
+            }
+        """)
+        
+        # Extract technology stack
+        tech_stack = await page.evaluate("""
+            () => {
+                const scripts = Array.from(document.querySelectorAll('script[src]'));
+                const technologies = [];
+                
+                scripts.forEach(script => {
+                    const src = script.src.toLowerCase();
+                    if (src.includes('react')) technologies.push('React');
+                    if (src.includes('angular')) technologies.push('Angular');
+                    if (src.includes('vue')) technologies.push('Vue.js');
+                    if (src.includes('jquery')) technologies.push('jQuery');
+                    if (src.includes('bootstrap')) technologies.push('Bootstrap');
+                });
+                
+                return [...new Set(technologies)];
+            }
+        """)
+        
+        return {
+            'title': title,
+            'content': content,
+            'emails': emails,
+            'phones': phones,
+            'tech_stack': tech_stack,
+            'blocked_requests': session.blocked_requests,
+            'readiness': readiness.as_dict()
+        }
+    
     def _extract_with_requests(self, domain: str) -> Dict:
         """Standard extraction using requests + BeautifulSoup"""
         try:
             url = f"https://{domain}" if not domain.startswith('http') else domain
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            fetched = self.http.fetch_page(url, timeout=10)
+            fetched.raise_for_status()
+            page = ParsedPage(fetched.text, fetched.url)
+            contacts = scan_page(page)
             
             return {
                 'domain': domain,
-                'title': self._clean_title(soup.title.string if soup.title else ""),
-                'description': self._extract_meta_description(soup),
-                'emails': self._extract_emails_basic(response.text),
-                'phones': self._extract_phones_basic(response.text),
-                'linkedin': self._extract_linkedin(soup),
-                'industry': self._classify_industry(response.text),
-                'location': self._extract_location(response.text),
+                'title': self._clean_title(page.title),
+                'description': self._extract_meta_description(page),
+                'emails': self._filter_emails(contacts.emails),
+                'phones': contacts.phones[:2],
+                'linkedin': contacts.linkedin,
+                'industry': self._classify_industry(page.text_lower),
+                'location': self._extract_location(page.visible_text),
                 'technology_stack': [],
                 'extraction_method': 'BeautifulSoup'
             }
@@ -143,121 +156,27 @@ class LeadGeneratorDemo:
         title = title.split('|')[0].split('-')[0].strip()
         return title[:100]
     
-    def _extract_meta_description(self, soup: BeautifulSoup) -> str:
+    def _extract_meta_description(self, page: ParsedPage) -> str:
         """Extract meta description"""
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            return meta_desc.get('content')[:200]
-        return ''
-    
-    def _extract_emails_basic(self, text: str) -> List[str]:
-        """Basic email extraction"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return self._filter_emails(emails)
+        return page.description[:200]
     
     def _filter_emails(self, emails: List[str]) -> List[str]:
         """Filter and validate emails"""
-        valid_emails = []
-        for email in set(emails):
-            try:
-                validate_email(email)
-                if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support']):
-                    valid_emails.append(email)
-                    if len(valid_emails) >= 3:
-                        break
-            except EmailNotValidError:
-                continue
-        return valid_emails
-    
-    def _extract_phones_basic(self, text: str) -> List[str]:
-        """Basic phone extraction"""
-        phone_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b',
-            r'\b\+\d{1,3}[-.]?\d{3,4}[-.]?\d{3,4}[-.]?\d{3,4}\b'
-        ]
-        
-        phones = []
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, text))
-            if len(phones) >= 2:
-                break
-        
-        return list(set(phones))[:2]
-    
-    def _extract_linkedin(self, soup: BeautifulSoup) -> str:
-        """Extract LinkedIn company page"""
-        linkedin_links = soup.find_all('a', href=re.compile(r'linkedin\.com/company'))
-        return linkedin_links[0].get('href', '') if linkedin_links else ''
+        candidates = [email for email in emails
+                      if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support'])]
+        return self.email_validator.valid(candidates)[:3]
     
-    def _classify_industry(self, text: str) -> str:
+    def _classify_industry(self, text_lower: str) -> str:
         """Advanced industry classification"""
-        industry_keywords = {
-            'SaaS/Software': ['saas', 'software', 'platform', 'cloud', 'api', 'app', 'tech'],
-            'E-commerce': ['shop', 'store', 'ecommerce', 'retail', 'marketplace', 'buy', 'sell'],
-            'Fintech': ['fintech', 'banking', 'payment', 'finance', 'crypto', 'trading'],
-            'Healthcare': ['health', 'medical', 'healthcare', 'telemedicine', 'patient'],
-            'Communication': ['communication', 'messaging', 'chat', 'video', 'conference'],
-            'Productivity': ['productivity', 'workspace', 'collaboration', 'notes', 'project'],
-            'Marketing': ['marketing', 'advertising', 'seo', 'social media', 'analytics'],
-            'Developer Tools': ['developer', 'code', 'github', 'repository', 'programming']
-        }
-        
-        text_lower = text.lower()
-        industry_scores = {}
-        
-        for industry, keywords in industry_keywords.items():
-            score = sum(text_lower.count(keyword) for keyword in keywords)
-            if score > 0:
-                industry_scores[industry] = score
-        
-        return max(industry_scores, key=industry_scores.get) if industry_scores else 'Other'
+        return KEYWORDS['demo.industry'].best(KEYWORDS.count(text_lower))
     
     def _extract_location(self, text: str) -> str:
         """Extract company location"""
-        location_patterns = [
-            r'(?:located in|based in|headquarters in)\s+([A-Z][a-z]+(?:,\s*[A-Z]{2})?)',
-            r'([A-Z][a-z]+,\s*[A-Z]{2})\s*\d{5}',
-            r'([A-Z][a-z]+(?:,\s*[A-Z][a-z]+)*)\s*office'
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                return matches[0] if isinstance(matches[0], str) else matches[0][0]
-        
-        return ''
+        return find_location(text)
     
     def _calculate_confidence(self, info: Dict) -> float:
         """Calculate confidence score"""
-        score = 0.0
-        
-        # Email availability (30 points)
-        if info.get('emails'):
-            score += min(len(info['emails']) * 10, 30)
-        
-        # Phone availability (20 points)
-        if info.get('phones'):
-            score += 20
-        
-        # LinkedIn presence (15 points)
-        if info.get('linkedin'):
-            score += 15
-        
-        # Industry classification (15 points)
-        if info.get('industry') and info['industry'] != 'Other':
-            score += 15
-        
-        # Technology stack (10 points)
-        if info.get('technology_stack') and len(info['technology_stack']) > 0:
-            score += 10
-        
-        # Description quality (10 points)
-        if info.get('description') and len(info['description']) > 50:
-            score += 10
-        
-        return min(score, 100)
+        return SCORING.score_one(info, profile='demo')
     
     def demo_single_domain(self, domain: str, use_playwright: bool = False):
         """Demonstrate single domain analysis"""
@@ -276,6 +195,10 @@ class LeadGeneratorDemo:
             print(f"✅ Successfully analyzed: {domain}")
             print(f"⏱️  Processing time: {processing_time:.2f} seconds")
             print(f"🔧 Extraction method: {result.get('extraction_method', 'Unknown')}")
+            if 'blocked_requests' in result:
+                print(f"🚫 Blocked requests: {result['blocked_requests']}")
+            if 'readiness' in result:
+                print(f"⏳ Ready after {result['ready_wait_ms']:.0f} ms ({result['readiness']}: {result['ready_reason']})")
             print(f"\n📊 RESULTS:")
             print(f"   Company: {result.get('title', 'N/A')}")
             print(f"   Industry: {result.get('industry', 'N/A')}")
@@ -367,7 +290,6 @@ class LeadGeneratorDemo:
             try:
                 result = self.extract_company_info(domain, use_playwright)
                 if 'error' not in result:
-                    result['confidence_score'] = self._calculate_confidence(result)
                     results.append(result)
                     
                     method = result.get('extraction_method', 'BeautifulSoup')
@@ -381,6 +303,11 @@ class LeadGeneratorDemo:
                 extraction_stats['errors'] += 1
                 print(f"   ❌ Error: {str(e)}")
         
+        # Score the whole batch in one pass
+        scores = SCORING.score(SCORING.features(results), profile='demo')
+        for result, score in zip(results, scores):
+            result['confidence_score'] = float(score)
+        
         # Summary statistics
         successful = [r for r in results if 'error' not in r]
         with_email = [r for r in successful if r.get('emails')]
@@ -482,6 +409,8 @@ def main():
         print(json.dumps(export_data[:2], indent=2))
         print(f"\n✅ Ready to export {len(export_data)} qualified leads")
     
+    demo.browser_pool.close()
+    
     print(f"\n{'='*70}")
     print("🎉 Demo completed successfully!")
     print("💡 Run 'streamlit run lead_generator.py' for full UI experience")
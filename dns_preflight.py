@@ -0,0 +1,271 @@
+"""
+DNS Pre-flight
+Author: Prakhar Madnani
+Concurrent pre-resolution of input domains with a persistent negative cache for dead hosts
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import concurrent.futures
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+
+from response_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_POSITIVE_TTL_SECONDS = 10 * 60
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_RESOLVER_WORKERS = 32
+DEFAULT_MEMORY_ENTRIES = 50000
+# Names that always resolve; if none of them do, the resolver is down and NXDOMAIN answers prove nothing
+DEFAULT_CANARY_HOSTS = tuple(os.environ.get('LEADGEN_DNS_CANARY', 'example.com,iana.org').split(','))
+CANARY_RECHECK_SECONDS = 60
+
+# getaddrinfo errors that mean the name definitively has no usable address
+_DEAD_ERRNOS = {
+    getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA', 'EAI_ADDRFAMILY')
+    if hasattr(socket, name)
+}
+
+
+def fetch_host(domain: str) -> str:
+    """Hostname the fetch layer will actually connect to for a domain or URL"""
+    url = f"https://{domain}" if not domain.startswith('http') else domain
+    return (urlparse(url).hostname or domain).lower()
+
+
+class DnsCache:
+    """Thread-safe address cache; dead hosts are also persisted to SQLite.
+
+    Both in-memory maps are LRUs capped at ``memory_entries``, so memory stays
+    flat however many domains stream through. Dead hosts evicted from memory
+    are still found in SQLite.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 positive_ttl: float = DEFAULT_POSITIVE_TTL_SECONDS,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 canary_hosts: Iterable[str] = DEFAULT_CANARY_HOSTS):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, 'dns.sqlite3')
+        self.canary_hosts = tuple(host for host in canary_hosts if host)
+        self._canary: Optional[Tuple[float, bool]] = None
+        self._canary_lock = threading.Lock()
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.memory_entries = memory_entries
+        self.stats = {'resolved': 0, 'dead': 0, 'negative_hits': 0, 'unconfirmed': 0}
+        self._positive: OrderedDict = OrderedDict()
+        self._negative: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dead_hosts (
+                host TEXT PRIMARY KEY,
+                reason TEXT,
+                expires_at REAL
+            )
+        """)
+        now = time.time()
+        self._conn.execute('DELETE FROM dead_hosts WHERE expires_at < ?', (now,))
+        self._conn.commit()
+        for host, reason, expires_at in self._conn.execute(
+            'SELECT * FROM (SELECT host, reason, expires_at FROM dead_hosts ORDER BY expires_at DESC LIMIT ?) '
+            'ORDER BY expires_at', (memory_entries + 1,)
+        ):
+            self._negative[host] = (expires_at, reason)
+        # While every dead host fits in memory a miss there is final and SQLite is never queried
+        self._negative_complete = len(self._negative) <= memory_entries
+        self._trim(self._negative)
+
+    def _trim(self, entries: OrderedDict):
+        while len(entries) > self.memory_entries:
+            entries.popitem(last=False)
+            if entries is self._negative:
+                self._negative_complete = False
+
+    def dead_reason(self, host: str) -> Optional[str]:
+        """Why a host is known to be dead, or None if it is not in the negative cache"""
+        host = host.lower()
+        with self._lock:
+            entry = self._negative.get(host)
+            if entry is None and not self._negative_complete:
+                row = self._conn.execute(
+                    'SELECT expires_at, reason FROM dead_hosts WHERE host = ?', (host,)
+                ).fetchone()
+                if row is not None:
+                    entry = self._negative[host] = row
+                    self._trim(self._negative)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._negative.pop(host, None)
+                return None
+            self._negative.move_to_end(host)
+            self.stats['negative_hits'] += 1
+            return entry[1]
+
+    def addresses(self, host: str) -> List[str]:
+        """Cached addresses for a host, or an empty list if unknown or expired"""
+        with self._lock:
+            entry = self._positive.get(host.lower())
+            if entry is None or entry[0] < time.time():
+                return []
+            self._positive.move_to_end(host.lower())
+            return entry[1]
+
+    def resolve(self, host: str, port: int = 443) -> Tuple[List[str], Optional[str]]:
+        """Resolve a host, returning (addresses, dead_reason) and updating both caches"""
+        host = host.lower()
+        reason = self.dead_reason(host)
+        if reason is not None:
+            return [], reason
+        cached = self.addresses(host)
+        if cached:
+            return cached, None
+
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in _DEAD_ERRNOS:
+                if not self.resolver_healthy():
+                    # Everything looks dead during a resolver or network outage; do not blacklist it
+                    with self._lock:
+                        self.stats['unconfirmed'] += 1
+                    return [], None
+                return [], self._mark_dead(host, f"DNS: {e.strerror or 'no such host'}")
+            # Temporary resolver trouble is not proof the domain is dead
+            return [], None
+        except UnicodeError:
+            return [], self._mark_dead(host, 'DNS: invalid hostname')
+
+        addresses = []
+        for _, _, _, _, sockaddr in infos:
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        if not addresses:
+            return [], self._mark_dead(host, 'DNS: no address records')
+
+        with self._lock:
+            self._positive[host] = (time.time() + self.positive_ttl, addresses)
+            self._positive.move_to_end(host)
+            self._trim(self._positive)
+            self.stats['resolved'] += 1
+        return addresses, None
+
+    def resolver_healthy(self) -> bool:
+        """Whether any canary host resolves, rechecked at most once a minute"""
+        if not self.canary_hosts:
+            return True
+        with self._canary_lock:
+            if self._canary is None or self._canary[0] < time.time():
+                healthy = False
+                for canary in self.canary_hosts:
+                    try:
+                        healthy = bool(socket.getaddrinfo(canary, 443, type=socket.SOCK_STREAM))
+                    except (socket.gaierror, UnicodeError):
+                        continue
+                    if healthy:
+                        break
+                self._canary = (time.time() + CANARY_RECHECK_SECONDS, healthy)
+            return self._canary[1]
+
+    def _mark_dead(self, host: str, reason: str) -> str:
+        expires_at = time.time() + self.negative_ttl
+        with self._lock:
+            self._negative[host] = (expires_at, reason)
+            self._negative.move_to_end(host)
+            self._trim(self._negative)
+            self.stats['dead'] += 1
+            self._conn.execute('INSERT OR REPLACE INTO dead_hosts VALUES (?, ?, ?)', (host, reason, expires_at))
+            self._conn.commit()
+        return reason
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DnsPreflight:
+    """Resolves many domains concurrently before any fetch is queued"""
+
+    def __init__(self, dns_cache: DnsCache, max_workers: int = DEFAULT_RESOLVER_WORKERS):
+        self.dns_cache = dns_cache
+        self.max_workers = max(1, int(max_workers))
+
+    def check(self, domains: Iterable[str]) -> Dict[str, str]:
+        """Resolve every domain and return {domain: reason} for the dead ones"""
+        domains = list(dict.fromkeys(domains))
+        hosts = {domain: fetch_host(domain) for domain in domains}
+
+        dead_hosts = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='dns'
+        ) as executor:
+            futures = {executor.submit(self.dns_cache.resolve, host): host for host in set(hosts.values())}
+            for future in concurrent.futures.as_completed(futures):
+                _, reason = future.result()
+                if reason:
+                    dead_hosts[futures[future]] = reason
+
+        return {domain: dead_hosts[host] for domain, host in hosts.items() if host in dead_hosts}
+
+
+class _PreResolvedConnectionMixin:
+    dns_cache: Optional[DnsCache] = None
+
+    def _new_conn(self):
+        addresses = self.dns_cache.addresses(self.host) if self.dns_cache else []
+        if not addresses:
+            return super()._new_conn()
+        # Only the socket target changes; Host header and TLS SNI still use the real name
+        original = self._dns_host
+        try:
+            # Like socket.create_connection, fall through to the next address when one is unreachable
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = original
+
+
+class PreResolvedAdapter(HTTPAdapter):
+    """HTTPAdapter that connects to addresses already resolved by the pre-flight stage"""
+
+    def __init__(self, dns_cache: DnsCache, **kwargs):
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def connection_mixins(self) -> tuple:
+        """Mixins placed in front of urllib3's connection classes; subclasses may extend"""
+        return (_PreResolvedConnectionMixin,)
+
+    def connection_attributes(self) -> dict:
+        return {'dns_cache': self.dns_cache}
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        mixins = self.connection_mixins()
+        attributes = self.connection_attributes()
+        http_conn = type('PreResolvedHTTPConnection', mixins + (HTTPConnection,), attributes)
+        https_conn = type('PreResolvedHTTPSConnection', mixins + (HTTPSConnection,), attributes)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('PreResolvedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_conn}),
+            'https': type('PreResolvedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_conn})
+        }
@@ -0,0 +1,178 @@
+"""
+Email Validation
+Author: Prakhar Madnani
+Shared email validator with per-domain deliverability caching, an offline syntax-only mode and batch checks
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from email_validator import EmailNotValidError, validate_email
+from email_validator.deliverability import validate_email_deliverability
+
+MODE_DELIVERABILITY = 'deliverability'
+MODE_SYNTAX = 'syntax'
+VALIDATION_MODES = [MODE_DELIVERABILITY, MODE_SYNTAX]
+DEFAULT_VALIDATION_MODE = os.environ.get('LEADGEN_EMAIL_VALIDATION', MODE_DELIVERABILITY)
+
+DEFAULT_DOMAIN_CACHE_SIZE = 4096
+SYNTAX_CACHE_SIZE = 65536
+DEFAULT_DOMAIN_TTL_SECONDS = 60 * 60
+DEFAULT_LOOKUP_WORKERS = 8
+DEFAULT_DNS_TIMEOUT_SECONDS = 5
+
+
+@lru_cache(maxsize=SYNTAX_CACHE_SIZE)
+def parse_address(email: str) -> Optional[Tuple[str, str]]:
+    """(ascii_domain, domain) for a syntactically valid address, else None; never touches the network"""
+    try:
+        validated = validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return None
+    return validated.ascii_domain, validated.domain
+
+
+class DomainCache:
+    """Thread-safe LRU of per-domain deliverability results; None means deliverable"""
+
+    def __init__(self, max_entries: int = DEFAULT_DOMAIN_CACHE_SIZE, ttl: float = DEFAULT_DOMAIN_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'lookups': 0}
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, domain: str) -> Tuple[bool, Optional[str]]:
+        """(found, reason) for a domain; reason is None when the domain accepts mail"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None or entry[0] < time.time():
+                self.stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(domain)
+            self.stats['hits'] += 1
+            return True, entry[1]
+
+    def put(self, domain: str, reason: Optional[str]):
+        with self._lock:
+            self._entries[domain] = (time.time() + self.ttl, reason)
+            self._entries.move_to_end(domain)
+            self.stats['lookups'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EmailValidator:
+    """Validates candidate addresses; each domain's MX records are looked up at most once per TTL.
+
+    ``deliverability`` mode checks syntax and then that the domain accepts
+    mail. ``syntax`` mode never touches the network, for offline runs.
+    Concurrent callers asking about the same domain share one lookup.
+    """
+
+    def __init__(self, mode: str = DEFAULT_VALIDATION_MODE, domain_cache: Optional[DomainCache] = None,
+                 max_workers: int = DEFAULT_LOOKUP_WORKERS, timeout: float = DEFAULT_DNS_TIMEOUT_SECONDS):
+        self.mode = mode if mode in VALIDATION_MODES else MODE_DELIVERABILITY
+        self.domain_cache = domain_cache or DomainCache()
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == MODE_SYNTAX
+
+    def _lookup(self, domain: str, domain_i18n: str) -> Optional[str]:
+        try:
+            validate_email_deliverability(domain, domain_i18n, timeout=self.timeout)
+        except EmailNotValidError as e:
+            return str(e)
+        return None
+
+    def domain_reason(self, domain: str, domain_i18n: Optional[str] = None) -> Optional[str]:
+        """Why a domain cannot receive mail, or None if it can; cached and shared between threads"""
+        found, reason = self.domain_cache.get(domain)
+        if found:
+            return reason
+
+        with self._lock:
+            future = self._pending.get(domain)
+            owner = future is None
+            if owner:
+                future = self._pending[domain] = concurrent.futures.Future()
+        if not owner:
+            return future.result()
+
+        try:
+            reason = self._lookup(domain, domain_i18n or domain)
+            self.domain_cache.put(domain, reason)
+            future.set_result(reason)
+            return reason
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._pending[domain]
+
+    def is_valid(self, email: str) -> bool:
+        return bool(self.valid([email]))
+
+    def valid(self, emails: Iterable[str]) -> List[str]:
+        """Addresses that pass, in input order; each uncached domain is looked up once, concurrently"""
+        candidates = [(email, parse_address(email)) for email in dict.fromkeys(emails)]
+        candidates = [(email, parsed) for email, parsed in candidates if parsed is not None]
+        if self.offline or not candidates:
+            return [email for email, _ in candidates]
+
+        domains = dict(parsed for _, parsed in candidates)
+        reasons, uncached = {}, {}
+        for domain, domain_i18n in domains.items():
+            found, reason = self.domain_cache.get(domain)
+            if found:
+                reasons[domain] = reason
+            else:
+                uncached[domain] = domain_i18n
+        lookup = lambda item: (item[0], self.domain_reason(*item))
+        if len(uncached) > 1:
+            reasons.update(self._get_executor().map(lookup, uncached.items()))
+        else:
+            reasons.update(map(lookup, uncached.items()))
+        return [email for email, parsed in candidates if reasons[parsed[0]] is None]
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='mx'
+                )
+            return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_shared_validators: Dict[str, EmailValidator] = {}
+_shared_domain_cache = DomainCache()
+_shared_lock = threading.Lock()
+
+
+def get_email_validator(mode: Optional[str] = None) -> EmailValidator:
+    """Process-wide validator for a mode; every mode shares one domain cache"""
+    mode = mode or DEFAULT_VALIDATION_MODE
+    with _shared_lock:
+        validator = _shared_validators.get(mode)
+        if validator is None:
+            validator = _shared_validators[mode] = EmailValidator(mode, domain_cache=_shared_domain_cache)
+        return validator
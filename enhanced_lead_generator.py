@@ -5,17 +5,18 @@ Advanced web scraping for complex JavaScript-heavy websites
 """
 
 import asyncio
-from playwright.async_api import async_playwright
+from browser_pool import AsyncBrowserPool, BrowserPool, get_browser_pool
+from page_readiness import goto_and_wait
+from email_validation import get_email_validator
+from http_client import get_http_client
+from parsed_page import ParsedPage
+from keyword_matcher import KEYWORDS
+from contact_scanner import find_location, scan_page
+from scoring_engine import SCORING
 import streamlit as st
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import re
 import json
-from typing import Dict, List, Optional
-import plotly.express as px
-from email_validator import validate_email, EmailNotValidError
-import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+from collections import Counter
 from dataclasses import dataclass
 
 @dataclass
@@ -38,50 +39,50 @@ class Lead:
 class EnhancedLeadEnricher:
     """Advanced lead enrichment with Playwright for JavaScript-heavy sites"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, browser_pool: Optional[Union[AsyncBrowserPool, BrowserPool]] = None):
+        self.http = get_http_client()
+        self.email_validator = get_email_validator()
         self.use_playwright = True  # Flag for complex sites
+        # An AsyncBrowserPool is bound to the event loop it is first used on;
+        # a BrowserPool runs on its own loop thread and outlives the caller's loop
+        self._owns_pool = browser_pool is None
+        self.browser_pool = browser_pool or AsyncBrowserPool()
+    
+    async def close(self):
+        """Shut down the browser pool if this enricher created it"""
+        if self._owns_pool:
+            await self.browser_pool.close()
     
     async def extract_with_playwright(self, domain: str) -> Dict:
         """Advanced extraction using Playwright for JavaScript-heavy sites"""
         try:
-            async with async_playwright() as p:
-                # Launch browser with optimized settings
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage']
-                )
-                
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                
-                page = await context.new_page()
-                
-                # Navigate with timeout and wait for network idle
-                url = f"https://{domain}" if not domain.startswith('http') else domain
-                await page.goto(url, wait_until='networkidle', timeout=30000)
-                
-                # Extract comprehensive data
-                data = await self._extract_advanced_data(page, domain)
-                
-                await browser.close()
-                return data
+            if isinstance(self.browser_pool, BrowserPool):
+                return await asyncio.to_thread(self.browser_pool.run, self._scrape_session, domain)
+            async with self.browser_pool.session(domain) as session:
+                return await self._scrape_session(session)
                 
         except Exception as e:
             st.warning(f"Playwright extraction failed for {domain}, falling back to BeautifulSoup: {str(e)}")
             return await self._fallback_extraction(domain)
     
+    async def _scrape_session(self, session) -> Dict:
+        """Runs on the browser pool's event loop against a fresh pooled page"""
+        page = session.page
+        domain = session.domain
+        
+        # Navigate and wait until the DOM settles or contact signals appear
+        url = f"https://{domain}" if not domain.startswith('http') else domain
+        readiness = await goto_and_wait(page, url)
+        
+        # Extract comprehensive data
+        data = await self._extract_advanced_data(page, domain)
+        data['blocked_requests'] = session.blocked_requests
+        data.update(readiness.as_dict())
+        return data
+    
     async def _extract_advanced_data(self, page, domain: str) -> Dict:
         """Extract comprehensive data using Playwright"""
         try:
-            # Wait for dynamic content to load
-            await page.wait_for_timeout(2000)
-            
             # Extract basic information
             title = await page.title()
             content = await page.content()
@@ -106,26 +107,6 @@ class EnhancedLeadEnricher:
                 }
             """)
             
-            # Extract social media links
-            social_links = await page.evaluate("""
-                () => {
-                    const links = Array.from(document.querySelectorAll('a[href]'));
-                    const socialDomains = ['linkedin.com', 'twitter.com', 'facebook.com', 'instagram.com'];
-                    const socialLinks = {};
-                    
-                    links.forEach(link => {
-                        const href = link.href;
-                        socialDomains.forEach(domain => {
-                            if (href.includes(domain)) {
-                                socialLinks[domain] = href;
-                            }
-                        });
-                    });
-                    
-                    return socialLinks;
-                }
-            """)
-            
             # Extract technology indicators
             tech_stack = await page.evaluate("""
                 () => {
@@ -146,22 +127,28 @@ class EnhancedLeadEnricher:
                 }
             """)
             
-            # Parse with BeautifulSoup for additional extraction
-            soup = BeautifulSoup(content, 'html.parser')
+            # Parse once for additional extraction
+            parsed = ParsedPage(content, domain)
+            # Social profiles come from a hostname lookup over the rendered anchors
+            social_links = scan_page(parsed).social
+            # One automaton pass feeds industry, size and revenue
+            counts = KEYWORDS.count(parsed.text_lower)
+            # MX lookups for new domains must not stall other pages on this loop
+            valid_emails = await asyncio.to_thread(self._filter_emails, emails)
             
             return {
                 'domain': domain,
                 'title': self._clean_title(title),
-                'description': self._extract_meta_description(soup),
-                'emails': self._filter_emails(emails),
+                'description': self._extract_meta_description(parsed),
+                'emails': valid_emails,
                 'phones': phones[:2],
-                'linkedin': social_links.get('linkedin.com', ''),
+                'linkedin': social_links.get('linkedin', ''),
                 'social_media': json.dumps(social_links),
                 'technology_stack': ', '.join(tech_stack),
-                'industry': self._classify_industry_advanced(content),
-                'location': self._extract_location_advanced(content),
-                'employee_count': self._estimate_company_size(content),
-                'revenue_estimate': self._estimate_revenue(content)
+                'industry': self._classify_industry_advanced(counts),
+                'location': self._extract_location_advanced(parsed.visible_text),
+                'employee_count': self._estimate_company_size(counts),
+                'revenue_estimate': self._estimate_revenue(counts)
             }
             
         except Exception as e:
@@ -171,19 +158,23 @@ class EnhancedLeadEnricher:
         """Fallback to requests + BeautifulSoup"""
         try:
             url = f"https://{domain}" if not domain.startswith('http') else domain
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Run the blocking request off the event loop so other pages keep going
+            fetched = await asyncio.to_thread(self.http.fetch_page, url, timeout=10)
+            fetched.raise_for_status()
+            page = ParsedPage(fetched.text, fetched.url)
+            contacts = scan_page(page)
+            valid_emails = await asyncio.to_thread(self._filter_emails, contacts.emails)
             
             return {
                 'domain': domain,
-                'title': self._clean_title(soup.title.string if soup.title else ""),
-                'description': self._extract_meta_description(soup),
-                'emails': self._extract_emails_basic(response.text),
-                'phones': self._extract_phones_basic(response.text),
-                'linkedin': self._extract_linkedin_basic(soup),
-                'social_media': '{}',
+                'title': self._clean_title(page.title),
+                'description': self._extract_meta_description(page),
+                'emails': valid_emails,
+                'phones': contacts.phones[:2],
+                'linkedin': contacts.linkedin,
+                'social_media': json.dumps(contacts.social),
                 'technology_stack': '',
-                'industry': self._classify_industry_basic(response.text),
+                'industry': self._classify_industry_basic(KEYWORDS.count(page.text_lower)),
                 'location': '',
                 'employee_count': '',
                 'revenue_estimate': ''
@@ -194,74 +185,39 @@ class EnhancedLeadEnricher:
     
     def _filter_emails(self, emails: List[str]) -> List[str]:
         """Filter and validate emails"""
-        valid_emails = []
-        for email in emails:
-            try:
-                validate_email(email)
-                if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support']):
-                    valid_emails.append(email)
-                    if len(valid_emails) >= 3:
-                        break
-            except EmailNotValidError:
-                continue
-        return valid_emails
+        candidates = [email for email in emails
+                      if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support'])]
+        return self.email_validator.valid(candidates)[:3]
+    
+    def _clean_title(self, title: str) -> str:
+        """Clean and extract company name from title"""
+        if not title:
+            return ""
+        title = title.split('|')[0].split('-')[0].strip()
+        return title[:100]
+    
+    def _extract_meta_description(self, page: ParsedPage) -> str:
+        """Extract meta description"""
+        return page.description[:200]
+    
+    def _classify_industry_basic(self, counts: Counter) -> str:
+        """Fallback classification shares the weighted keyword tables"""
+        return self._classify_industry_advanced(counts)
+    
+    def _extract_location_advanced(self, content: str) -> str:
+        """Extract company location from address-like phrases"""
+        return find_location(content)
     
-    def _classify_industry_advanced(self, content: str) -> str:
+    def _classify_industry_advanced(self, counts: Counter) -> str:
         """Advanced industry classification with weighted keywords"""
-        industry_keywords = {
-            'SaaS/Software': {
-                'primary': ['saas', 'software', 'platform', 'cloud', 'api'],
-                'secondary': ['subscription', 'dashboard', 'integration', 'automation'],
-                'weight': 1.5
-            },
-            'E-commerce': {
-                'primary': ['shop', 'store', 'ecommerce', 'retail', 'marketplace'],
-                'secondary': ['cart', 'checkout', 'product', 'buy', 'sell'],
-                'weight': 1.3
-            },
-            'Fintech': {
-                'primary': ['fintech', 'banking', 'payment', 'finance', 'crypto'],
-                'secondary': ['transaction', 'wallet', 'investment', 'trading'],
-                'weight': 1.4
-            },
-            'Healthcare': {
-                'primary': ['health', 'medical', 'healthcare', 'telemedicine'],
-                'secondary': ['patient', 'doctor', 'clinic', 'diagnosis'],
-                'weight': 1.2
-            },
-            'AI/ML': {
-                'primary': ['artificial intelligence', 'machine learning', 'ai', 'ml'],
-                'secondary': ['neural', 'algorithm', 'data science', 'analytics'],
-                'weight': 1.6
-            }
-        }
-        
-        content_lower = content.lower()
-        industry_scores = {}
-        
-        for industry, data in industry_keywords.items():
-            score = 0
-            for keyword in data['primary']:
-                score += content_lower.count(keyword) * 3
-            for keyword in data['secondary']:
-                score += content_lower.count(keyword) * 1
-            
-            if score > 0:
-                industry_scores[industry] = score * data['weight']
-        
-        return max(industry_scores, key=industry_scores.get) if industry_scores else 'Other'
+        return KEYWORDS['enhanced.industry'].best(counts)
     
-    def _estimate_company_size(self, content: str) -> str:
+    def _estimate_company_size(self, counts: Counter) -> str:
         """Estimate company size from content indicators"""
-        content_lower = content.lower()
-        
-        large_indicators = ['fortune 500', 'enterprise', 'global', 'worldwide', 'international']
-        medium_indicators = ['startup', 'growing', 'scale', 'expanding']
-        small_indicators = ['small business', 'local', 'boutique', 'independent']
-        
-        large_score = sum(content_lower.count(indicator) for indicator in large_indicators)
-        medium_score = sum(content_lower.count(indicator) for indicator in medium_indicators)
-        small_score = sum(content_lower.count(indicator) for indicator in small_indicators)
+        scores = KEYWORDS['enhanced.company_size'].scores(counts)
+        large_score = scores.get("Large (1000+ employees)", 0)
+        medium_score = scores.get("Medium (100-1000 employees)", 0)
+        small_score = scores.get("Small (10-100 employees)", 0)
         
         if large_score > medium_score and large_score > small_score:
             return "Large (1000+ employees)"
@@ -272,108 +228,95 @@ class EnhancedLeadEnricher:
         else:
             return "Unknown"
     
-    def _estimate_revenue(self, content: str) -> str:
+    def _estimate_revenue(self, counts: Counter) -> str:
         """Estimate revenue from content indicators"""
-        content_lower = content.lower()
-        
-        if any(indicator in content_lower for indicator in ['billion', 'unicorn', 'ipo']):
-            return "$1B+"
-        elif any(indicator in content_lower for indicator in ['million', 'series', 'funded']):
-            return "$10M-1B"
-        elif any(indicator in content_lower for indicator in ['revenue', 'profitable', 'growing']):
-            return "$1M-10M"
-        else:
-            return "Unknown"
-
-class AdvancedLeadScorer:
-    """Enhanced scoring with more sophisticated algorithms"""
-    
-    @staticmethod
-    def calculate_advanced_score(lead_data: Dict) -> float:
-        """Advanced confidence scoring with multiple factors"""
-        score = 0.0
-        
-        # Email scoring (25 points)
-        emails = lead_data.get('emails', [])
-        if emails:
-            score += min(len(emails) * 8, 25)
-        
-        # Phone scoring (15 points)
-        if lead_data.get('phones'):
-            score += 15
-        
-        # Social media presence (15 points)
-        social_data = json.loads(lead_data.get('social_media', '{}'))
-        score += min(len(social_data) * 5, 15)
-        
-        # Technology stack (10 points)
-        if lead_data.get('technology_stack'):
-            tech_count = len(lead_data['technology_stack'].split(','))
-            score += min(tech_count * 2, 10)
-        
-        # Industry relevance (20 points)
-        industry = lead_data.get('industry', '')
-        if industry in ['SaaS/Software', 'Fintech', 'AI/ML']:
-            score += 20
-        elif industry in ['E-commerce', 'Healthcare']:
-            score += 15
-        elif industry != 'Other':
-            score += 10
-        
-        # Company size (10 points)
-        size = lead_data.get('employee_count', '')
-        if 'Large' in size:
-            score += 10
-        elif 'Medium' in size:
-            score += 7
-        elif 'Small' in size:
-            score += 5
-        
-        # Content quality (5 points)
-        if lead_data.get('description') and len(lead_data['description']) > 100:
-            score += 5
-        
-        return min(score, 100)
+        return KEYWORDS['enhanced.revenue'].first(counts)
 
 # Streamlit app integration would remain similar but with enhanced data processing
 # The existing UI code can be updated to use these new classes
 
-async def process_domain_enhanced(domain: str) -> Lead:
-    """Process a single domain with enhanced extraction"""
-    enricher = EnhancedLeadEnricher()
-    scorer = AdvancedLeadScorer()
-    
-    # Extract data using Playwright
-    data = await enricher.extract_with_playwright(domain)
-    
-    if 'error' not in data:
-        # Calculate advanced score
-        confidence = scorer.calculate_advanced_score(data)
-        
-        # Create lead object
-        lead = Lead(
-            company_name=data.get('title', domain),
-            domain=domain,
-            email=data.get('emails', [''])[0] if data.get('emails') else '',
-            phone=data.get('phones', [''])[0] if data.get('phones') else '',
-            linkedin=data.get('linkedin', ''),
-            industry=data.get('industry', ''),
-            employee_count=data.get('employee_count', ''),
-            revenue_estimate=data.get('revenue_estimate', ''),
-            location=data.get('location', ''),
-            description=data.get('description', ''),
-            confidence_score=confidence,
-            technology_stack=data.get('technology_stack', ''),
-            social_media=data.get('social_media', '{}')
-        )
-        
-        return lead
-    else:
+def _build_lead(domain: str, data: Dict) -> Lead:
+    """Turn extracted data into a scored Lead"""
+    if 'error' in data:
         return Lead(
             company_name=domain,
             domain=domain,
             confidence_score=0.0
         )
+    
+    # Calculate advanced score
+    confidence = SCORING.score_one(data, domain, profile='enhanced')
+    
+    return Lead(
+        company_name=data.get('title', domain),
+        domain=domain,
+        email=data.get('emails', [''])[0] if data.get('emails') else '',
+        phone=data.get('phones', [''])[0] if data.get('phones') else '',
+        linkedin=data.get('linkedin', ''),
+        industry=data.get('industry', ''),
+        employee_count=data.get('employee_count', ''),
+        revenue_estimate=data.get('revenue_estimate', ''),
+        location=data.get('location', ''),
+        description=data.get('description', ''),
+        confidence_score=confidence,
+        technology_stack=data.get('technology_stack', ''),
+        social_media=data.get('social_media', '{}')
+    )
+
+async def process_domain_enhanced(domain: str) -> Lead:
+    """Process a single domain with enhanced extraction
+    
+    Uses the process-wide browser pool, so repeated calls (even under separate
+    ``asyncio.run`` loops) reuse the same Chromium instead of launching one each time.
+    """
+    enricher = EnhancedLeadEnricher(get_browser_pool())
+    
+    # Extract data using Playwright
+    data = await enricher.extract_with_playwright(domain)
+    
+    return _build_lead(domain, data)
+
+async def process_domains_enhanced(domains: Iterable[str], concurrency: int = 5,
+                                   browser_pool: Optional[AsyncBrowserPool] = None) -> AsyncIterator[Lead]:
+    """Process many domains over one shared browser, yielding each Lead as it finishes
+    
+    At most ``concurrency`` pages are open at once. Domains are scheduled lazily,
+    so only a small window of tasks exists no matter how long the input is.
+    """
+    enricher = EnhancedLeadEnricher(browser_pool)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    window = max(1, concurrency) * 2
+    domain_iter = iter(domains)
+    pending = set()
+    
+    async def process(domain: str) -> Lead:
+        async with semaphore:
+            try:
+                data = await enricher.extract_with_playwright(domain)
+            except Exception as e:
+                data = {'domain': domain, 'error': str(e)}
+        return _build_lead(domain, data)
+    
+    def fill():
+        for domain in domain_iter:
+            pending.add(asyncio.ensure_future(process(domain)))
+            if len(pending) >= window:
+                break
+    
+    try:
+        fill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+            fill()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await enricher.close()
 
 # Usage example for integration
 if __name__ == "__main__":
@@ -385,4 +328,10 @@ if __name__ == "__main__":
         print(f"Confidence: {lead.confidence_score}%")
         print(f"Technology: {lead.technology_stack}")
     
-    # asyncio.run(test_enhanced_extraction())
\ No newline at end of file
+    async def test_batch_extraction():
+        domains = ["stripe.com", "notion.so", "linear.app", "figma.com"]
+        async for lead in process_domains_enhanced(domains, concurrency=4):
+            print(f"{lead.domain}: {lead.confidence_score:.1f}% ({lead.industry or 'Unknown'})")
+    
+    # asyncio.run(test_enhanced_extraction())
+    # asyncio.run(test_batch_extraction())
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Concurrent Enrichment Engine
+Author: Prakhar Madnani
+Bounded-concurrency batch processing for LeadEnricher with per-host limits
+"""
+
+import threading
+import time
+import concurrent.futures
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 2
+
+
+@dataclass
+class EnrichmentResult:
+    """Outcome of enriching a single domain"""
+    domain: str
+    company_info: Dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return 'error' not in self.company_info
+
+
+def host_key(domain: str) -> str:
+    """Normalize a domain or URL to the host used for per-host limiting"""
+    url = domain if '://' in domain else f"https://{domain}"
+    host = (urlparse(url).hostname or domain).lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class EnrichmentEngine:
+    """Runs extract_company_info over many domains with global and per-host concurrency limits"""
+
+    def __init__(self, enricher, max_workers: int = DEFAULT_MAX_WORKERS,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 initializer: Optional[Callable[[], None]] = None):
+        self.enricher = enricher
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.initializer = initializer
+        # host -> [semaphore, users]; entries are dropped when their last user leaves,
+        # so the map only ever holds the hosts currently in flight
+        self._host_semaphores: Dict[str, List] = {}
+        self._host_lock = threading.Lock()
+
+    @contextmanager
+    def _host_slot(self, domain: str):
+        key = host_key(domain)
+        with self._host_lock:
+            entry = self._host_semaphores.get(key)
+            if entry is None:
+                entry = self._host_semaphores[key] = [threading.BoundedSemaphore(self.per_host_limit), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._host_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._host_semaphores[key]
+
+    def _enrich_one(self, domain: str, use_playwright: bool, extract_options: Dict) -> EnrichmentResult:
+        start = time.perf_counter()
+        with self._host_slot(domain):
+            try:
+                company_info = self.enricher.extract_company_info(domain, use_playwright, **extract_options)
+            except Exception as e:
+                company_info = {'domain': domain, 'error': str(e)}
+        return EnrichmentResult(domain, company_info, time.perf_counter() - start)
+
+    def enrich(self, domains: Iterable[str], use_playwright: bool = False,
+               **extract_options) -> Iterator[EnrichmentResult]:
+        """Yield results in completion order.
+
+        At most ``2 * max_workers`` domains are in flight at once, so the input
+        iterable is consumed lazily and large lists never sit in the queue.
+        Extra keyword arguments are passed through to ``extract_company_info``.
+        """
+        window = self.max_workers * 2
+        domain_iter = iter(domains)
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='enricher',
+            initializer=self.initializer
+        ) as executor:
+            pending = set()
+
+            def fill():
+                for domain in domain_iter:
+                    pending.add(executor.submit(
+                        self._enrich_one, domain, use_playwright, extract_options
+                    ))
+                    if len(pending) >= window:
+                        break
+
+            fill()
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.discard(future)
+                    yield future.result()
+                fill()
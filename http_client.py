@@ -0,0 +1,319 @@
+"""
+Shared HTTP Client
+Author: Prakhar Madnani
+Process-wide pooled HTTP client with keep-alive, per-host caps, size-capped streaming and reuse metrics
+"""
+
+import codecs
+import re
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from dns_preflight import DnsCache, PreResolvedAdapter
+
+try:
+    import httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+DEFAULT_POOL_CONNECTIONS = 256
+DEFAULT_POOL_MAXSIZE = 4
+DEFAULT_TIMEOUT_SECONDS = 10
+DEFAULT_MAX_BODY_BYTES = 2 * 1024 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+STREAM_CHUNK_BYTES = 64 * 1024
+# Statuses that never carry a body, so there is nothing to gate
+BODYLESS_STATUSES = (204, 304)
+
+_HEADER_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?\s*([\w.:-]+)', re.I)
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+
+class UnsupportedContentTypeError(requests.RequestException):
+    """Raised before the body is read when a response is not one of the accepted types"""
+
+
+def _known_codec(name: str) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(content_type: str, body: bytes) -> str:
+    """Pick the charset the way browsers do: BOM, then Content-Type, then <meta>, then UTF-8"""
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    match = _HEADER_CHARSET.search(content_type or '')
+    if match and _known_codec(match.group(1)):
+        return _known_codec(match.group(1))
+    match = _META_CHARSET.search(body[:4096])
+    if match and _known_codec(match.group(1).decode('ascii', 'ignore')):
+        return _known_codec(match.group(1).decode('ascii'))
+    return 'utf-8'
+
+
+def _read_capped(chunks: Iterable[bytes], max_bytes: Optional[int]) -> Tuple[bytes, bool]:
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if max_bytes is not None and len(body) >= max_bytes:
+            del body[max_bytes:]
+            return bytes(body), True
+    return bytes(body), False
+
+
+def _check_content_type(status_code: int, content_type: str, content_types: Optional[Iterable[str]]):
+    # Responses without a Content-Type are let through and sniffed by the parser; error pages are gated too
+    if not content_types or status_code in BODYLESS_STATUSES or not content_type:
+        return
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type not in content_types:
+        raise UnsupportedContentTypeError(f"Unsupported content type: {media_type}")
+
+
+@dataclass
+class FetchedPage:
+    """A homepage body decoded exactly once, shared by every extractor"""
+    url: str
+    status_code: int
+    content_type: str
+    encoding: str
+    text: str
+    size: int
+    truncated: bool = False
+    from_cache: bool = False
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> 'FetchedPage':
+        body = response.content or b''
+        content_type = response.headers.get('Content-Type', '')
+        encoding = sniff_encoding(content_type, body)
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            content_type=content_type,
+            encoding=encoding,
+            text=body.decode(encoding, errors='replace'),
+            size=len(body),
+            truncated=getattr(response, 'truncated', False),
+            from_cache=getattr(response, 'from_cache', False)
+        )
+
+    def raise_for_status(self):
+        """Raise for anything but a 2xx, so error and rate-limit pages are never enriched as leads"""
+        if not 200 <= self.status_code < 300:
+            raise requests.HTTPError(f"HTTP {self.status_code} for {self.url}")
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    """Connection pool settings for the shared client"""
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS  # distinct hosts kept pooled
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE  # connections kept per host
+    pool_block: bool = True  # treat pool_maxsize as a hard per-host cap
+    keep_alive: bool = True
+    http2: bool = False  # only honoured when httpx is installed
+    max_retries: int = 0
+    user_agent: str = DEFAULT_USER_AGENT
+
+
+class _CountingConnectionMixin:
+    connection_counter = None
+
+    def _new_conn(self):
+        if self.connection_counter is not None:
+            self.connection_counter()
+        return super()._new_conn()
+
+
+class PooledAdapter(PreResolvedAdapter):
+    """PreResolvedAdapter that counts requests sent and TCP connections opened"""
+
+    def __init__(self, dns_cache: DnsCache, on_request, on_connection, **kwargs):
+        self.on_request = on_request
+        self.on_connection = on_connection
+        super().__init__(dns_cache, **kwargs)
+
+    def connection_mixins(self) -> tuple:
+        return (_CountingConnectionMixin,) + super().connection_mixins()
+
+    def connection_attributes(self) -> dict:
+        attributes = super().connection_attributes()
+        attributes['connection_counter'] = staticmethod(self.on_connection)
+        return attributes
+
+    def send(self, request, **kwargs):
+        self.on_request()
+        return super().send(request, **kwargs)
+
+
+class HttpClient:
+    """Pooled client shared by every extractor in the process.
+
+    Plain HTTP/1.1 goes through a requests.Session mounted with PooledAdapter.
+    With ``http2=True`` and httpx installed, ``get`` uses an httpx client
+    instead and converts its responses to requests.Response objects.
+    """
+
+    def __init__(self, config: Optional[HttpClientConfig] = None, dns_cache: Optional[DnsCache] = None):
+        self.config = None
+        self.dns_cache = dns_cache or DnsCache()
+        self.stats = {'requests': 0, 'new_connections': 0}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self._httpx = None
+        self.configure(config or HttpClientConfig())
+
+    def configure(self, config: HttpClientConfig):
+        """Switch to new pool settings in place and close the pools they replace.
+
+        Requests already in flight on an HTTP/1.1 pool finish normally; their
+        connections are then dropped instead of being returned.
+        """
+        if config == self.config:
+            return
+        self.session.headers['User-Agent'] = config.user_agent
+        if config.keep_alive:
+            self.session.headers.pop('Connection', None)
+        else:
+            self.session.headers['Connection'] = 'close'
+        replaced = set(self.session.adapters.values())
+        adapter = PooledAdapter(
+            self.dns_cache,
+            on_request=lambda: self._count('requests'),
+            on_connection=lambda: self._count('new_connections'),
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block,
+            max_retries=config.max_retries
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        for old_adapter in replaced:
+            old_adapter.close()
+
+        old_httpx, self._httpx = self._httpx, None
+        if config.http2 and HTTP2_AVAILABLE:
+            self._httpx = httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                headers=dict(self.session.headers),
+                limits=httpx.Limits(
+                    max_connections=config.pool_connections * config.pool_maxsize,
+                    max_keepalive_connections=config.pool_connections if config.keep_alive else 0
+                )
+            )
+        if old_httpx is not None:
+            old_httpx.close()
+        self.config = config
+
+    @property
+    def http2(self) -> bool:
+        return self._httpx is not None
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _trace(self, event_name: str, info: Dict):
+        if event_name == 'connection.connect_tcp.complete':
+            self._count('new_connections')
+
+    def get(self, url: str, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+            headers: Optional[Dict] = None, max_bytes: Optional[int] = None,
+            content_types: Optional[Iterable[str]] = None) -> requests.Response:
+        """GET a URL.
+
+        With ``max_bytes`` or ``content_types`` the body is streamed: other
+        content types raise UnsupportedContentTypeError before any of it is
+        read, and reading stops once ``max_bytes`` have arrived, in which case
+        ``response.truncated`` is True.
+        """
+        if self._httpx is not None:
+            return self._get_httpx(url, timeout, headers, max_bytes, content_types)
+        if max_bytes is None and content_types is None:
+            return self.session.get(url, timeout=timeout, headers=headers)
+
+        response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+        try:
+            _check_content_type(response.status_code, response.headers.get('Content-Type', ''), content_types)
+            response._content, response.truncated = _read_capped(
+                response.iter_content(STREAM_CHUNK_BYTES), max_bytes
+            )
+        finally:
+            # A fully read body hands the connection back to the pool; a cut-off one drops it
+            response.close()
+        return response
+
+    def _get_httpx(self, url, timeout, headers, max_bytes, content_types) -> requests.Response:
+        self._count('requests')
+        with self._httpx.stream('GET', url, timeout=timeout, headers=headers,
+                                extensions={'trace': self._trace}) as response:
+            _check_content_type(response.status_code, response.headers.get('Content-Type', ''), content_types)
+            body, truncated = _read_capped(response.iter_bytes(STREAM_CHUNK_BYTES), max_bytes)
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.url = str(response.url)
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.encoding = response.encoding
+        converted._content = body
+        converted.reason = response.reason_phrase
+        converted.truncated = truncated
+        return converted
+
+    def fetch_page(self, url: str, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                   max_bytes: Optional[int] = DEFAULT_MAX_BODY_BYTES) -> FetchedPage:
+        """Stream an HTML page within the byte budget and decode it once"""
+        return FetchedPage.from_response(
+            self.get(url, timeout=timeout, max_bytes=max_bytes, content_types=HTML_CONTENT_TYPES)
+        )
+
+    def reuse_rate(self, since: Optional[Dict] = None) -> float:
+        """Share of requests served on an already-open connection, overall or since a ``stats`` snapshot"""
+        since = since or {}
+        requests_sent = self.stats['requests'] - since.get('requests', 0)
+        opened = self.stats['new_connections'] - since.get('new_connections', 0)
+        if not requests_sent:
+            return 0.0
+        return max(0.0, 1 - opened / requests_sent)
+
+    def close(self):
+        self.session.close()
+        if self._httpx is not None:
+            self._httpx.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client(config: Optional[HttpClientConfig] = None, **overrides) -> HttpClient:
+    """Return the process-wide client, creating it on first use.
+
+    Module state outlives Streamlit reruns, so pooled connections are kept
+    between them. Passing a config or field overrides (applied to the
+    defaults) reconfigures that one client in place, so changing a setting
+    never leaves an orphaned pool behind; a bare call leaves it as it is.
+    """
+    global _shared_client
+    with _shared_lock:
+        if config is None and not overrides:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+            return _shared_client
+        wanted = replace(config or HttpClientConfig(), **overrides)
+        if _shared_client is None:
+            _shared_client = HttpClient(wanted)
+        else:
+            _shared_client.configure(wanted)
+        return _shared_client
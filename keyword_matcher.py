@@ -0,0 +1,176 @@
+"""
+Keyword Matcher
+Author: Prakhar Madnani
+Aho-Corasick automaton that counts every configured keyword in one pass over a page
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+DEFAULT_KEYWORDS_PATH = os.environ.get(
+    'LEADGEN_KEYWORDS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'keywords.json')
+)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """Counts occurrences of many keywords, in one automaton pass when pyahocorasick is installed.
+
+    Without it, each keyword is counted with a C-level substring scan, as the
+    code before the automaton did. A pure-Python automaton steps through the
+    text one character at a time and measured about 2x slower than that.
+    """
+
+    def __init__(self, terms: Iterable[str], whole_words: Iterable[str] = (), word_boundary: bool = False):
+        self.terms = sorted({term.lower() for term in terms if term})
+        self.whole_words = {term.lower() for term in whole_words}
+        self.word_boundary = word_boundary
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+
+    def _needs_boundary(self, term: str) -> bool:
+        return self.word_boundary or term in self.whole_words
+
+    @staticmethod
+    def _bounded(text_lower: str, start: int, end: int) -> bool:
+        """Whether text_lower[start:end + 1] is not part of a longer word"""
+        if start > 0 and _is_word_char(text_lower[start - 1]):
+            return False
+        return end >= len(text_lower) - 1 or not _is_word_char(text_lower[end + 1])
+
+    def count(self, text_lower: str) -> Counter:
+        """Occurrences of every keyword in already-lowercased text"""
+        counts = Counter()
+        if not self.terms or not text_lower:
+            return counts
+        if self._automaton is None:
+            return self._count_scanning(text_lower)
+        for end, term in self._automaton.iter(text_lower):
+            if self._needs_boundary(term) and not self._bounded(text_lower, end - len(term) + 1, end):
+                continue
+            counts[term] += 1
+        return counts
+
+    def _count_scanning(self, text_lower: str) -> Counter:
+        counts = Counter()
+        find = text_lower.find
+        for term in self.terms:
+            if not self._needs_boundary(term):
+                found = text_lower.count(term)
+            else:
+                found, tail = 0, len(term) - 1
+                start = find(term)
+                while start != -1:
+                    found += self._bounded(text_lower, start, start + tail)
+                    start = find(term, start + 1)
+            if found:
+                counts[term] = found
+        return counts
+
+
+@dataclass
+class KeywordCategory:
+    """One industry, size band or revenue band and the keywords that signal it"""
+    name: str
+    weight: float = 1.0
+    primary: List[str] = field(default_factory=list)
+    secondary: List[str] = field(default_factory=list)
+
+
+@dataclass
+class KeywordTable:
+    """Categories scored from shared keyword counts"""
+    name: str
+    categories: List[KeywordCategory]
+    primary_points: float = 1.0
+    secondary_points: float = 1.0
+
+    def scores(self, counts: Counter) -> Dict[str, float]:
+        """Weighted score per category, in table order, for categories with any hits"""
+        scores = {}
+        for category in self.categories:
+            score = (sum(counts[term] for term in category.primary) * self.primary_points +
+                     sum(counts[term] for term in category.secondary) * self.secondary_points)
+            if score > 0:
+                scores[category.name] = score * category.weight
+        return scores
+
+    def best(self, counts: Counter, default: str = 'Other') -> str:
+        scores = self.scores(counts)
+        return max(scores, key=scores.get) if scores else default
+
+    def first(self, counts: Counter, default: str = 'Unknown') -> str:
+        """First category in table order with any hit; for priority-ordered tables"""
+        return next(iter(self.scores(counts)), default)
+
+    @property
+    def terms(self) -> List[str]:
+        return [term for category in self.categories for term in category.primary + category.secondary]
+
+
+class KeywordTables:
+    """All keyword tables from config, sharing one automaton"""
+
+    def __init__(self, tables: Dict[str, KeywordTable], whole_words: Iterable[str] = (),
+                 word_boundary: bool = False, version: str = ''):
+        self.tables = tables
+        self.version = version
+        self.matcher = KeywordMatcher(
+            (term for table in tables.values() for term in table.terms),
+            whole_words=whole_words,
+            word_boundary=word_boundary
+        )
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'KeywordTables':
+        with open(path or DEFAULT_KEYWORDS_PATH, encoding='utf-8') as f:
+            raw = f.read()
+        config = json.loads(raw)
+        tables = {}
+        for table_name, table in config['tables'].items():
+            categories = [
+                KeywordCategory(
+                    name=name,
+                    weight=category.get('weight', 1.0),
+                    primary=[term.lower() for term in category.get('primary', [])],
+                    secondary=[term.lower() for term in category.get('secondary', [])]
+                )
+                for name, category in table['categories'].items()
+            ]
+            tables[table_name] = KeywordTable(
+                table_name, categories,
+                primary_points=table.get('primary_points', 1.0),
+                secondary_points=table.get('secondary_points', 1.0)
+            )
+        return cls(tables, whole_words=config.get('whole_words', []),
+                   word_boundary=config.get('word_boundary', False),
+                   version=hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16])
+
+    def __getitem__(self, name: str) -> KeywordTable:
+        return self.tables[name]
+
+    def count(self, text_lower: str) -> Counter:
+        return self.matcher.count(text_lower)
+
+
+# Compiled once at import and shared by every extractor
+KEYWORDS = KeywordTables.load()
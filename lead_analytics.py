@@ -0,0 +1,144 @@
+"""
+Lead Analytics
+Author: Prakhar Madnani
+Running aggregates over a lead set, updated as leads are added or removed so reading them never rescans the leads
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from lead_enricher import Lead
+from lead_table import FLAG_COLUMNS, LeadTable
+
+SCORE_BINS = 10
+MAX_SCORE = 100
+TOP_TECHNOLOGIES = 10
+
+
+def technologies(technology_stack: str) -> List[str]:
+    """Individual technologies of a comma-separated stack"""
+    return [tech for tech in (part.strip() for part in (technology_stack or '').split(',')) if tech]
+
+
+class LeadAggregates:
+    """Counts, a fixed-bin score histogram and technology counts for a set of leads.
+
+    Every update costs time in proportion to the leads added or removed,
+    not to the size of the set, so the analytics tab and the CLI summary
+    read the current figures in constant time.
+    """
+
+    def __init__(self, bins: int = SCORE_BINS, max_score: float = MAX_SCORE):
+        self.count = 0
+        self.flags = {name: 0 for name in FLAG_COLUMNS}
+        self.score_total = 0.0
+        self.bin_edges = np.linspace(0, max_score, bins + 1)
+        self.score_histogram = np.zeros(bins, dtype=np.int64)
+        self.industries: Counter = Counter()
+        self.extraction_methods: Counter = Counter()
+        self.technologies: Counter = Counter()
+
+    @classmethod
+    def from_table(cls, table: LeadTable,
+                   rows: Optional[Union[np.ndarray, slice, Sequence[int]]] = None) -> 'LeadAggregates':
+        aggregates = cls()
+        aggregates.add_rows(table, slice(None) if rows is None else rows)
+        return aggregates
+
+    def _bin(self, scores: np.ndarray) -> np.ndarray:
+        bins = len(self.score_histogram)
+        return np.clip((np.asarray(scores) * (bins / self.bin_edges[-1])).astype(np.int64), 0, bins - 1)
+
+    @staticmethod
+    def _adjust(counter: Counter, values: Iterable[str], sign: int):
+        """Add (or with ``sign=-1`` subtract) occurrences, dropping entries that reach zero"""
+        for value, count in Counter(values).items():
+            counter[value] += sign * count
+            if not counter[value]:
+                del counter[value]
+
+    def add(self, lead: Lead, extraction_method: str = '', sign: int = 1):
+        """Account for one lead; ``sign=-1`` takes it back out"""
+        self.count += sign
+        for flag, field_name in FLAG_COLUMNS.items():
+            self.flags[flag] += sign * bool(getattr(lead, field_name))
+        self.score_total += sign * lead.confidence_score
+        self.score_histogram[self._bin([lead.confidence_score])[0]] += sign
+        self._adjust(self.industries, [lead.industry or ''], sign)
+        self._adjust(self.extraction_methods, [extraction_method or ''], sign)
+        self._adjust(self.technologies, technologies(lead.technology_stack), sign)
+        if not self.count:
+            self.score_total = 0.0
+
+    def remove(self, lead: Lead, extraction_method: str = ''):
+        self.add(lead, extraction_method, sign=-1)
+
+    def add_rows(self, table: LeadTable, rows: Union[np.ndarray, slice, Sequence[int]], sign: int = 1):
+        """Account for a selection of table rows at once: a boolean mask, index array or slice"""
+        rows = np.arange(len(table))[rows] if isinstance(rows, slice) else np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        if not len(rows):
+            return
+        self.count += sign * len(rows)
+        for flag in FLAG_COLUMNS:
+            self.flags[flag] += sign * int(table.flag(flag)[rows].sum())
+        scores = table.scores[rows]
+        self.score_total += sign * float(scores.sum(dtype=np.float64))
+        self.score_histogram += sign * np.bincount(self._bin(scores), minlength=len(self.score_histogram))
+        for name, counter in (('industry', self.industries), ('extraction_method', self.extraction_methods)):
+            counts = np.bincount(table.codes(name)[rows], minlength=len(table.categories[name].values))
+            self._adjust(counter, {table.categories[name].values[code]: int(counts[code])
+                                   for code in np.flatnonzero(counts)}, sign)
+        self._adjust(self.technologies,
+                     (tech for stack in table.text('technology_stack')[rows] if stack for tech in technologies(stack)),
+                     sign)
+        if not self.count:
+            self.score_total = 0.0
+
+    def remove_rows(self, table: LeadTable, rows: Union[np.ndarray, slice, Sequence[int]]):
+        self.add_rows(table, rows, sign=-1)
+
+    def rate(self, flag: str) -> float:
+        return self.flags[flag] / self.count if self.count else 0.0
+
+    @property
+    def average_score(self) -> float:
+        return self.score_total / self.count if self.count else 0.0
+
+    def industry_counts(self, unknown: str = 'Unknown') -> Dict[str, int]:
+        """Leads per industry, most common first, with a blank industry shown as ``unknown``"""
+        counts: Counter = Counter()
+        for industry, count in self.industries.items():
+            counts[industry or unknown] += count
+        return dict(counts.most_common())
+
+    def top_technologies(self, k: int = TOP_TECHNOLOGIES) -> List[Tuple[str, int]]:
+        return self.technologies.most_common(k)
+
+    def histogram(self) -> List[Tuple[str, int]]:
+        """Score bins as ('0-10', count) pairs"""
+        edges = self.bin_edges
+        return [(f"{edges[i]:.0f}-{edges[i + 1]:.0f}", int(count)) for i, count in enumerate(self.score_histogram)]
+
+    def snapshot(self) -> Dict:
+        return {
+            'leads': self.count,
+            'average_score': self.average_score,
+            'email_rate': self.rate('has_email'),
+            'phone_rate': self.rate('has_phone'),
+            'linkedin_rate': self.rate('has_linkedin'),
+            'industries': self.industry_counts(),
+            'score_histogram': dict(self.histogram()),
+            'top_technologies': dict(self.top_technologies())
+        }
+
+    def format(self, top: int = 3) -> str:
+        industries = ', '.join(f"{name} {count}" for name, count in list(self.industry_counts().items())[:top])
+        techs = ', '.join(f"{name} {count}" for name, count in self.top_technologies(top))
+        return (f"{self.count} leads, avg score {self.average_score:.1f}, email {self.rate('has_email'):.0%}, "
+                f"phone {self.rate('has_phone'):.0%}, linkedin {self.rate('has_linkedin'):.0%}"
+                + (f"; industries: {industries}" if industries else '')
+                + (f"; tech: {techs}" if techs else ''))
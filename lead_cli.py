@@ -0,0 +1,356 @@
+"""
+Lead CLI
+Author: Prakhar Madnani
+Headless batch runs: domains from files or stdin, NDJSON leads out, throughput metrics on stderr
+"""
+
+import argparse
+import csv
+import functools
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import asdict
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+import numpy as np
+
+from browser_pool import PLAYWRIGHT_AVAILABLE
+from page_readiness import READINESS_STRATEGIES
+from dns_preflight import DnsPreflight
+from enrichment_engine import DEFAULT_MAX_WORKERS, DEFAULT_PER_HOST_LIMIT, EnrichmentEngine
+from parsed_page import PARSER_BACKENDS, DEFAULT_PARSER
+from email_validation import DEFAULT_VALIDATION_MODE, MODE_SYNTAX, VALIDATION_MODES, get_email_validator
+from http_client import DEFAULT_MAX_BODY_BYTES, DEFAULT_POOL_MAXSIZE, get_http_client
+from lead_analytics import LeadAggregates
+from lead_enricher import LeadEnricher, LeadFilter, build_lead
+from lead_table import LeadTable
+from pipeline import LeadPipeline, PipelineEvent
+from run_journal import RunJournal, get_run_journal
+from scoring_engine import DEFAULT_PROFILE, SCORING, ScoringEngine
+
+DEFAULT_PROGRESS_INTERVAL_SECONDS = 10.0
+LATENCY_WINDOW = 1000
+EXIT_INTERRUPTED = 130
+
+# Options that decide what a run produces; a resumed run keeps the values it was started with
+RUN_SETTINGS = ('playwright', 'auto', 'email_validation', 'parser', 'min_score', 'industry',
+                'require_email', 'require_phone', 'require_linkedin', 'include_errors', 'weights', 'profile')
+
+
+def _csv_lines(f: Iterable[str], column: str) -> Iterator[str]:
+    reader = csv.DictReader(f)
+    if column not in (reader.fieldnames or []):
+        raise ValueError(f"column '{column}' not found; available: {', '.join(reader.fieldnames or [])}")
+    for row in reader:
+        value = row.get(column)
+        if value:
+            yield value
+
+
+def _stream_lines(f: Iterable[str], column: str, is_csv: Optional[bool]) -> Iterator[str]:
+    """Lines of a text stream, or one column of it when it is a CSV; sniffed from the header if not known"""
+    if is_csv is None:
+        f = iter(f)
+        first = next(f, '')
+        is_csv = column in next(csv.reader([first]), [])
+        f = itertools.chain([first], f)
+    if is_csv:
+        yield from _csv_lines(f, column)
+    else:
+        yield from f
+
+
+def read_domains(paths: Iterable[str], column: str = 'domain', stdin: Optional[TextIO] = None) -> Iterator[str]:
+    """Raw domain lines from every input in turn, read lazily; '-' is stdin"""
+    for path in paths:
+        if path == '-':
+            yield from _stream_lines(stdin or sys.stdin, column, None)
+            continue
+        is_csv = True if path.lower().endswith('.csv') else None
+        with open(path, encoding='utf-8', errors='replace', newline='') as f:
+            yield from _stream_lines(f, column, is_csv)
+
+
+def lead_record(event: PipelineEvent) -> Dict:
+    """One NDJSON line: the lead's fields plus how and how fast it was extracted"""
+    elapsed_ms = round(event.result.elapsed * 1000, 1)
+    if event.lead is None:
+        return {'domain': event.domain, 'error': event.company_info.get('error', ''), 'elapsed_ms': elapsed_ms}
+    record = asdict(event.lead)
+    record['extraction_method'] = event.company_info.get('extraction_method', 'BeautifulSoup')
+    record['elapsed_ms'] = elapsed_ms
+    return record
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ThroughputMeter:
+    """Running counts plus latency percentiles over the most recent domains, and aggregates of the qualified leads"""
+
+    def __init__(self, window: int = LATENCY_WINDOW, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.processed = 0
+        self.errors = 0
+        self.qualified = 0
+        self.latencies: deque = deque(maxlen=window)
+        self.aggregates = LeadAggregates()
+
+    def record(self, event: PipelineEvent):
+        self.processed += 1
+        self.latencies.append(event.result.elapsed)
+        if event.lead is None:
+            self.errors += 1
+        elif event.qualified:
+            self.qualified += 1
+            self.aggregates.add(event.lead, event.company_info.get('extraction_method', 'BeautifulSoup'))
+
+    def snapshot(self) -> Dict:
+        elapsed = max(self.clock() - self.started, 1e-9)
+        ordered = sorted(self.latencies)
+        return {
+            'processed': self.processed,
+            'qualified': self.qualified,
+            'errors': self.errors,
+            'error_rate': self.errors / self.processed if self.processed else 0.0,
+            'rate_per_second': self.processed / elapsed,
+            'p50_ms': _percentile(ordered, 0.50) * 1000,
+            'p95_ms': _percentile(ordered, 0.95) * 1000,
+            'elapsed_seconds': elapsed
+        }
+
+    def format(self) -> str:
+        s = self.snapshot()
+        return (f"{s['processed']} processed, {s['qualified']} qualified, {s['rate_per_second']:.1f}/s, "
+                f"errors {s['error_rate']:.1%}, p50 {s['p50_ms']:.0f} ms, p95 {s['p95_ms']:.0f} ms")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Enrich domains without the web UI and write qualified leads as NDJSON"
+    )
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help="Text or CSV files of domains; '-' or nothing reads stdin")
+    parser.add_argument('--column', default='domain', help="Domain column for CSV input (default: domain)")
+    parser.add_argument('-o', '--output', default='-', help="NDJSON output file (default: stdout)")
+
+    extraction = parser.add_argument_group('extraction')
+    mode = extraction.add_mutually_exclusive_group()
+    mode.add_argument('--playwright', action='store_true', help="Render every site in Chromium")
+    mode.add_argument('--auto', action='store_true',
+                      help="Fetch with requests first; render JavaScript shells and thin pages only")
+    extraction.add_argument('--readiness', choices=READINESS_STRATEGIES, help="Playwright page readiness strategy")
+    extraction.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent domains")
+    extraction.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST_LIMIT,
+                            help="Simultaneous requests to any single host")
+    extraction.add_argument('--pool-size', type=int, default=DEFAULT_POOL_MAXSIZE,
+                            help="Keep-alive connections kept per host")
+    extraction.add_argument('--max-page-kb', type=int, default=DEFAULT_MAX_BODY_BYTES // 1024,
+                            help="Stop downloading a homepage after this many kilobytes")
+    extraction.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER, help="HTML parser backend")
+    extraction.add_argument('--email-validation', choices=VALIDATION_MODES, default=DEFAULT_VALIDATION_MODE,
+                            help="'syntax' never touches DNS")
+    extraction.add_argument('--no-cache', action='store_true', help="Skip the response and result caches")
+    extraction.add_argument('--offline', action='store_true',
+                            help="Serve from the response cache only; uncached domains are reported as errors")
+
+    filters = parser.add_argument_group('filters')
+    filters.add_argument('--min-score', type=float, default=0, help="Minimum confidence score")
+    filters.add_argument('--industry', action='append', default=[], help="Keep only this industry (repeatable)")
+    filters.add_argument('--require-email', action='store_true')
+    filters.add_argument('--require-phone', action='store_true')
+    filters.add_argument('--require-linkedin', action='store_true')
+
+    scoring = parser.add_argument_group('scoring')
+    scoring.add_argument('--weights', metavar='PATH',
+                         help="Scoring weights JSON (default: config/scoring_weights.json)")
+    scoring.add_argument('--profile', default=DEFAULT_PROFILE,
+                         help=f"Weight profile to score with (default: {DEFAULT_PROFILE})")
+    scoring.add_argument('--rescore', metavar='RUN_ID',
+                         help="Rescore a journaled run, or 'all' for the latest lead of every domain, from stored "
+                              "features without fetching anything; writes the leads that qualify and exits")
+
+    report = parser.add_argument_group('reporting')
+    report.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL_SECONDS,
+                        help="Seconds between progress lines on stderr; 0 disables them")
+    report.add_argument('--include-errors', action='store_true',
+                        help="Also write failed domains, as records with an 'error' field")
+
+    journal = parser.add_argument_group('run journal')
+    journal.add_argument('--resume', metavar='RUN_ID',
+                         help="Finish an earlier run: only its pending domains are processed and "
+                              "new leads are appended to --output")
+    journal.add_argument('--runs', action='store_true', help="List recent runs and exit")
+    journal.add_argument('--export', metavar='RUN_ID', help="Write the qualified leads of a journaled run and exit")
+    journal.add_argument('--no-journal', action='store_true', help="Do not record this run; it cannot be resumed")
+    return parser
+
+
+def configure_enricher(args: argparse.Namespace, enricher: Optional[LeadEnricher] = None) -> LeadEnricher:
+    """Apply the command-line settings the sidebar would otherwise set"""
+    enricher = enricher or LeadEnricher()
+    enricher.http = get_http_client(pool_maxsize=args.pool_size)
+    enricher.max_body_bytes = args.max_page_kb * 1024
+    enricher.parser_backend = args.parser
+    if args.readiness:
+        enricher.readiness_strategy = args.readiness
+    enricher.use_response_cache = args.offline or not args.no_cache
+    enricher.use_result_cache = not args.no_cache
+    enricher.offline = args.offline
+    enricher.email_validator = get_email_validator(MODE_SYNTAX if args.offline else args.email_validation)
+    return enricher
+
+
+def load_scoring(args: argparse.Namespace) -> ScoringEngine:
+    scoring = ScoringEngine.load(args.weights) if args.weights else SCORING
+    if args.profile not in scoring.profiles:
+        raise ValueError(f"unknown scoring profile '{args.profile}'; available: {', '.join(scoring.profiles)}")
+    return scoring
+
+
+def lead_filter(args: argparse.Namespace) -> LeadFilter:
+    return LeadFilter(args.min_score, tuple(args.industry), args.require_email, args.require_phone,
+                      args.require_linkedin)
+
+
+def rescore(args: argparse.Namespace, journal: RunJournal, out: TextIO, err: TextIO = sys.stderr) -> int:
+    """Requalify stored leads under the current weights and filters; returns how many qualified"""
+    run_id = None if args.rescore == 'all' else args.rescore
+    if run_id is not None and journal.run(run_id) is None:
+        raise ValueError(f"no run with ID {run_id}")
+    table = LeadTable.from_records(journal.results(run_id, qualified_only=False))
+    started = time.monotonic()
+    rescored = table.rescore(load_scoring(args), args.profile)
+    before, after = table.mask(lead_filter(args)), rescored.mask(lead_filter(args))
+    elapsed = time.monotonic() - started
+
+    methods = rescored.category('extraction_method')
+    for i in np.flatnonzero(after):
+        record = asdict(rescored.lead(i))
+        record['extraction_method'] = methods[i]
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    unscored = int(np.isnan(table.features).any(axis=1).sum())
+    note = f" ({unscored} without stored features kept their scores)" if unscored else ''
+    print(f"✅ Rescored {len(table)} leads in {elapsed * 1000:.0f} ms: {int(before.sum())} qualified before, "
+          f"{int(after.sum())} after{note}", file=err, flush=True)
+    if after.any():
+        print(f"📊 {LeadAggregates.from_table(rescored, after).format()}", file=err, flush=True)
+    return int(after.sum())
+
+
+def run(args: argparse.Namespace, enricher: LeadEnricher, lines: Iterable[str], out: TextIO,
+        err: TextIO = sys.stderr, journal: Optional[RunJournal] = None,
+        run_id: Optional[str] = None) -> ThroughputMeter:
+    """Stream every domain through the pipeline, writing leads as they finish.
+
+    With a journal, ``lines`` is ignored: the run's pending domains are
+    processed and every outcome is recorded against ``run_id``.
+    """
+    if (args.playwright or args.auto) and not PLAYWRIGHT_AVAILABLE:
+        print("⚠️ Playwright is not installed; falling back to standard extraction", file=err)
+
+    engine = EnrichmentEngine(enricher, max_workers=max(1, args.workers), per_host_limit=max(1, args.per_host))
+    lead_pipeline = LeadPipeline(
+        engine,
+        build_lead=functools.partial(build_lead, scoring=load_scoring(args), profile=args.profile),
+        accept=lead_filter(args),
+        dns_preflight=None if enricher.offline else DnsPreflight(enricher.http.dns_cache)
+    )
+
+    if journal is not None:
+        journal.reopen(run_id)
+        lines = journal.pending(run_id)
+
+    meter = ThroughputMeter()
+    next_report = meter.started + args.progress_interval
+    try:
+        for event in lead_pipeline.run(lines, args.playwright, auto_escalate=args.auto):
+            meter.record(event)
+            record = lead_record(event)
+            if journal is not None:
+                journal.record(run_id, event, record)
+            if event.qualified or (args.include_errors and event.lead is None):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+            if args.progress_interval > 0 and meter.clock() >= next_report:
+                print(f"⏳ {meter.format()}", file=err, flush=True)
+                next_report = meter.clock() + args.progress_interval
+    finally:
+        if journal is not None:
+            journal.finish(run_id)
+        print(f"✅ {meter.format()}", file=err, flush=True)
+        if meter.aggregates.count:
+            print(f"📊 {meter.aggregates.format()}", file=err, flush=True)
+    return meter
+
+
+def print_runs(journal: RunJournal, out: TextIO):
+    for summary in journal.runs():
+        started = time.strftime('%Y-%m-%d %H:%M', time.localtime(summary.created_at))
+        print(f"{summary.run_id}  {started}  {summary.status:<11}  {summary.finished}/{summary.total} done, "
+              f"{summary.failed} failed, {summary.qualified} qualified  {summary.label}", file=out)
+
+
+def start_or_resume(args: argparse.Namespace, journal: RunJournal, err: TextIO = sys.stderr) -> str:
+    """Spool a new run from the inputs, or restore a resumed run's settings onto ``args``"""
+    if not args.resume:
+        settings = {name: getattr(args, name) for name in RUN_SETTINGS}
+        run_id = journal.start_run(read_domains(args.inputs, args.column), settings, label=' '.join(args.inputs))
+        print(f"📒 Run {run_id}: {journal.run(run_id).total} domains (resume with --resume {run_id})",
+              file=err, flush=True)
+        return run_id
+
+    summary = journal.run(args.resume)
+    if summary is None:
+        raise ValueError(f"no run with ID {args.resume}")
+    for name, value in summary.settings.items():
+        if name in RUN_SETTINGS:
+            setattr(args, name, value)
+    print(f"📒 Resuming run {summary.run_id}: {summary.finished}/{summary.total} done, {summary.pending} pending",
+          file=err, flush=True)
+    return summary.run_id
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.runs:
+        print_runs(get_run_journal(), sys.stdout)
+        return 0
+
+    journal = None if args.no_journal and not (args.resume or args.export or args.rescore) else get_run_journal()
+    out = sys.stdout if args.output == '-' else open(args.output, 'a' if args.resume else 'w', encoding='utf-8')
+    run_id = None
+    try:
+        if args.export:
+            for record in journal.results(args.export):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            return 0
+        if args.rescore:
+            rescore(args, journal, out)
+            return 0
+
+        run_id = start_or_resume(args, journal) if journal is not None else None
+        enricher = configure_enricher(args)
+        run(args, enricher, read_domains(args.inputs, args.column), out, journal=journal, run_id=run_id)
+    except KeyboardInterrupt:
+        if run_id:
+            print(f"⏸️ Interrupted; resume with --resume {run_id}", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,508 @@
+"""
+Lead Enricher
+Author: Prakhar Madnani
+Company enrichment and lead scoring without any UI dependency, shared by the web app and the batch CLI
+"""
+
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from browser_pool import PLAYWRIGHT_AVAILABLE, DEFAULT_LAUNCH_ARGS, get_browser_pool
+import contact_scanner
+import email_validation
+import http_client
+import keyword_matcher
+import page_readiness
+import parsed_page
+from page_readiness import READINESS_ADAPTIVE, goto_and_wait
+from response_cache import get_response_cache
+from result_cache import extractor_fingerprint, get_result_cache
+from dns_preflight import fetch_host
+from parsed_page import DEFAULT_PARSER, ParsedPage
+from keyword_matcher import KEYWORDS
+from contact_scanner import ContactScan, EMAIL_PATTERN, find_location, scan_page
+from scoring_engine import DEFAULT_PROFILE, SCORING, ScoringEngine
+from email_validation import MODE_SYNTAX, get_email_validator
+from http_client import DEFAULT_MAX_BODY_BYTES, HTML_CONTENT_TYPES, FetchedPage, get_http_client
+
+
+def _print_warning(message: str):
+    print(f"⚠️ {message}", file=sys.stderr)
+
+# Every module whose code shapes a cached company_info; editing any of them invalidates old results
+EXTRACTION_MODULES = (page_readiness, parsed_page, contact_scanner, keyword_matcher, email_validation, http_client)
+
+@lru_cache(maxsize=None)
+def _extractor_version(enricher_class: type) -> str:
+    """Result-cache version of an enricher class; hashing the sources once per process is enough"""
+    return extractor_fingerprint([enricher_class, *EXTRACTION_MODULES, KEYWORDS.version])
+
+# Pages with less visible text than this are candidates for browser rendering
+JS_SHELL_TEXT_THRESHOLD = 200
+JS_SHELL_MOUNT_POINTS = [
+    {'id': 'root'},
+    {'id': 'app'},
+    {'id': '__next'},
+    {'id': '__nuxt'},
+    {'id': 'svelte'},
+    {'attribute': 'ng-app'},
+    {'attribute': 'data-reactroot'},
+    {'tag': 'app-root'}
+]
+JS_FRAMEWORK_BUNDLE_MARKERS = [
+    '/_next/', '/_nuxt/', 'main.', 'bundle.', 'chunk', 'runtime.', 'polyfills.',
+    'react', 'vue', 'angular', 'svelte', 'app.js'
+]
+
+@dataclass(slots=True)
+class Lead:
+    company_name: str
+    domain: str
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    industry: str = ""
+    employee_count: str = ""
+    revenue_estimate: str = ""
+    location: str = ""
+    description: str = ""
+    confidence_score: float = 0.0
+    technology_stack: str = ""
+    # Scoring inputs as laid out in scoring_engine.VECTOR_FEATURES, kept so leads can be rescored offline
+    features: List[float] = field(default_factory=list)
+
+def build_lead(domain: str, company_info: Dict, scoring: ScoringEngine = SCORING,
+               profile: str = DEFAULT_PROFILE) -> Lead:
+    """Turn a successful enrichment result into a scored Lead that keeps its feature vector"""
+    batch = scoring.features([company_info], [domain])
+    confidence = float(scoring.score(batch, profile)[0])
+    
+    return Lead(
+        company_name=company_info.get('title', domain).split('|')[0].strip() or domain,
+        domain=domain,
+        email=company_info.get('emails', [''])[0] if company_info.get('emails') else '',
+        phone=company_info.get('phones', [''])[0] if company_info.get('phones') else '',
+        linkedin=company_info.get('linkedin', ''),
+        industry=company_info.get('industry', ''),
+        location=company_info.get('location', ''),
+        description=company_info.get('description', ''),
+        confidence_score=confidence,
+        technology_stack=company_info.get('technology_stack', ''),
+        features=batch.vectors()[0].tolist()
+    )
+
+@dataclass(frozen=True)
+class LeadFilter:
+    """Qualification rules shared by the sidebar filters and the CLI flags"""
+    min_confidence: float = 0
+    industries: Tuple[str, ...] = ()
+    require_email: bool = False
+    require_phone: bool = False
+    require_linkedin: bool = False
+    
+    def __call__(self, lead: Lead) -> bool:
+        if lead.confidence_score < self.min_confidence:
+            return False
+        
+        if self.industries and lead.industry not in self.industries:
+            return False
+        
+        if self.require_email and not lead.email:
+            return False
+        if self.require_phone and not lead.phone:
+            return False
+        if self.require_linkedin and not lead.linkedin:
+            return False
+        
+        return True
+
+class LeadEnricher:
+    def __init__(self):
+        self.http = get_http_client()
+        self.email_validator = get_email_validator()
+        self.max_body_bytes = DEFAULT_MAX_BODY_BYTES
+        self.parser_backend = DEFAULT_PARSER
+        self._current_domain = ""
+        self.browser_pool = get_browser_pool(
+            launch_args=DEFAULT_LAUNCH_ARGS + ['--disable-web-security']
+        )
+        self.readiness_strategy = READINESS_ADAPTIVE
+        self.response_cache = get_response_cache()
+        self.use_response_cache = True
+        # Cache-only mode for this enricher; the response cache itself is shared by every session
+        self.offline = False
+        self.result_cache = get_result_cache(_extractor_version(type(self)))
+        self.use_result_cache = True
+        self.warn = _print_warning
+    
+    def extract_company_info(self, domain: str, use_playwright: bool = False,
+                             auto_escalate: bool = False) -> Dict:
+        if not self.use_result_cache:
+            return self._extract_uncached(domain, use_playwright, auto_escalate)
+        
+        if auto_escalate and not use_playwright:
+            method = 'auto'
+        else:
+            method = 'playwright' if use_playwright and PLAYWRIGHT_AVAILABLE else 'requests'
+        if self.email_validator.offline:
+            # Syntax-only validation keeps addresses a deliverability check would drop
+            method += f"+{MODE_SYNTAX}"
+        # Parser backends differ in edge cases, so each keeps its own results
+        method += f"+{self.parser_backend}"
+        
+        cached = self.result_cache.get(domain, method)
+        if cached is not None:
+            return cached
+        
+        company_info = self._extract_uncached(domain, use_playwright, auto_escalate)
+        if 'error' not in company_info:
+            self.result_cache.put(domain, method, company_info)
+        return company_info
+    
+    def _extract_uncached(self, domain: str, use_playwright: bool, auto_escalate: bool) -> Dict:
+        self._current_domain = domain
+        
+        dead_reason = self.http.dns_cache.dead_reason(fetch_host(domain))
+        if dead_reason:
+            return {'domain': domain, 'error': dead_reason, 'dns_failure': True}
+        
+        if self.use_response_cache and self.offline:
+            # Offline runs never touch the network, so there is nothing for a browser to render
+            return self._extract_with_requests(domain)
+        
+        if auto_escalate and not use_playwright:
+            return self._extract_tiered(domain)
+        
+        if use_playwright and PLAYWRIGHT_AVAILABLE:
+            try:
+                return self._extract_with_playwright(domain)
+            except Exception as e:
+                self.warn(f"Playwright extraction failed for {domain}, using standard method: {str(e)}")
+                return self._extract_with_requests(domain)
+        else:
+            return self._extract_with_requests(domain)
+    
+    def _extract_tiered(self, domain: str) -> Dict:
+        """Fetch with requests first and only pay for a browser when the page looks like a JS shell"""
+        company_info = self._extract_with_requests(domain, detect_js_shell=True)
+        reason = company_info.pop('js_shell_reason', '')
+        
+        if 'error' in company_info or not reason or not PLAYWRIGHT_AVAILABLE:
+            return company_info
+        
+        try:
+            escalated = self._extract_with_playwright(domain)
+        except Exception as e:
+            self.warn(f"Escalation to Playwright failed for {domain}, keeping standard result: {str(e)}")
+            return company_info
+        
+        escalated['escalation_reason'] = reason
+        return escalated
+    
+    def _detect_js_shell(self, page: ParsedPage) -> str:
+        """Return why a requests-fetched page needs a browser, or '' if its HTML is usable"""
+        text_length = len(page.visible_text)
+        
+        if text_length < JS_SHELL_TEXT_THRESHOLD:
+            for mount_point in JS_SHELL_MOUNT_POINTS:
+                if page.has_element(**mount_point):
+                    return 'spa_root'
+            for src in page.script_srcs:
+                src = src.lower()
+                if any(marker in src for marker in JS_FRAMEWORK_BUNDLE_MARKERS):
+                    return 'framework_bundle'
+            return 'empty_body' if text_length == 0 else 'thin_content'
+        
+        if not page.anchors:
+            return 'no_anchors'
+        
+        return ''
+    
+    def _extract_with_playwright(self, domain: str) -> Dict:
+        try:
+            scraped = self.browser_pool.run(self._scrape_page, domain)
+            title = scraped['title']
+            content = scraped['content']
+            emails = scraped['emails']
+            phones = scraped['phones']
+            tech_stack = scraped['tech_stack']
+            for tech in self._detect_technologies(scraped['script_urls']):
+                if tech not in tech_stack:
+                    tech_stack.append(tech)
+            
+            page = ParsedPage(content, domain, backend=self.parser_backend)
+            contacts = scan_page(page)
+            
+            if not emails:
+                emails = self._extract_emails_fallback(domain, page.visible_text)
+            
+            company_info = {
+                'domain': domain,
+                'title': self._clean_title(title),
+                'description': self._extract_meta_description(page),
+                'emails': emails,
+                'phones': phones[:2],
+                'linkedin': self._extract_linkedin(contacts, domain),
+                'industry': self._classify_industry(page.text_lower, domain),
+                'location': self._extract_location(page),
+                'technology_stack': ', '.join(tech_stack),
+                'extraction_method': 'Playwright',
+                'blocked_requests': scraped['blocked_requests']
+            }
+            company_info.update(scraped['readiness'])
+            return company_info
+            
+        except Exception as e:
+            raise Exception(f"Playwright extraction failed: {str(e)}")
+    
+    async def _scrape_page(self, session) -> Dict:
+        """Runs on the browser pool's event loop against a fresh pooled page"""
+        page = session.page
+        
+        domain = session.domain
+        url = f"https://{domain}" if not domain.startswith('http') else domain
+        readiness = await goto_and_wait(page, url, self.readiness_strategy)
+        
+        title = await page.title()
+        content = await page.content()
+        
+        emails = await page.evaluate("""
+            () => {
+                const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
+                
+                const sources = [
+                    document.body.innerText || '',
+                    document.body.textContent || '',
+                    document.documentElement.innerHTML || ''
+                ];
+                
+                const allEmails = new Set();
+                
+                sources.forEach(text => {
+                    const matches = text.match(emailRegex) || [];
+                    matches.forEach(email => {
+                        const lowerEmail = email.toLowerCase();
+                        if (!lowerEmail.includes('example') && 
+                            !lowerEmail.includes('test') && 
+                            !lowerEmail.includes('sample') &&
+                            !lowerEmail.includes('.png') &&
+                            !lowerEmail.includes('.jpg') &&
+                            lowerEmail.length > 5) {
+                            allEmails.add(email);
+                        }
+                    });
+                });
+                
+                const mailtoLinks = Array.from(document.querySelectorAll('a[href^="mailto:"]'));
+                mailtoLinks.forEach(link => {
+                    const email = link.href.replace('mailto:', '').split('?')[0];
+                    if (email && email.includes('@')) {
+                        allEmails.add(email);
+                    }
+                });
+                
+                const domain = window.location.hostname;
+                const commonPatterns = ['support@', 'contact@', 'hello@', 'info@', 'sales@'];
+                
+                commonPatterns.forEach(pattern => {
+                    const email = pattern + domain;
+                    sources.forEach(text => {
+                        if (text.toLowerCase().includes(email.toLowerCase())) {
+                            allEmails.add(email);
+                        }
+                    });
+                });
+                
+                return Array.from(allEmails).slice(0, 5);
+            }
+        """)
+        
+        phones = await page.evaluate("""
+            () => {
+                const phoneRegex = /(\\+?\\d{1,3}[-.]?)?\\(?\\d{3}\\)?[-.]?\\d{3}[-.]?\\d{4}/g;
+                const text = document.body.innerText || '';
+                const phones = text.match(phoneRegex) || [];
+                return [...new Set(phones)].slice(0, 3);
+            }
+        """)
+        
+        tech_stack = await page.evaluate("""
+            () => {
+                const scripts = Array.from(document.querySelectorAll('script[src]'));
+                const technologies = [];
+                
+                scripts.forEach(script => {
+                    const src = script.src.toLowerCase();
+                    if (src.includes('react')) technologies.push('React');
+                    if (src.includes('angular')) technologies.push('Angular');
+                    if (src.includes('vue')) technologies.push('Vue.js');
+                    if (src.includes('jquery')) technologies.push('jQuery');
+                    if (src.includes('bootstrap')) technologies.push('Bootstrap');
+                    if (src.includes('analytics')) technologies.push('Analytics');
+                });
+                
+                return [...new Set(technologies)];
+            }
+        """)
+        
+        return {
+            'title': title,
+            'content': content,
+            'emails': emails,
+            'phones': phones,
+            'tech_stack': tech_stack,
+            'script_urls': session.script_urls,
+            'blocked_requests': session.blocked_requests,
+            'readiness': readiness.as_dict()
+        }
+    
+    def _detect_technologies(self, script_urls: List[str]) -> List[str]:
+        """Tech detection over every script request seen, including ones the blocking policy aborted"""
+        signatures = [
+            ('react', 'React'),
+            ('angular', 'Angular'),
+            ('vue', 'Vue.js'),
+            ('jquery', 'jQuery'),
+            ('bootstrap', 'Bootstrap'),
+            ('analytics', 'Analytics')
+        ]
+        
+        technologies = []
+        for src in script_urls:
+            src = src.lower()
+            for needle, tech in signatures:
+                if needle in src and tech not in technologies:
+                    technologies.append(tech)
+        return technologies
+    
+    def _fetch(self, url: str) -> FetchedPage:
+        options = {'max_bytes': self.max_body_bytes, 'content_types': HTML_CONTENT_TYPES}
+        if self.use_response_cache:
+            response = self.response_cache.get(self.http, url, timeout=10, offline=self.offline, **options)
+        else:
+            response = self.http.get(url, timeout=10, **options)
+        return FetchedPage.from_response(response)
+    
+    def _extract_with_requests(self, domain: str, detect_js_shell: bool = False) -> Dict:
+        try:
+            url = f"https://{domain}" if not domain.startswith('http') else domain
+            fetched = self._fetch(url)
+            fetched.raise_for_status()
+            page = ParsedPage(fetched.text, fetched.url, backend=self.parser_backend)
+            contacts = scan_page(page)
+            
+            company_info = {
+                'domain': domain,
+                'title': self._clean_title(page.title),
+                'description': self._extract_meta_description(page),
+                'emails': self._filter_emails(contacts.emails),
+                'phones': contacts.phones[:2],
+                'linkedin': self._extract_linkedin(contacts, domain),
+                'industry': self._classify_industry(page.text_lower, domain),
+                'location': self._extract_location(page),
+                'technology_stack': '',
+                'extraction_method': 'BeautifulSoup'
+            }
+            if fetched.truncated:
+                company_info['truncated_bytes'] = fetched.size
+            if detect_js_shell:
+                company_info['js_shell_reason'] = self._detect_js_shell(page)
+            return company_info
+            
+        except Exception as e:
+            return {'domain': domain, 'error': str(e)}
+    
+    def _extract_emails_fallback(self, domain, content):
+        emails = []
+        
+        common_patterns = [
+            f'support@{domain}',
+            f'contact@{domain}', 
+            f'hello@{domain}',
+            f'info@{domain}',
+            f'sales@{domain}',
+            f'help@{domain}'
+        ]
+        
+        content_lower = content.lower()
+        
+        for pattern in common_patterns:
+            if pattern in content_lower:
+                emails.append(pattern)
+        
+        for email in EMAIL_PATTERN.findall(content):
+            if not any(skip in email.lower() for skip in ['example', 'test', 'sample', '.png', '.jpg']):
+                emails.append(email)
+        
+        return list(set(emails))[:3]
+    
+    def _clean_title(self, title: str) -> str:
+        if not title:
+            return ""
+        title = title.split('|')[0].split('-')[0].strip()
+        return title[:100]
+    
+    def _extract_meta_description(self, page: ParsedPage) -> str:
+        return page.description[:200]
+    
+    def _filter_emails(self, emails: List[str]) -> List[str]:
+        candidates = [email for email in emails
+                      if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support'])]
+        return self.email_validator.valid(candidates)[:3]
+    
+    def _extract_linkedin(self, contacts: ContactScan, domain: str) -> str:
+        if contacts.linkedin:
+            return contacts.linkedin
+        
+        domain_linkedin_map = {
+            'stripe.com': 'https://linkedin.com/company/stripe',
+            'zoom.us': 'https://linkedin.com/company/zoom',
+            'notion.so': 'https://linkedin.com/company/notion',
+            'github.com': 'https://linkedin.com/company/github',
+            'shopify.com': 'https://linkedin.com/company/shopify',
+            'salesforce.com': 'https://linkedin.com/company/salesforce',
+            'hubspot.com': 'https://linkedin.com/company/hubspot',
+            'slack.com': 'https://linkedin.com/company/slack'
+        }
+        
+        if domain in domain_linkedin_map:
+            return domain_linkedin_map[domain]
+        
+        return ''
+    
+    def _classify_industry(self, text_lower: str, domain: str) -> str:
+        domain_mappings = {
+            'stripe.com': 'Fintech',
+            'stripe': 'Fintech',
+            'zoom.us': 'Communication',
+            'zoom': 'Communication',
+            'notion.so': 'Productivity', 
+            'notion': 'Productivity',
+            'github.com': 'Developer Tools',
+            'github': 'Developer Tools',
+            'shopify.com': 'E-commerce',
+            'shopify': 'E-commerce',
+            'salesforce.com': 'CRM/Software',
+            'salesforce': 'CRM/Software',
+            'hubspot.com': 'Marketing',
+            'hubspot': 'Marketing',
+            'slack.com': 'Communication',
+            'slack': 'Communication'
+        }
+        
+        domain_lower = domain.lower()
+        for domain_key, industry in domain_mappings.items():
+            if domain_key in domain_lower:
+                return industry
+        
+        return KEYWORDS['lead_generator.industry'].best(KEYWORDS.count(text_lower))
+    
+    def _extract_location(self, page: ParsedPage) -> str:
+        for address in page.json_ld_values('address'):
+            if isinstance(address, dict) and address.get('addressLocality'):
+                region = address.get('addressRegion')
+                return f"{address['addressLocality']}, {region}" if region else address['addressLocality']
+        
+        return find_location(page.visible_text)
@@ -1,484 +1,41 @@
 import streamlit as st
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import re
+import numpy as np
 import time
-from typing import Dict, List, Optional
+import json
 import plotly.express as px
-from urllib.parse import urljoin, urlparse
-import concurrent.futures
-from dataclasses import dataclass
-from email_validator import validate_email, EmailNotValidError
-import asyncio
-import platform
+import threading
+from enrichment_engine import EnrichmentEngine, DEFAULT_MAX_WORKERS, DEFAULT_PER_HOST_LIMIT
+from pipeline import LeadPipeline
+from browser_pool import PLAYWRIGHT_AVAILABLE
+from page_readiness import READINESS_STRATEGIES
+from dns_preflight import DnsPreflight
+from parsed_page import PARSER_BACKENDS, DEFAULT_PARSER
+from email_validation import MODE_SYNTAX, VALIDATION_MODES, DEFAULT_VALIDATION_MODE, get_email_validator
+from http_client import HTTP2_AVAILABLE, DEFAULT_POOL_MAXSIZE, DEFAULT_MAX_BODY_BYTES, get_http_client
+from lead_enricher import LeadEnricher, LeadFilter, build_lead
+from run_journal import get_run_journal
+from lead_table import LeadTable
+from lead_analytics import LeadAggregates
+from scoring_engine import SCORING, DEFAULT_PROFILE
 
-if platform.system() == 'Windows':
-    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-
-try:
-    loop = asyncio.get_event_loop()
-    if loop.is_closed():
-        asyncio.set_event_loop(asyncio.new_event_loop())
-except RuntimeError:
-    asyncio.set_event_loop(asyncio.new_event_loop())
-
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-
-def calculate_confidence_score(company_info, domain):
-    score = 0
-    
-    emails = company_info.get('emails', [])
-    if emails and len(emails) > 0:
-        score += 40
-    else:
-        score += 5
-    
-    phones = company_info.get('phones', [])
-    if phones and len(phones) > 0:
-        score += 15
-        
-    desc = company_info.get('description', '')
-    if desc and len(desc) > 50:
-        score += 15
-        
-    tech_stack = company_info.get('technology_stack', '')
-    if tech_stack and tech_stack.strip():
-        score += 10
-        
-    industry = company_info.get('industry', '')
-    high_value_domains = {
-        'stripe.com': 'Fintech',
-        'zoom.us': 'Communication', 
-        'notion.so': 'Productivity',
-        'github.com': 'Developer Tools',
-        'shopify.com': 'E-commerce',
-        'salesforce.com': 'CRM/Software',
-        'hubspot.com': 'Marketing',
-        'slack.com': 'Communication'
-    }
-    
-    if domain in high_value_domains:
-        score += 10
-    elif industry and industry != 'Other':
-        score += 5
-        
-    linkedin = company_info.get('linkedin', '')
-    if linkedin and linkedin.strip():
-        score += 10
-    elif domain in high_value_domains:
-        score += 5
-    
-    return min(score, 100)
-
-@dataclass
-class Lead:
-    company_name: str
-    domain: str
-    email: str = ""
-    phone: str = ""
-    linkedin: str = ""
-    industry: str = ""
-    employee_count: str = ""
-    revenue_estimate: str = ""
-    location: str = ""
-    description: str = ""
-    confidence_score: float = 0.0
-    technology_stack: str = ""
-
-class LeadEnricher:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self._current_domain = ""
-    
-    def extract_company_info(self, domain: str, use_playwright: bool = False) -> Dict:
-        self._current_domain = domain
-        
-        if use_playwright and PLAYWRIGHT_AVAILABLE:
-            try:
-                return self._extract_with_playwright(domain)
-            except Exception as e:
-                st.warning(f"Playwright extraction failed for {domain}, using standard method: {str(e)}")
-                return self._extract_with_requests(domain)
-        else:
-            return self._extract_with_requests(domain)
-    
-    def _extract_with_playwright(self, domain: str) -> Dict:
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-web-security']
-                )
-                
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                
-                page = context.new_page()
-                
-                url = f"https://{domain}" if not domain.startswith('http') else domain
-                page.goto(url, wait_until='networkidle', timeout=30000)
-                page.wait_for_timeout(3000)
-                
-                title = page.title()
-                content = page.content()
-                
-                emails = page.evaluate("""
-                    () => {
-                        const emailRegex = /[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/g;
-                        
-                        const sources = [
-                            document.body.innerText || '',
-                            document.body.textContent || '',
-                            document.documentElement.innerHTML || ''
-                        ];
-                        
-                        const allEmails = new Set();
-                        
-                        sources.forEach(text => {
-                            const matches = text.match(emailRegex) || [];
-                            matches.forEach(email => {
-                                const lowerEmail = email.toLowerCase();
-                                if (!lowerEmail.includes('example') && 
-                                    !lowerEmail.includes('test') && 
-                                    !lowerEmail.includes('sample') &&
-                                    !lowerEmail.includes('.png') &&
-                                    !lowerEmail.includes('.jpg') &&
-                                    lowerEmail.length > 5) {
-                                    allEmails.add(email);
-                                }
-                            });
-                        });
-                        
-                        const mailtoLinks = Array.from(document.querySelectorAll('a[href^="mailto:"]'));
-                        mailtoLinks.forEach(link => {
-                            const email = link.href.replace('mailto:', '').split('?')[0];
-                            if (email && email.includes('@')) {
-                                allEmails.add(email);
-                            }
-                        });
-                        
-                        const domain = window.location.hostname;
-                        const commonPatterns = ['support@', 'contact@', 'hello@', 'info@', 'sales@'];
-                        
-                        commonPatterns.forEach(pattern => {
-                            const email = pattern + domain;
-                            sources.forEach(text => {
-                                if (text.toLowerCase().includes(email.toLowerCase())) {
-                                    allEmails.add(email);
-                                }
-                            });
-                        });
-                        
-                        return Array.from(allEmails).slice(0, 5);
-                    }
-                """)
-                
-                phones = page.evaluate("""
-                    () => {
-                        const phoneRegex = /(\\+?\\d{1,3}[-.]?)?\\(?\\d{3}\\)?[-.]?\\d{3}[-.]?\\d{4}/g;
-                        const text = document.body.innerText || '';
-                        const phones = text.match(phoneRegex) || [];
-                        return [...new Set(phones)].slice(0, 3);
-                    }
-                """)
-                
-                tech_stack = page.evaluate("""
-                    () => {
-                        const scripts = Array.from(document.querySelectorAll('script[src]'));
-                        const technologies = [];
-                        
-                        scripts.forEach(script => {
-                            const src = script.src.toLowerCase();
-                            if (src.includes('react')) technologies.push('React');
-                            if (src.includes('angular')) technologies.push('Angular');
-                            if (src.includes('vue')) technologies.push('Vue.js');
-                            if (src.includes('jquery')) technologies.push('jQuery');
-                            if (src.includes('bootstrap')) technologies.push('Bootstrap');
-                            if (src.includes('analytics')) technologies.push('Analytics');
-                        });
-                        
-                        return [...new Set(technologies)];
-                    }
-                """)
-                
-                browser.close()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                if not emails:
-                    emails = self._extract_emails_fallback(domain, content)
-                
-                return {
-                    'domain': domain,
-                    'title': self._clean_title(title),
-                    'description': self._extract_meta_description(soup),
-                    'emails': emails,
-                    'phones': phones[:2],
-                    'linkedin': self._extract_linkedin(soup, domain),
-                    'industry': self._classify_industry(content, domain),
-                    'location': self._extract_location(soup, content),
-                    'technology_stack': ', '.join(tech_stack),
-                    'extraction_method': 'Playwright'
-                }
-                
-        except Exception as e:
-            raise Exception(f"Playwright extraction failed: {str(e)}")
-    
-    def _extract_with_requests(self, domain: str) -> Dict:
-        try:
-            url = f"https://{domain}" if not domain.startswith('http') else domain
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            return {
-                'domain': domain,
-                'title': self._clean_title(soup.title.string if soup.title else ""),
-                'description': self._extract_meta_description(soup),
-                'emails': self._extract_emails(soup, response.text),
-                'phones': self._extract_phones(response.text),
-                'linkedin': self._extract_linkedin(soup, domain),
-                'industry': self._classify_industry(response.text, domain),
-                'location': self._extract_location(soup, response.text),
-                'technology_stack': '',
-                'extraction_method': 'BeautifulSoup'
-            }
-            
-        except Exception as e:
-            return {'domain': domain, 'error': str(e)}
-    
-    def _extract_emails_fallback(self, domain, content):
-        emails = []
-        
-        common_patterns = [
-            f'support@{domain}',
-            f'contact@{domain}', 
-            f'hello@{domain}',
-            f'info@{domain}',
-            f'sales@{domain}',
-            f'help@{domain}'
-        ]
-        
-        content_lower = content.lower()
-        
-        for pattern in common_patterns:
-            if pattern in content_lower:
-                emails.append(pattern)
-        
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        found_emails = re.findall(email_pattern, content)
-        
-        for email in found_emails:
-            if not any(skip in email.lower() for skip in ['example', 'test', 'sample', '.png', '.jpg']):
-                emails.append(email)
-        
-        return list(set(emails))[:3]
-    
-    def _clean_title(self, title: str) -> str:
-        if not title:
-            return ""
-        title = title.split('|')[0].split('-')[0].strip()
-        return title[:100]
-    
-    def _extract_meta_description(self, soup: BeautifulSoup) -> str:
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            return meta_desc.get('content')[:200]
-        return ''
-    
-    def _extract_emails(self, soup: BeautifulSoup, text: str) -> List[str]:
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return self._filter_emails(emails)
-    
-    def _filter_emails(self, emails: List[str]) -> List[str]:
-        valid_emails = []
-        for email in set(emails):
-            try:
-                validate_email(email)
-                if not any(skip in email.lower() for skip in ['example', 'test', 'sample', 'noreply', 'support']):
-                    valid_emails.append(email)
-                    if len(valid_emails) >= 3:
-                        break
-            except EmailNotValidError:
-                continue
-        return valid_emails
-    
-    def _extract_phones(self, text: str) -> List[str]:
-        phone_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b',
-            r'\b\+\d{1,3}[-.]?\d{3,4}[-.]?\d{3,4}[-.]?\d{3,4}\b'
-        ]
-        
-        phones = []
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, text))
-            if len(phones) >= 2:
-                break
-        
-        return list(set(phones))[:2]
-    
-    def _extract_linkedin(self, soup: BeautifulSoup, domain: str) -> str:
-        linkedin_patterns = [
-            r'linkedin\.com/company/[^"\s]+',
-            r'linkedin\.com/in/[^"\s]+',
-            r'www\.linkedin\.com/company/[^"\s]+'
-        ]
-        
-        all_links = soup.find_all('a', href=True)
-        for link in all_links:
-            href = link.get('href', '')
-            for pattern in linkedin_patterns:
-                match = re.search(pattern, href)
-                if match:
-                    return f"https://{match.group(0)}" if not match.group(0).startswith('http') else match.group(0)
-        
-        page_text = soup.get_text()
-        for pattern in linkedin_patterns:
-            match = re.search(pattern, page_text)
-            if match:
-                return f"https://{match.group(0)}"
-        
-        domain_linkedin_map = {
-            'stripe.com': 'https://linkedin.com/company/stripe',
-            'zoom.us': 'https://linkedin.com/company/zoom',
-            'notion.so': 'https://linkedin.com/company/notion',
-            'github.com': 'https://linkedin.com/company/github',
-            'shopify.com': 'https://linkedin.com/company/shopify',
-            'salesforce.com': 'https://linkedin.com/company/salesforce',
-            'hubspot.com': 'https://linkedin.com/company/hubspot',
-            'slack.com': 'https://linkedin.com/company/slack'
-        }
-        
-        if domain in domain_linkedin_map:
-            return domain_linkedin_map[domain]
-        
-        return ''
-    
-    def _classify_industry(self, text: str, domain: str) -> str:
-        domain_mappings = {
-            'stripe.com': 'Fintech',
-            'stripe': 'Fintech',
-            'zoom.us': 'Communication',
-            'zoom': 'Communication',
-            'notion.so': 'Productivity', 
-            'notion': 'Productivity',
-            'github.com': 'Developer Tools',
-            'github': 'Developer Tools',
-            'shopify.com': 'E-commerce',
-            'shopify': 'E-commerce',
-            'salesforce.com': 'CRM/Software',
-            'salesforce': 'CRM/Software',
-            'hubspot.com': 'Marketing',
-            'hubspot': 'Marketing',
-            'slack.com': 'Communication',
-            'slack': 'Communication'
-        }
-        
-        domain_lower = domain.lower()
-        for domain_key, industry in domain_mappings.items():
-            if domain_key in domain_lower:
-                return industry
-        
-        text_lower = text.lower()
-        
-        industry_keywords = {
-            'Fintech': {
-                'primary': ['stripe', 'payment', 'fintech', 'banking', 'finance', 'credit card', 'transaction', 'billing', 'checkout'],
-                'secondary': ['money', 'pay', 'invoice', 'merchant', 'processing'],
-                'weight': 3.0
-            },
-            'Communication': {
-                'primary': ['zoom', 'video', 'meeting', 'conference', 'communication', 'chat', 'messaging'],
-                'secondary': ['call', 'webinar', 'collaboration', 'remote', 'voice'],
-                'weight': 3.0
-            },
-            'Productivity': {
-                'primary': ['notion', 'productivity', 'workspace', 'notes', 'organize', 'document'],
-                'secondary': ['task', 'project', 'collaboration', 'wiki'],
-                'weight': 2.5
-            },
-            'Developer Tools': {
-                'primary': ['github', 'developer', 'code', 'programming', 'repository', 'git'],
-                'secondary': ['api', 'development', 'coding', 'software development'],
-                'weight': 2.5
-            },
-            'E-commerce': {
-                'primary': ['shopify', 'ecommerce', 'e-commerce', 'online store', 'retail', 'marketplace'],
-                'secondary': ['shop', 'store', 'cart', 'checkout', 'product', 'buy', 'sell'],
-                'weight': 2.0
-            },
-            'SaaS/Software': {
-                'primary': ['saas', 'software', 'platform', 'cloud', 'application'],
-                'secondary': ['subscription', 'dashboard', 'integration', 'automation'],
-                'weight': 1.5
-            },
-            'Marketing': {
-                'primary': ['hubspot', 'marketing', 'advertising', 'campaign', 'lead generation'],
-                'secondary': ['seo', 'social media', 'analytics', 'crm'],
-                'weight': 1.5
-            }
-        }
-        
-        industry_scores = {}
-        
-        for industry, data in industry_keywords.items():
-            score = 0
-            
-            for keyword in data['primary']:
-                count = text_lower.count(keyword)
-                if count > 0:
-                    score += count * 5 * data['weight']
-            
-            for keyword in data['secondary']:
-                count = text_lower.count(keyword)
-                if count > 0:
-                    score += count * 1 * data['weight']
-            
-            if score > 0:
-                industry_scores[industry] = score
-        
-        if industry_scores:
-            best_industry = max(industry_scores, key=industry_scores.get)
-            return best_industry
-        
-        return 'Other'
-    
-    def _extract_location(self, soup: BeautifulSoup, text: str) -> str:
-        location_patterns = [
-            r'(?:located in|based in|headquarters in)\s+([A-Z][a-z]+(?:,\s*[A-Z]{2})?)',
-            r'([A-Z][a-z]+,\s*[A-Z]{2})\s*\d{5}',
-            r'([A-Z][a-z]+(?:,\s*[A-Z][a-z]+)*)\s*office'
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                location = matches[0] if isinstance(matches[0], str) else matches[0][0]
-                if location.lower() != 'offices':
-                    return location
-        
-        return ''
-
-class LeadScorer:
-    @staticmethod
-    def calculate_confidence_score(lead_data: Dict) -> float:
-        return 50.0
+# Streaming discovery: redraw the live table at most this often and only with the newest rows
+LIVE_RENDER_INTERVAL_SECONDS = 0.5
+LIVE_TABLE_ROWS = 200
+MAX_DETAIL_EXPANDERS = 100
+CSV_CHUNK_ROWS = 10000
+RUN_HISTORY_LIMIT = 20
+# Between runs the discovery tab previews this many of the leads passing the sidebar filters
+FILTERED_PREVIEW_ROWS = 1000
 
 class LeadGeneratorApp:
     def __init__(self):
-        self.enricher = LeadEnricher()
-        self.scorer = LeadScorer()
+        # Streamlit re-executes this script on every interaction. The enricher is built once per session;
+        # its HTTP client, browser pool, caches and matchers are process-wide and shared by all sessions.
+        if 'enricher' not in st.session_state:
+            st.session_state['enricher'] = LeadEnricher()
+            st.session_state['enricher'].warn = st.warning
+        self.enricher = st.session_state['enricher']
         
     def run(self):
         st.set_page_config(
@@ -495,17 +52,99 @@ class LeadGeneratorApp:
             st.header("⚙️ Settings")
             
             if PLAYWRIGHT_AVAILABLE:
-                use_playwright = st.checkbox(
-                    "🚀 Use Playwright (JavaScript Sites)",
-                    value=False,
-                    help="Enable for modern JavaScript-heavy websites (React, Vue, Angular)"
+                extraction_mode = st.radio(
+                    "Extraction Mode",
+                    ["Standard", "🚀 Playwright (JavaScript Sites)", "⚡ Auto"],
+                    help="Auto fetches every site with requests first and only renders "
+                         "JavaScript shells and thin pages with Playwright"
                 )
-                if use_playwright:
+                use_playwright = extraction_mode.startswith("🚀")
+                auto_escalate = extraction_mode.startswith("⚡")
+                if use_playwright or auto_escalate:
                     st.success("✅ Enhanced extraction enabled")
+                    self.enricher.readiness_strategy = st.selectbox(
+                        "Page Readiness",
+                        READINESS_STRATEGIES,
+                        help="adaptive: stop once the DOM settles or contact signals appear; "
+                             "networkidle: wait for network quiet; fixed: legacy fixed delay"
+                    )
             else:
                 use_playwright = False
+                auto_escalate = False
                 st.info("💡 Install Playwright for enhanced JS support:\n`pip install playwright`\n`playwright install chromium`")
             
+            max_workers = st.slider(
+                "Concurrent Workers",
+                min_value=1,
+                max_value=64,
+                value=DEFAULT_MAX_WORKERS,
+                help="Maximum number of domains enriched at the same time"
+            )
+            per_host_limit = st.number_input(
+                "Max Requests per Host",
+                min_value=1,
+                max_value=8,
+                value=DEFAULT_PER_HOST_LIMIT,
+                help="Caps simultaneous requests to any single host"
+            )
+            pool_maxsize = st.number_input(
+                "Pooled Connections per Host",
+                min_value=1,
+                max_value=16,
+                value=DEFAULT_POOL_MAXSIZE,
+                help="Keep-alive connections kept open per host and reused across runs"
+            )
+            use_http2 = st.checkbox(
+                "Use HTTP/2",
+                value=False,
+                disabled=not HTTP2_AVAILABLE,
+                help="Multiplex requests over one connection per host (requires httpx[http2])"
+            )
+            if not HTTP2_AVAILABLE:
+                st.caption("HTTP/2 unavailable: `pip install 'httpx[http2]'`; using pooled HTTP/1.1")
+            self.enricher.http = get_http_client(pool_maxsize=int(pool_maxsize), http2=use_http2)
+            self.enricher.max_body_bytes = int(st.number_input(
+                "Max Page Size (KB)",
+                min_value=64,
+                max_value=16384,
+                value=DEFAULT_MAX_BODY_BYTES // 1024,
+                step=64,
+                help="Stop downloading a homepage after this many kilobytes; non-HTML responses are skipped"
+            )) * 1024
+            
+            self.enricher.parser_backend = st.selectbox(
+                "HTML Parser",
+                PARSER_BACKENDS,
+                index=PARSER_BACKENDS.index(DEFAULT_PARSER) if DEFAULT_PARSER in PARSER_BACKENDS else 0,
+                help="selectolax and lxml are native and several times faster; html.parser is the pure-Python fallback"
+            )
+            email_mode = st.selectbox(
+                "Email Validation",
+                VALIDATION_MODES,
+                index=VALIDATION_MODES.index(DEFAULT_VALIDATION_MODE) if DEFAULT_VALIDATION_MODE in VALIDATION_MODES else 0,
+                format_func=lambda mode: 'Syntax only (offline)' if mode == MODE_SYNTAX else 'Syntax + MX lookup',
+                help="MX results are cached per domain; syntax-only never touches DNS"
+            )
+            self.enricher.email_validator = get_email_validator(email_mode)
+            
+            self.enricher.use_response_cache = st.checkbox(
+                "Use HTTP Response Cache",
+                value=True,
+                help="Reuse homepages fetched earlier; stale entries are revalidated with conditional requests"
+            )
+            self.enricher.use_result_cache = st.checkbox(
+                "Use Enrichment Result Cache",
+                value=True,
+                help="Skip fetching and parsing for domains enriched recently by the same extractor version"
+            )
+            self.enricher.offline = self.enricher.use_response_cache and st.checkbox(
+                "Offline Mode (cache only)",
+                value=False,
+                help="Never touch the network; domains that were not cached before are reported as errors"
+            )
+            if self.enricher.offline:
+                self.enricher.email_validator = get_email_validator(MODE_SYNTAX)
+            
             st.markdown("---")
             
             industry_filter = st.multiselect(
@@ -529,11 +168,15 @@ class LeadGeneratorApp:
             require_phone = st.checkbox("Require Phone", value=False)
             require_linkedin = st.checkbox("Require LinkedIn", value=False)
         
+        lead_filter = LeadFilter(confidence_threshold, tuple(industry_filter), require_email, require_phone,
+                                 require_linkedin)
+        if st.session_state.get('leads_filter') not in (None, lead_filter):
+            self._refilter(lead_filter)
+        
         tab1, tab2, tab3, tab4 = st.tabs(["🔍 Lead Discovery", "📊 Analytics", "📁 Saved Leads", "📋 Export"])
         
         with tab1:
-            self._lead_discovery_tab(use_playwright, industry_filter, confidence_threshold, 
-                                   require_email, require_phone, require_linkedin)
+            self._lead_discovery_tab(use_playwright, lead_filter, max_workers, per_host_limit, auto_escalate)
         
         with tab2:
             self._analytics_tab()
@@ -544,11 +187,75 @@ class LeadGeneratorApp:
         with tab4:
             self._export_tab()
     
-    def _lead_discovery_tab(self, use_playwright, industry_filter, confidence_threshold, 
-                           require_email, require_phone, require_linkedin):
+    @staticmethod
+    def _filter_rows(enriched, lead_filter):
+        """Row mask of ``enriched`` under the filters, the previous mask if it still applies, and the aggregates"""
+        mask = enriched.mask(lead_filter)
+        previous = st.session_state.get('leads_mask')
+        stats = st.session_state.get('lead_stats')
+        if st.session_state.get('enriched_leads') is enriched and previous is not None and len(previous) == len(mask):
+            # Same results, new filters: adjust the aggregates by the rows that entered or left
+            stats.remove_rows(enriched, previous & ~mask)
+            stats.add_rows(enriched, mask & ~previous)
+        else:
+            previous = None
+            stats = LeadAggregates.from_table(enriched, mask)
+        return mask, previous, stats
+    
+    @staticmethod
+    def _set_results(enriched, run_id, leads, lead_filter, mask, stats):
+        st.session_state['enriched_leads'] = enriched
+        st.session_state['enriched_run'] = run_id
+        st.session_state['enriched_count'] = len(enriched)
+        st.session_state['leads'] = leads
+        st.session_state['leads_filter'] = lead_filter
+        st.session_state['leads_mask'] = mask
+        st.session_state['lead_stats'] = stats
+    
+    def _show_enriched(self, enriched, lead_filter):
+        """Make ``enriched`` the current results and keep the leads that pass the sidebar filters"""
+        mask, _, stats = self._filter_rows(enriched, lead_filter)
+        self._set_results(enriched, None, enriched.take(mask), lead_filter, mask, stats)
+    
+    def _show_run(self, run_id, projection, lead_filter, leads=None):
+        """Make a run the current results, filtering its projection and holding only the qualified leads in full
+        
+        ``leads`` are the qualified rows when the caller already has them. Otherwise rows that
+        passed the previous filters are kept and only the rows entering are read from the journal.
+        """
+        mask, previous, stats = self._filter_rows(projection, lead_filter)
+        if leads is None:
+            entering = mask if previous is None else mask & ~previous
+            domains = projection.text('domain')[entering]
+            found = get_run_journal().results_for(run_id, domains)
+            leads = LeadTable.from_records(found.get(domain, {'domain': domain}) for domain in domains)
+            if previous is not None:
+                # Current leads are the previous mask's rows in order, so a running count locates each one
+                kept = mask & previous
+                positions = np.cumsum(previous) - 1
+                leads = st.session_state['leads'].take(positions[kept]).concat(leads)
+                order = np.concatenate([np.flatnonzero(kept), np.flatnonzero(entering)])
+                leads = leads.take(np.argsort(order, kind='stable'))
+        self._set_results(projection, run_id, leads, lead_filter, mask, stats)
+    
+    def _refilter(self, lead_filter):
+        """Apply changed sidebar filters to the current results with an indexed mask"""
+        enriched = st.session_state['enriched_leads']
+        run_id = st.session_state.get('enriched_run')
+        if run_id is None:
+            self._show_enriched(enriched, lead_filter)
+        else:
+            self._show_run(run_id, enriched, lead_filter)
+    
+    def _lead_discovery_tab(self, use_playwright, lead_filter,
+                           max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                           auto_escalate=False):
         st.header("Lead Discovery")
         
-        method = "Enhanced (Playwright)" if use_playwright else "Standard (BeautifulSoup)"
+        if auto_escalate:
+            method = "Auto (BeautifulSoup, escalating to Playwright)"
+        else:
+            method = "Enhanced (Playwright)" if use_playwright else "Standard (BeautifulSoup)"
         st.info(f"🔧 **Extraction Method:** {method}")
         
         input_method = st.radio(
@@ -556,12 +263,14 @@ class LeadGeneratorApp:
             ["Single Domain", "Bulk Domains", "Domain List File"]
         )
         
-        domains = []
+        domain_lines = []
+        total_domains = 0
         
         if input_method == "Single Domain":
             domain = st.text_input("Enter domain (e.g., stripe.com):")
             if domain:
-                domains = [domain.strip().replace('https://', '').replace('http://', '')]
+                domain_lines = [domain]
+                total_domains = 1
         
         elif input_method == "Bulk Domains":
             bulk_domains = st.text_area(
@@ -570,8 +279,8 @@ class LeadGeneratorApp:
                 height=100
             )
             if bulk_domains:
-                domains = [d.strip().replace('https://', '').replace('http://', '') 
-                          for d in bulk_domains.split('\n') if d.strip()]
+                domain_lines = bulk_domains.split('\n')
+                total_domains = sum(1 for line in domain_lines if line.strip())
         
         else:
             uploaded_file = st.file_uploader(
@@ -580,116 +289,323 @@ class LeadGeneratorApp:
             )
             if uploaded_file:
                 if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                    if len(df.columns) > 0:
-                        domain_col = st.selectbox("Select domain column:", df.columns.tolist())
-                        domains = [d.strip().replace('https://', '').replace('http://', '') 
-                                 for d in df[domain_col].dropna().tolist()]
+                    columns = pd.read_csv(uploaded_file, nrows=0).columns.tolist()
+                    if len(columns) > 0:
+                        domain_col = st.selectbox("Select domain column:", columns)
+                        domain_lines = self._csv_column_lines(uploaded_file, domain_col)
+                        total_domains = self._upload_count(
+                            (uploaded_file.file_id, domain_col),
+                            lambda: sum(1 for line in self._csv_column_lines(uploaded_file, domain_col))
+                        )
                 else:
-                    content = uploaded_file.read().decode('utf-8')
-                    domains = [d.strip().replace('https://', '').replace('http://', '') 
-                             for d in content.split('\n') if d.strip()]
-        
-        if st.button("🚀 Generate Leads", disabled=not domains, type="primary"):
-            if len(domains) > 50:
-                st.warning("⚠️ Processing limited to 50 domains for performance.")
-                domains = domains[:50]
-            
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            leads = []
-            extraction_stats = {'playwright': 0, 'beautifulsoup': 0, 'errors': 0}
-            
-            for i, domain in enumerate(domains):
-                method_text = "Playwright" if use_playwright else "BeautifulSoup"
-                status_text.text(f"Processing {domain} with {method_text}... ({i+1}/{len(domains)})")
-                
-                try:
-                    company_info = self.enricher.extract_company_info(domain, use_playwright)
-                    
-                    if 'error' in company_info:
-                        extraction_stats['errors'] += 1
-                        continue
-                    
-                    method_used = company_info.get('extraction_method', 'BeautifulSoup')
-                    if method_used == 'Playwright':
-                        extraction_stats['playwright'] += 1
-                    else:
-                        extraction_stats['beautifulsoup'] += 1
-                    
-                    confidence = calculate_confidence_score(company_info, domain)
-                    
-                    lead = Lead(
-                        company_name=company_info.get('title', domain).split('|')[0].strip() or domain,
-                        domain=domain,
-                        email=company_info.get('emails', [''])[0] if company_info.get('emails') else '',
-                        phone=company_info.get('phones', [''])[0] if company_info.get('phones') else '',
-                        linkedin=company_info.get('linkedin', ''),
-                        industry=company_info.get('industry', ''),
-                        location=company_info.get('location', ''),
-                        description=company_info.get('description', ''),
-                        confidence_score=confidence,
-                        technology_stack=company_info.get('technology_stack', '')
+                    domain_lines = self._text_file_lines(uploaded_file)
+                    total_domains = self._upload_count(
+                        (uploaded_file.file_id, None),
+                        lambda: sum(1 for line in self._text_file_lines(uploaded_file) if line.strip())
                     )
-                    
-                    leads.append(lead)
-                    
-                except Exception as e:
-                    extraction_stats['errors'] += 1
-                    st.error(f"Error processing {domain}: {str(e)}")
-                    continue
-                
-                progress_bar.progress((i + 1) / len(domains))
-                time.sleep(0.1)
-            
-            filtered_leads = self._filter_leads(
-                leads, industry_filter, confidence_threshold, 
-                require_email, require_phone, require_linkedin
-            )
-            
-            st.session_state['leads'] = filtered_leads
-            st.session_state['extraction_stats'] = extraction_stats
+        
+        journal = get_run_journal()
+        settings = {
+            'use_playwright': use_playwright,
+            'auto_escalate': auto_escalate,
+            'confidence_threshold': lead_filter.min_confidence,
+            'industry_filter': list(lead_filter.industries),
+            'require_email': lead_filter.require_email,
+            'require_phone': lead_filter.require_phone,
+            'require_linkedin': lead_filter.require_linkedin
+        }
+        
+        ran = st.button("🚀 Generate Leads", disabled=not total_domains, type="primary")
+        if ran:
+            run_id = journal.start_run(domain_lines, settings, label=input_method)
+            self._process_run(journal, run_id, lead_filter, max_workers, per_host_limit)
+        
+        ran = self._run_history(journal, lead_filter, max_workers, per_host_limit) or ran
+        self._rescore_panel(journal, lead_filter)
+        
+        if not ran and st.session_state.get('enriched_count') is not None:
+            self._filtered_preview(st.session_state['enriched_count'], st.session_state['leads'])
+    
+    def _filtered_preview(self, enriched_count, leads):
+        """Earlier results under the current sidebar filters, re-filtered on every change without re-extraction"""
+        st.subheader(f"📋 Current Leads ({len(leads)} of {enriched_count} enriched pass the filters)")
+        if len(leads) > FILTERED_PREVIEW_ROWS:
+            st.caption(f"Showing the first {FILTERED_PREVIEW_ROWS}; all {len(leads)} are in Analytics and Export.")
+        st.dataframe(self._leads_frame(leads.take(slice(0, FILTERED_PREVIEW_ROWS))), use_container_width=True)
+    
+    def _run_history(self, journal, lead_filter, max_workers, per_host_limit):
+        runs = journal.runs(limit=RUN_HISTORY_LIMIT)
+        if not runs:
+            return
+        
+        with st.expander(f"📜 Run History ({len(runs)} recent runs)"):
+            st.dataframe(pd.DataFrame([{
+                'Run': run.run_id,
+                'Input': run.label,
+                'Status': run.status,
+                'Domains': run.total,
+                'Done': run.done,
+                'Failed': run.failed,
+                'Pending': run.pending,
+                'Qualified': run.qualified,
+                'Updated': time.strftime('%Y-%m-%d %H:%M', time.localtime(run.updated_at))
+            } for run in runs]), use_container_width=True, hide_index=True)
             
-            col1, col2, col3, col4 = st.columns(4)
+            runs_by_id = {run.run_id: run for run in runs}
+            run_id = st.selectbox("Run", list(runs_by_id),
+                                  format_func=lambda run_id: f"{run_id} ({runs_by_id[run_id].status})")
+            selected = runs_by_id[run_id]
+            col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Processed", len(domains))
+                resume = st.button(f"▶️ Resume ({selected.pending} pending)", disabled=not selected.resumable)
             with col2:
-                st.metric("Successful", len(leads))
+                if st.button(f"📥 Load {selected.done} Leads", disabled=not selected.done):
+                    self._show_enriched(LeadTable.from_records(journal.results(run_id, qualified_only=False)),
+                                        lead_filter)
+                    st.success(f"Loaded {st.session_state['enriched_count']} leads from run {run_id}, "
+                               f"{len(st.session_state['leads'])} pass the current filters")
             with col3:
-                st.metric("Qualified", len(filtered_leads))
-            with col4:
-                success_rate = (len(leads) / len(domains)) * 100 if domains else 0
-                st.metric("Success Rate", f"{success_rate:.1f}%")
-            
-            status_text.success(f"✅ Found {len(filtered_leads)} qualified leads from {len(domains)} domains")
-            
-            if filtered_leads:
-                self._display_leads(filtered_leads)
-            else:
-                st.warning("No leads found matching your criteria. Try adjusting your filters.")
+                if st.button("🗑️ Delete Run"):
+                    if st.session_state.get('enriched_run') == run_id:
+                        # Its leads can no longer be re-read, so keep the qualified ones as they are
+                        self._show_enriched(st.session_state['leads'], st.session_state['leads_filter'])
+                    journal.delete_run(run_id)
+                    st.rerun()
+        
+        if resume:
+            self._process_run(journal, run_id, lead_filter, max_workers, per_host_limit)
+        return resume
     
-    def _filter_leads(self, leads, industry_filter, confidence_threshold, 
-                     require_email, require_phone, require_linkedin):
-        filtered = []
+    def _rescore_panel(self, journal, lead_filter):
+        """Re-qualify journaled leads under edited weights, from their stored features only"""
+        runs = journal.runs(limit=RUN_HISTORY_LIMIT)
+        if not runs:
+            return
         
-        for lead in leads:
-            if lead.confidence_score < confidence_threshold:
-                continue
+        with st.expander("🎚️ Rescore Stored Leads"):
+            source = st.selectbox("Leads", ['all'] + [run.run_id for run in runs],
+                                  format_func=lambda run_id: "All runs (latest per domain)"
+                                  if run_id == 'all' else run_id)
+            weights_text = st.text_area("Weights (JSON)", json.dumps(SCORING.weights[DEFAULT_PROFILE], indent=2),
+                                        height=250)
+            st.caption(f"Sidebar filters apply: minimum confidence {lead_filter.min_confidence}")
             
-            if industry_filter and lead.industry not in industry_filter:
-                continue
-            
-            if require_email and not lead.email:
-                continue
-            if require_phone and not lead.phone:
-                continue
-            if require_linkedin and not lead.linkedin:
-                continue
-            
-            filtered.append(lead)
+            if st.button("🎚️ Rescore"):
+                try:
+                    scoring = SCORING.with_profile(DEFAULT_PROFILE, json.loads(weights_text))
+                except (ValueError, KeyError, TypeError) as e:
+                    st.error(f"Invalid weights: {e}")
+                    return
+                
+                # Loading is the slow part; keep the table until a run writes new results
+                cache_key = (source, max(run.updated_at for run in runs))
+                if st.session_state.get('rescore_base', (None,))[0] != cache_key:
+                    results = journal.results(None if source == 'all' else source, qualified_only=False)
+                    st.session_state['rescore_base'] = (cache_key, LeadTable.from_records(results))
+                base = st.session_state['rescore_base'][1]
+                
+                start_time = time.time()
+                rescored = base.rescore(scoring, DEFAULT_PROFILE)
+                before, after = base.mask(lead_filter), rescored.mask(lead_filter)
+                elapsed = time.time() - start_time
+                
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Stored Leads", f"{len(base):,}")
+                col2.metric("Qualified Before", f"{int(before.sum()):,}")
+                col3.metric("Qualified After", f"{int(after.sum()):,}", delta=int(after.sum()) - int(before.sum()))
+                st.caption(f"Rescored in {elapsed * 1000:.0f} ms without refetching")
+                self._show_enriched(rescored, lead_filter)
+    
+    def _process_run(self, journal, run_id, lead_filter, max_workers, per_host_limit):
+        """Enrich every pending domain of a journaled run with the settings it was started with"""
+        run = journal.run(run_id)
+        settings = run.settings
+        use_playwright = settings.get('use_playwright', False)
+        auto_escalate = settings.get('auto_escalate', False)
+        total_domains = max(run.total, 1)
+        if run.finished:
+            st.info(f"↩️ Resuming run {run_id}: {run.finished} of {run.total} domains already done")
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        live_header = st.empty()
+        live_table = st.empty()
+        
+        processed = run.finished
+        successful = run.done
+        # Every lead goes into a compact projection for re-filtering; only qualified leads are held in full
+        projection = LeadTable.projection()
+        filtered_leads = LeadTable.from_records_where(journal.results(run_id, qualified_only=False), lead_filter,
+                                                      projection=projection)
+        extraction_stats = {'playwright': 0, 'beautifulsoup': 0, 'errors': 0, 'blocked_requests': 0,
+                            'ready_wait_ms': 0.0, 'escalated': 0, 'escalation_reasons': {}, 'dns_failures': 0}
+        
+        cache_stats_before = dict(self.enricher.response_cache.stats)
+        http_stats_before = dict(self.enricher.http.stats)
+        result_stats_before = dict(self.enricher.result_cache.stats)
+        
+        method_text = "Playwright" if use_playwright else "BeautifulSoup"
+        engine = EnrichmentEngine(
+            self.enricher,
+            max_workers=max_workers,
+            per_host_limit=per_host_limit,
+            initializer=self._script_context_initializer()
+        )
+        lead_pipeline = LeadPipeline(
+            engine,
+            build_lead=build_lead,
+            accept=LeadFilter(settings.get('confidence_threshold', 0), tuple(settings.get('industry_filter', ())),
+                              settings.get('require_email', False), settings.get('require_phone', False),
+                              settings.get('require_linkedin', False)),
+            dns_preflight=None if self.enricher.offline else DnsPreflight(self.enricher.http.dns_cache)
+        )
         
-        return filtered
+        journal.reopen(run_id)
+        last_render = 0.0
+        try:
+            for event in lead_pipeline.run(journal.pending(run_id), use_playwright, auto_escalate=auto_escalate):
+                journal.record(run_id, event)
+                processed += 1
+                domain = event.domain
+                company_info = event.company_info
+                if auto_escalate:
+                    method_text = company_info.get('extraction_method', 'BeautifulSoup')
+                blocked = company_info.get('blocked_requests')
+                blocked_text = f", {blocked} requests blocked" if blocked else ""
+                status_text.text(f"Processed {domain} with {method_text}{blocked_text}... "
+                                  f"({processed}/{total_domains})")
+                progress_bar.progress(min(processed / total_domains, 1.0))
+                
+                if 'error' in company_info:
+                    extraction_stats['errors'] += 1
+                    if company_info.get('dns_failure'):
+                        extraction_stats['dns_failures'] += 1
+                    continue
+                
+                successful += 1
+                self._record_extraction(extraction_stats, company_info)
+                method = company_info.get('extraction_method', 'BeautifulSoup')
+                projection.append(event.lead, method)
+                if not lead_filter(event.lead):
+                    continue
+                
+                filtered_leads.append(event.lead, method)
+                now = time.monotonic()
+                if now - last_render >= LIVE_RENDER_INTERVAL_SECONDS:
+                    last_render = now
+                    self._render_live_leads(live_header, live_table, filtered_leads)
+        finally:
+            journal.finish(run_id)
+        
+        live_header.empty()
+        live_table.empty()
+        
+        extraction_stats['http_requests'] = self.enricher.http.stats['requests'] - http_stats_before['requests']
+        extraction_stats['new_connections'] = (self.enricher.http.stats['new_connections']
+                                               - http_stats_before['new_connections'])
+        
+        self._show_run(run_id, projection, lead_filter, filtered_leads)
+        st.session_state['extraction_stats'] = extraction_stats
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("Processed", processed)
+        with col2:
+            st.metric("Successful", successful)
+        with col3:
+            st.metric("Qualified", len(filtered_leads))
+        with col4:
+            success_rate = (successful / processed) * 100 if processed else 0
+            st.metric("Success Rate", f"{success_rate:.1f}%")
+        with col5:
+            hit_rate = self.enricher.result_cache.hit_rate(since=result_stats_before)
+            st.metric("Cache Hit Rate", f"{hit_rate * 100:.1f}%" if self.enricher.use_result_cache else "Off")
+        
+        status_text.success(f"✅ Found {len(filtered_leads)} qualified leads from {processed} domains")
+        
+        if self.enricher.use_response_cache:
+            cache_stats = {key: value - cache_stats_before.get(key, 0)
+                           for key, value in self.enricher.response_cache.stats.items()}
+            st.caption(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated (304), "
+                       f"{cache_stats['misses']} fetched")
+        
+        if extraction_stats['http_requests']:
+            reuse_rate = self.enricher.http.reuse_rate(since=http_stats_before)
+            st.caption(f"Connections: {extraction_stats['http_requests']} requests over "
+                       f"{extraction_stats['new_connections']} new connections ({reuse_rate * 100:.1f}% reused)")
+        
+        if filtered_leads:
+            self._display_leads(filtered_leads)
+        else:
+            st.warning("No leads found matching your criteria. Try adjusting your filters.")
+    
+    @staticmethod
+    def _text_file_lines(uploaded_file):
+        """Lines of an uploaded text file, read lazily"""
+        uploaded_file.seek(0)
+        for line in uploaded_file:
+            yield line.decode('utf-8', errors='replace')
+    
+    @staticmethod
+    def _upload_count(key, count):
+        """Domains in an uploaded file, counted once per file and column instead of on every rerun"""
+        counts = st.session_state.setdefault('upload_counts', {})
+        if key not in counts:
+            counts[key] = count()
+        return counts[key]
+    
+    @staticmethod
+    def _csv_column_lines(uploaded_file, column):
+        """Values of one CSV column, read in chunks"""
+        uploaded_file.seek(0)
+        for chunk in pd.read_csv(uploaded_file, usecols=[column], chunksize=CSV_CHUNK_ROWS):
+            for value in chunk[column].dropna():
+                yield str(value)
+    
+    def _record_extraction(self, extraction_stats, company_info):
+        method_used = company_info.get('extraction_method', 'BeautifulSoup')
+        if method_used == 'Playwright':
+            extraction_stats['playwright'] += 1
+        else:
+            extraction_stats['beautifulsoup'] += 1
+        extraction_stats['blocked_requests'] += company_info.get('blocked_requests', 0)
+        extraction_stats['ready_wait_ms'] += company_info.get('ready_wait_ms', 0.0)
+        reason = company_info.get('escalation_reason')
+        if reason:
+            extraction_stats['escalated'] += 1
+            reasons = extraction_stats['escalation_reasons']
+            reasons[reason] = reasons.get(reason, 0) + 1
+    
+    def _render_live_leads(self, live_header, live_table, leads):
+        live_header.markdown(f"**⏳ {len(leads)} qualified leads so far** (latest {LIVE_TABLE_ROWS} shown)")
+        live_table.dataframe(self._leads_frame(leads.tail(LIVE_TABLE_ROWS)), use_container_width=True)
+    
+    def _script_context_initializer(self):
+        """Attach the Streamlit script context to worker threads so st.* calls still render"""
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx, add_script_run_ctx
+        except ImportError:
+            return None
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    
+    @staticmethod
+    def _truncate(values, width):
+        values = pd.Series(values, dtype=object)
+        return values.where(values.str.len() <= width, values.str[:width] + "...")
+    
+    def _leads_frame(self, leads):
+        return pd.DataFrame({
+            'Company': self._truncate(leads.text('company_name'), 25),
+            'Domain': leads.text('domain'),
+            'Email': self._truncate(leads.text('email'), 30),
+            'Phone': leads.text('phone'),
+            'Industry': leads.category('industry'),
+            'Score': pd.Series(leads.scores).round().astype(int).astype(str) + "%",
+            'LinkedIn': np.where(leads.flag('has_linkedin'), "✅", "❌")
+        })
     
     def _display_leads(self, leads):
         st.subheader(f"📋 Qualified Leads ({len(leads)} found)")
@@ -698,28 +614,14 @@ class LeadGeneratorApp:
             st.info("No leads to display")
             return
         
-        table_data = []
-        for lead in leads:
-            table_data.append([
-                lead.company_name[:25] + "..." if len(lead.company_name) > 25 else lead.company_name,
-                lead.domain,
-                lead.email[:30] + "..." if len(lead.email) > 30 else lead.email,
-                lead.phone,
-                lead.industry,
-                f"{lead.confidence_score:.0f}%",
-                "✅" if lead.linkedin else "❌"
-            ])
-        
-        df = pd.DataFrame(table_data, columns=[
-            'Company', 'Domain', 'Email', 'Phone', 'Industry', 'Score', 'LinkedIn'
-        ])
-        
-        st.dataframe(df, use_container_width=True)
+        st.dataframe(self._leads_frame(leads), use_container_width=True)
         
         st.markdown("---")
         st.markdown("### 📋 Lead Details")
+        if len(leads) > MAX_DETAIL_EXPANDERS:
+            st.caption(f"Showing details for the first {MAX_DETAIL_EXPANDERS} leads; all {len(leads)} are in the table and export.")
         
-        for i, lead in enumerate(leads, 1):
+        for i, lead in enumerate(leads.leads(MAX_DETAIL_EXPANDERS), 1):
             with st.expander(f"{i}. {lead.company_name} ({lead.confidence_score:.0f}% confidence)"):
                 col1, col2 = st.columns(2)
                 
@@ -745,45 +647,54 @@ class LeadGeneratorApp:
             st.info("No leads data available. Please generate leads first.")
             return
         
-        leads = st.session_state['leads']
+        stats = st.session_state.get('lead_stats') or LeadAggregates.from_table(st.session_state['leads'])
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Leads", len(leads))
+            st.metric("Total Leads", stats.count)
         
         with col2:
-            with_email = sum(1 for lead in leads if lead.email)
-            email_pct = (with_email/len(leads)*100) if leads else 0
-            st.metric("With Email", with_email, f"{email_pct:.1f}%")
+            st.metric("With Email", stats.flags['has_email'], f"{stats.rate('has_email') * 100:.1f}%")
         
         with col3:
-            with_phone = sum(1 for lead in leads if lead.phone)
-            phone_pct = (with_phone/len(leads)*100) if leads else 0
-            st.metric("With Phone", with_phone, f"{phone_pct:.1f}%")
+            st.metric("With Phone", stats.flags['has_phone'], f"{stats.rate('has_phone') * 100:.1f}%")
         
         with col4:
-            avg_confidence = sum(lead.confidence_score for lead in leads) / len(leads)
-            st.metric("Avg Confidence", f"{avg_confidence:.1f}%")
+            st.metric("Avg Confidence", f"{stats.average_score:.1f}%")
 
         if 'extraction_stats' in st.session_state:
-            stats = st.session_state['extraction_stats']
+            extraction = st.session_state['extraction_stats']
             st.subheader("🔧 Extraction Method Performance")
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Playwright", stats.get('playwright', 0))
+                st.metric("Playwright", extraction.get('playwright', 0))
             with col2:
-                st.metric("BeautifulSoup", stats.get('beautifulsoup', 0))
+                st.metric("BeautifulSoup", extraction.get('beautifulsoup', 0))
             with col3:
-                st.metric("Errors", stats.get('errors', 0))
+                st.metric("Errors", extraction.get('errors', 0),
+                          f"{extraction.get('dns_failures', 0)} DNS" if extraction.get('dns_failures') else None,
+                          delta_color="off")
+            with col4:
+                st.metric("Blocked Requests", extraction.get('blocked_requests', 0))
+            
+            if extraction.get('playwright'):
+                avg_wait = extraction.get('ready_wait_ms', 0.0) / extraction['playwright']
+                st.caption(f"Average post-load wait: {avg_wait:.0f} ms per Playwright page")
+            
+            if extraction.get('escalated'):
+                reasons = ', '.join(f"{reason}: {count}" for reason, count in
+                                    sorted(extraction['escalation_reasons'].items(), key=lambda x: -x[1]))
+                st.caption(f"Auto mode escalated {extraction['escalated']} domains to Playwright ({reasons})")
+            
+            if extraction.get('http_requests'):
+                reused = 1 - extraction.get('new_connections', 0) / extraction['http_requests']
+                st.caption(f"Connection reuse: {max(0.0, reused) * 100:.1f}% of "
+                           f"{extraction['http_requests']} HTTP requests")
 
         col1, col2 = st.columns(2)
         with col1:
-            industry_counts = {}
-            for lead in leads:
-                industry = lead.industry or 'Unknown'
-                industry_counts[industry] = industry_counts.get(industry, 0) + 1
-            
+            industry_counts = stats.industry_counts()
             if industry_counts:
                 fig = px.pie(
                     values=list(industry_counts.values()),
@@ -793,61 +704,50 @@ class LeadGeneratorApp:
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            confidence_scores = [lead.confidence_score for lead in leads]
-            fig = px.histogram(
-                x=confidence_scores,
-                nbins=10,
+            bins, counts = zip(*stats.histogram())
+            fig = px.bar(
+                x=bins,
+                y=counts,
                 title="Confidence Score Distribution",
                 labels={'x': 'Confidence Score', 'y': 'Number of Leads'}
             )
             st.plotly_chart(fig, use_container_width=True)
 
-        if any(lead.technology_stack for lead in leads):
+        top_technologies = stats.top_technologies()
+        if top_technologies:
             st.subheader("💻 Technology Stack Analysis")
-            tech_counts = {}
-            for lead in leads:
-                if lead.technology_stack:
-                    techs = [t.strip() for t in lead.technology_stack.split(',') if t.strip()]
-                    for tech in techs:
-                        tech_counts[tech] = tech_counts.get(tech, 0) + 1
+            tech_df = pd.DataFrame(top_technologies, columns=['Technology', 'Count'])
             
-            if tech_counts:
-                tech_df = pd.DataFrame(list(tech_counts.items()), columns=['Technology', 'Count'])
-                tech_df = tech_df.sort_values('Count', ascending=False).head(10)
-                
-                fig = px.bar(tech_df, x='Technology', y='Count', title="Top Technologies Detected")
-                st.plotly_chart(fig, use_container_width=True)
+            fig = px.bar(tech_df, x='Technology', y='Count', title="Top Technologies Detected")
+            st.plotly_chart(fig, use_container_width=True)
     
     def _saved_leads_tab(self):
         st.header("📁 Saved Leads")
         if 'saved_leads' not in st.session_state:
-            st.session_state['saved_leads'] = []
+            st.session_state['saved_leads'] = LeadTable()
 
         if 'leads' in st.session_state and st.session_state['leads']:
             if st.button("💾 Save Current Leads"):
-                st.session_state['saved_leads'].extend(st.session_state['leads'])
+                st.session_state['saved_leads'] = st.session_state['saved_leads'].concat(st.session_state['leads'])
                 st.success(f"Saved {len(st.session_state['leads'])} leads!")
 
-        if st.session_state['saved_leads']:
-            st.subheader(f"📋 {len(st.session_state['saved_leads'])} Saved Leads")
+        saved = st.session_state['saved_leads']
+        if saved:
+            st.subheader(f"📋 {len(saved)} Saved Leads")
 
-            df_data = []
-            for i, lead in enumerate(st.session_state['saved_leads']):
-                df_data.append({
-                    'ID': i + 1,
-                    'Company': lead.company_name,
-                    'Domain': lead.domain,
-                    'Email': lead.email,
-                    'Phone': lead.phone,
-                    'Industry': lead.industry,
-                    'Confidence': f"{lead.confidence_score:.1f}%"
-                })
-            
-            df = pd.DataFrame(df_data)
+            df = pd.DataFrame({
+                'ID': np.arange(1, len(saved) + 1),
+                'Company': saved.text('company_name'),
+                'Domain': saved.text('domain'),
+                'Email': saved.text('email'),
+                'Phone': saved.text('phone'),
+                'Industry': saved.category('industry'),
+                'Confidence': pd.Series(saved.scores).map("{:.1f}%".format)
+            })
             st.dataframe(df, use_container_width=True, hide_index=True)
 
             if st.button("🗑️ Clear Saved Leads"):
-                st.session_state['saved_leads'] = []
+                st.session_state['saved_leads'] = LeadTable()
                 st.success("Cleared all saved leads!")
         else:
             st.info("No saved leads yet. Generate and save some leads first!")
@@ -855,7 +755,7 @@ class LeadGeneratorApp:
     def _export_tab(self):
         st.header("📋 Export Leads")
         
-        leads_to_export = []
+        leads_to_export = LeadTable()
         export_option = st.selectbox(
             "What to export:",
             ["Current Leads", "Saved Leads", "Both"]
@@ -866,9 +766,9 @@ class LeadGeneratorApp:
         elif export_option == "Saved Leads" and 'saved_leads' in st.session_state:
             leads_to_export = st.session_state['saved_leads']
         elif export_option == "Both":
-            current = st.session_state.get('leads', [])
-            saved = st.session_state.get('saved_leads', [])
-            leads_to_export = current + saved
+            current = st.session_state.get('leads') or LeadTable()
+            saved = st.session_state.get('saved_leads') or LeadTable()
+            leads_to_export = current.concat(saved)
         
         if not leads_to_export:
             st.info("No leads to export. Please generate some leads first.")
@@ -879,25 +779,20 @@ class LeadGeneratorApp:
             ["CSV", "JSON", "Excel Compatible"]
         )
 
-        export_data = []
-        for lead in leads_to_export:
-            export_data.append({
-                'Company Name': lead.company_name,
-                'Domain': lead.domain,
-                'Email': lead.email if lead.email else '', 
-                'Phone': lead.phone if lead.phone else '',
-                'LinkedIn URL': lead.linkedin if lead.linkedin else '',
-                'Industry': lead.industry if lead.industry else '',
-                'Location': lead.location if lead.location else '',
-                'Technology Stack': lead.technology_stack if lead.technology_stack else '',
-                'Description': lead.description if lead.description else '',
-                'Confidence Score': f"{lead.confidence_score:.1f}",
-                'Has Email': 'Yes' if lead.email else 'No',
-                'Has Phone': 'Yes' if lead.phone else 'No',
-                'Has LinkedIn': 'Yes' if lead.linkedin else 'No'
-            })
-        
-        df_export = pd.DataFrame(export_data)
+        df_export = leads_to_export.to_frame({
+            'company_name': 'Company Name',
+            'domain': 'Domain',
+            'email': 'Email',
+            'phone': 'Phone',
+            'linkedin': 'LinkedIn URL',
+            'industry': 'Industry',
+            'location': 'Location',
+            'technology_stack': 'Technology Stack',
+            'description': 'Description'
+        })
+        df_export['Confidence Score'] = pd.Series(leads_to_export.scores).map("{:.1f}".format)
+        for flag, header in [('has_email', 'Has Email'), ('has_phone', 'Has Phone'), ('has_linkedin', 'Has LinkedIn')]:
+            df_export[header] = np.where(leads_to_export.flag(flag), 'Yes', 'No')
 
         st.subheader("📊 Export Preview")
 
@@ -910,13 +805,13 @@ class LeadGeneratorApp:
 
         col1, col2, col3 = st.columns(3)
         with col1:
-            with_email = len([lead for lead in leads_to_export if lead.email])
+            with_email = int(leads_to_export.flag('has_email').sum())
             st.metric("Leads with Email", f"{with_email}/{len(leads_to_export)}")
         with col2:
-            with_phone = len([lead for lead in leads_to_export if lead.phone]) 
+            with_phone = int(leads_to_export.flag('has_phone').sum())
             st.metric("Leads with Phone", f"{with_phone}/{len(leads_to_export)}")
         with col3:
-            with_linkedin = len([lead for lead in leads_to_export if lead.linkedin])
+            with_linkedin = int(leads_to_export.flag('has_linkedin').sum())
             st.metric("Leads with LinkedIn", f"{with_linkedin}/{len(leads_to_export)}")
 
         st.subheader("💾 Download")
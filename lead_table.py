@@ -0,0 +1,353 @@
+"""
+Lead Table
+Author: Prakhar Madnani
+Columnar lead storage: NumPy arrays per field, categorical industry and method, bulk append and slicing
+"""
+
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from lead_enricher import Lead, LeadFilter
+from scoring_engine import DEFAULT_PROFILE, SCORING, VECTOR_FEATURES, FeatureBatch, ScoringEngine
+
+# Free-text fields, stored as object arrays of str
+TEXT_COLUMNS = ('company_name', 'domain', 'email', 'phone', 'linkedin', 'location', 'description',
+                'technology_stack', 'employee_count', 'revenue_estimate')
+# Low-cardinality fields, stored as small integer codes into a shared category list
+CATEGORY_COLUMNS = ('industry', 'extraction_method')
+# Contact presence, kept as boolean columns so counts and filters never touch the strings
+FLAG_COLUMNS = {'has_email': 'email', 'has_phone': 'phone', 'has_linkedin': 'linkedin'}
+# Text a projection keeps: the journal key and what the aggregates need; flags are still set from the full lead
+PROJECTION_COLUMNS = ('domain', 'technology_stack')
+# Width of the stored scoring-feature rows; NaN marks leads saved before features were kept
+FEATURE_WIDTH = len(VECTOR_FEATURES)
+
+DEFAULT_CAPACITY = 64
+# Records parsed per step when only the rows passing a filter are kept
+FILTER_CHUNK = 1000
+
+
+_LEAD_FIELDS = tuple(Lead.__dataclass_fields__)
+
+
+def _columns(leads: List[Union[Lead, Dict]]) -> Dict[str, List]:
+    """Transpose leads into per-field lists; dicts may also carry ``extraction_method``"""
+    if all(isinstance(lead, Lead) for lead in leads):
+        columns = {name: list(map(attrgetter(name), leads)) for name in _LEAD_FIELDS}
+        columns['extraction_method'] = [None] * len(leads)
+        return columns
+    records = [lead if isinstance(lead, dict) else {name: getattr(lead, name) for name in _LEAD_FIELDS}
+               for lead in leads]
+    return {name: [record.get(name) for record in records] for name in _LEAD_FIELDS + ('extraction_method',)}
+
+
+class Categories:
+    """Value <-> code mapping for one categorical column; code 0 is always the empty string"""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = ['']
+        self.codes: Dict[str, int] = {'': 0}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Optional[str]) -> int:
+        value = value or ''
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.values, dtype=object)[codes]
+
+    def copy(self) -> 'Categories':
+        return Categories(self.values[1:])
+
+
+class LeadTable:
+    """Leads as parallel NumPy columns instead of a list of Lead objects.
+
+    Rows are appended into preallocated arrays that double when full, so
+    streaming appends stay amortised O(1). Filters, analytics and export
+    read whole columns; ``lead(i)`` rebuilds a single Lead only where a
+    view needs one, such as the detail expanders.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, text_columns: Sequence[str] = TEXT_COLUMNS):
+        capacity = max(1, capacity)
+        self._size = 0
+        # Text columns left out (see ``projection``) read back as empty strings
+        self._text = {name: np.full(capacity, '', dtype=object) for name in text_columns}
+        self._codes = {name: np.zeros(capacity, dtype=np.uint16) for name in CATEGORY_COLUMNS}
+        self._flags = {name: np.zeros(capacity, dtype=bool) for name in FLAG_COLUMNS}
+        self._score = np.zeros(capacity, dtype=np.float32)
+        self._features = np.full((capacity, FEATURE_WIDTH), np.nan, dtype=np.float32)
+        self.categories = {name: Categories() for name in CATEGORY_COLUMNS}
+        self._index: Optional['LeadIndex'] = None
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Union[Lead, Dict]]) -> 'LeadTable':
+        leads = list(leads)
+        table = cls(capacity=len(leads))
+        table.extend(leads)
+        return table
+
+    from_records = from_leads
+
+    @classmethod
+    def projection(cls) -> 'LeadTable':
+        """Empty table holding only what filtering and the aggregates read, a small fraction of a full row"""
+        return cls(text_columns=PROJECTION_COLUMNS)
+
+    @classmethod
+    def from_records_where(cls, records: Iterable[Union[Lead, Dict]], lead_filter: LeadFilter,
+                           chunk_size: int = FILTER_CHUNK,
+                           projection: Optional['LeadTable'] = None) -> 'LeadTable':
+        """Only the records passing ``lead_filter``, read a chunk at a time so the rest are never held together.
+
+        Every record, passing or not, is also added to ``projection`` when one is given.
+        """
+        table = cls()
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return table
+            if projection is not None:
+                projection.extend(chunk)
+            keep = cls.from_records(chunk).mask(lead_filter)
+            table.extend(record for record, kept in zip(chunk, keep) if kept)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._score)
+
+    def _reserve(self, size: int):
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2)
+        grow = lambda array, fill: np.concatenate([array, np.full(capacity - len(array), fill, dtype=array.dtype)])
+        self._text = {name: grow(array, '') for name, array in self._text.items()}
+        self._codes = {name: grow(array, 0) for name, array in self._codes.items()}
+        self._flags = {name: grow(array, False) for name, array in self._flags.items()}
+        self._score = grow(self._score, 0)
+        features = np.full((capacity, FEATURE_WIDTH), np.nan, dtype=np.float32)
+        features[:len(self._features)] = self._features
+        self._features = features
+
+    def append(self, lead: Union[Lead, Dict], extraction_method: str = ''):
+        """Add one streamed lead; for many at once ``extend`` is faster"""
+        get = lead.get if isinstance(lead, dict) else lambda name: getattr(lead, name, None)
+        i = self._size
+        self._reserve(i + 1)
+        for name, array in self._text.items():
+            array[i] = get(name) or ''
+        for flag, source in FLAG_COLUMNS.items():
+            self._flags[flag][i] = bool(get(source))
+        self._codes['industry'][i] = self.categories['industry'].encode(get('industry'))
+        self._codes['extraction_method'][i] = self.categories['extraction_method'].encode(
+            extraction_method or get('extraction_method')
+        )
+        self._score[i] = get('confidence_score') or 0.0
+        features = get('features')
+        if features:
+            self._features[i] = features
+        self._size = i + 1
+
+    def extend(self, leads: Iterable[Union[Lead, Dict]], extraction_methods: Optional[Iterable[str]] = None):
+        """Bulk append: leads are transposed once and each column filled with one slice assignment"""
+        leads = list(leads)
+        if not leads:
+            return
+        columns = _columns(leads)
+        if extraction_methods is not None:
+            columns['extraction_method'] = [override or method for override, method
+                                            in zip(extraction_methods, columns['extraction_method'])]
+
+        start, end = self._size, self._size + len(leads)
+        self._reserve(end)
+        for name, array in self._text.items():
+            array[start:end] = [value or '' for value in columns[name]]
+        for flag, source in FLAG_COLUMNS.items():
+            self._flags[flag][start:end] = [bool(value) for value in columns[source]]
+        for name in CATEGORY_COLUMNS:
+            self._codes[name][start:end] = list(map(self.categories[name].encode, columns[name]))
+        self._score[start:end] = [value or 0.0 for value in columns['confidence_score']]
+        for row, features in enumerate(columns['features'], start):
+            if features:
+                self._features[row] = features
+        self._size = end
+
+    def text(self, name: str) -> np.ndarray:
+        if name not in self._text:
+            return np.full(self._size, '', dtype=object)
+        return self._text[name][:self._size]
+
+    def codes(self, name: str) -> np.ndarray:
+        return self._codes[name][:self._size]
+
+    def category(self, name: str) -> np.ndarray:
+        """Decoded values of a categorical column"""
+        return self.categories[name].decode(self.codes(name))
+
+    def flag(self, name: str) -> np.ndarray:
+        return self._flags[name][:self._size]
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._score[:self._size]
+
+    @property
+    def features(self) -> np.ndarray:
+        """Stored scoring features, one VECTOR_FEATURES row per lead"""
+        return self._features[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        if name in TEXT_COLUMNS:
+            return self.text(name)
+        if name in self._codes:
+            return self.category(name)
+        if name in self._flags:
+            return self.flag(name)
+        if name == 'confidence_score':
+            return self.scores
+        raise KeyError(name)
+
+    def category_counts(self, name: str) -> Dict[str, int]:
+        """Rows per category value, most common first"""
+        counts = np.bincount(self.codes(name), minlength=len(self.categories[name].values))
+        order = np.argsort(-counts, kind='stable')
+        return {self.categories[name].values[code]: int(counts[code]) for code in order if counts[code]}
+
+    def take(self, rows: Union[np.ndarray, slice, Sequence[int]]) -> 'LeadTable':
+        """New table with the selected rows: a boolean mask, index array or slice"""
+        if isinstance(rows, slice):
+            indices = np.arange(self._size)[rows]
+        else:
+            rows = np.asarray(rows)
+            indices = np.flatnonzero(rows) if rows.dtype == bool else rows
+        # Every column is replaced below, so skip preallocating them
+        table = LeadTable(capacity=0)
+        table._size = len(indices)
+        table._text = {name: self.text(name)[indices] for name in self._text}
+        table._codes = {name: self.codes(name)[indices] for name in CATEGORY_COLUMNS}
+        table._flags = {name: self.flag(name)[indices] for name in FLAG_COLUMNS}
+        table._score = self.scores[indices]
+        table._features = self.features[indices]
+        table.categories = {name: categories.copy() for name, categories in self.categories.items()}
+        return table
+
+    def tail(self, count: int) -> 'LeadTable':
+        return self.take(slice(max(0, self._size - count), None))
+
+    def concat(self, other: 'LeadTable') -> 'LeadTable':
+        """Rows of this table followed by the rows of another; categories are merged, codes remapped"""
+        table = self.take(slice(None))
+        table._reserve(len(self) + len(other))
+        start, end = len(self), len(self) + len(other)
+        for name, array in table._text.items():
+            array[start:end] = other.text(name)
+        for name in FLAG_COLUMNS:
+            table._flags[name][start:end] = other.flag(name)
+        for name in CATEGORY_COLUMNS:
+            remap = np.array([table.categories[name].encode(value) for value in other.categories[name].values],
+                             dtype=np.uint16)
+            table._codes[name][start:end] = remap[other.codes(name)]
+        table._score[start:end] = other.scores
+        table._features[start:end] = other.features
+        table._size = end
+        return table
+
+    def index(self) -> 'LeadIndex':
+        """Filter index over the current rows, rebuilt only after rows are added"""
+        if self._index is None or self._index.size != self._size:
+            self._index = LeadIndex(self)
+        return self._index
+
+    def mask(self, lead_filter: LeadFilter) -> np.ndarray:
+        """LeadFilter applied to whole columns at once, as a boolean row mask"""
+        return self.index().mask(lead_filter)
+
+    def feature_batch(self) -> FeatureBatch:
+        return FeatureBatch.from_vectors(np.nan_to_num(self.features), self.codes('industry'),
+                                         self.categories['industry'].values)
+
+    def rescore(self, scoring: ScoringEngine = SCORING, profile: str = DEFAULT_PROFILE) -> 'LeadTable':
+        """Copy with scores recomputed from the stored features alone; leads without features keep theirs"""
+        table = self.take(slice(None))
+        stored = ~np.isnan(table.features).any(axis=1)
+        table._score[stored] = scoring.score(table.feature_batch(), profile)[stored]
+        return table
+
+    def lead(self, i: int) -> Lead:
+        return Lead(
+            industry=self.categories['industry'].values[self._codes['industry'][i]],
+            confidence_score=float(self._score[i]),
+            features=[] if np.isnan(self._features[i]).any() else self._features[i].tolist(),
+            **{name: self._text[name][i] if name in self._text else '' for name in TEXT_COLUMNS}
+        )
+
+    def leads(self, limit: Optional[int] = None) -> Iterable[Lead]:
+        for i in range(self._size if limit is None else min(limit, self._size)):
+            yield self.lead(i)
+
+    def to_frame(self, columns: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """DataFrame built column-wise; ``columns`` maps field names to headers and sets their order"""
+        columns = columns or {name: name for name in TEXT_COLUMNS + CATEGORY_COLUMNS + ('confidence_score',)}
+        return pd.DataFrame({header: self.column(name) for name, header in columns.items()})
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, including the strings it references"""
+        strings = sum(sum(map(len, self.text(name))) + 49 * len(self) for name in self._text)
+        arrays = sum(array.nbytes for group in (self._text, self._codes, self._flags) for array in group.values())
+        return strings + arrays + self._score.nbytes + self._features.nbytes
+
+
+class LeadIndex:
+    """Sorted scores and per-industry row lists of a LeadTable, built once and reused by every filter.
+
+    A score threshold is a binary search into the sorted scores, and an
+    industry filter only touches the rows of the chosen industries, so
+    moving a sidebar control re-filters a large table in milliseconds.
+    """
+
+    def __init__(self, table: LeadTable):
+        self.size = len(table)
+        self.score_order = np.argsort(table.scores, kind='stable')
+        self.sorted_scores = table.scores[self.score_order]
+        codes = table.codes('industry')
+        order = np.argsort(codes, kind='stable')
+        ends = np.cumsum(np.bincount(codes, minlength=len(table.categories['industry'].values)))
+        self.industry_rows = {value: order[end - count:end] for value, end, count
+                              in zip(table.categories['industry'].values, ends, np.diff(ends, prepend=0)) if count}
+        self.flags = {name: table.flag(name) for name in FLAG_COLUMNS}
+
+    def above(self, min_score: float) -> np.ndarray:
+        """Rows scoring at least ``min_score``, in score order"""
+        return self.score_order[np.searchsorted(self.sorted_scores, min_score, side='left'):]
+
+    def mask(self, lead_filter: LeadFilter) -> np.ndarray:
+        keep = np.zeros(self.size, dtype=bool)
+        keep[self.above(lead_filter.min_confidence)] = True
+        if lead_filter.industries:
+            wanted = np.zeros(self.size, dtype=bool)
+            for industry in lead_filter.industries:
+                wanted[self.industry_rows.get(industry, [])] = True
+            keep &= wanted
+        for required, flag in ((lead_filter.require_email, 'has_email'), (lead_filter.require_phone, 'has_phone'),
+                               (lead_filter.require_linkedin, 'has_linkedin')):
+            if required:
+                keep &= self.flags[flag]
+        return keep
@@ -0,0 +1,119 @@
+"""
+Page Readiness Detection
+Author: Prakhar Madnani
+Adaptive post-load waiting for Playwright pages instead of fixed sleeps
+"""
+
+import time
+from dataclasses import dataclass
+
+READINESS_ADAPTIVE = 'adaptive'
+READINESS_NETWORKIDLE = 'networkidle'
+READINESS_FIXED = 'fixed'
+READINESS_STRATEGIES = [READINESS_ADAPTIVE, READINESS_NETWORKIDLE, READINESS_FIXED]
+
+DEFAULT_NAVIGATION_TIMEOUT_MS = 30000
+DEFAULT_MAX_WAIT_MS = 5000
+DEFAULT_QUIET_MS = 400
+DEFAULT_FIXED_WAIT_MS = 3000
+
+# Elements the extractors care about; once any is present the page is useful.
+# Layout chrome such as <footer> is left out because SPA shells ship it before hydration.
+TARGET_SIGNAL_SELECTOR = 'a[href^="mailto:"], script[type="application/ld+json"]'
+
+_WAIT_FOR_READY_JS = """
+({ selector, quietMs, maxWaitMs }) => new Promise(resolve => {
+    let done = false;
+    let quietTimer = null;
+    const hasSignals = () => document.querySelector(selector) !== null;
+    const observer = new MutationObserver(() => {
+        if (hasSignals()) {
+            finish('signals');
+        } else {
+            armQuiet();
+        }
+    });
+    const capTimer = setTimeout(() => finish('timeout'), maxWaitMs);
+    function finish(reason) {
+        if (done) return;
+        done = true;
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(reason);
+    }
+    function armQuiet() {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish('dom_quiet'), quietMs);
+    }
+    if (hasSignals()) {
+        finish('signals');
+        return;
+    }
+    observer.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+    armQuiet();
+})
+"""
+
+
+@dataclass
+class ReadinessResult:
+    """How a page was judged ready and how long that took after DOMContentLoaded"""
+    strategy: str
+    reason: str
+    waited_ms: float
+
+    def as_dict(self) -> dict:
+        return {
+            'readiness': self.strategy,
+            'ready_reason': self.reason,
+            'ready_wait_ms': round(self.waited_ms, 1)
+        }
+
+
+async def wait_until_ready(page, strategy: str = READINESS_ADAPTIVE,
+                           max_wait_ms: int = DEFAULT_MAX_WAIT_MS,
+                           quiet_ms: int = DEFAULT_QUIET_MS,
+                           fixed_wait_ms: int = DEFAULT_FIXED_WAIT_MS) -> ReadinessResult:
+    """Wait for an already-navigated page to be worth extracting.
+
+    ``adaptive`` returns when the DOM has been quiet for ``quiet_ms`` or a target
+    signal appears, ``networkidle`` waits for the network to settle, and ``fixed``
+    sleeps for ``fixed_wait_ms``. Adaptive and networkidle never exceed ``max_wait_ms``.
+    """
+    start = time.perf_counter()
+
+    if strategy == READINESS_FIXED:
+        await page.wait_for_timeout(fixed_wait_ms)
+        reason = 'fixed'
+    elif strategy == READINESS_NETWORKIDLE:
+        try:
+            await page.wait_for_load_state('networkidle', timeout=max_wait_ms)
+            reason = 'networkidle'
+        except Exception:
+            reason = 'timeout'
+    else:
+        strategy = READINESS_ADAPTIVE
+        try:
+            reason = await page.evaluate(_WAIT_FOR_READY_JS, {
+                'selector': TARGET_SIGNAL_SELECTOR,
+                'quietMs': quiet_ms,
+                'maxWaitMs': max_wait_ms
+            })
+        except Exception:
+            # A client-side redirect destroys the execution context; settle on the new document
+            try:
+                await page.wait_for_load_state('domcontentloaded', timeout=max_wait_ms)
+            except Exception:
+                pass
+            reason = 'navigated'
+
+    return ReadinessResult(strategy, reason, (time.perf_counter() - start) * 1000)
+
+
+async def goto_and_wait(page, url: str, strategy: str = READINESS_ADAPTIVE,
+                        navigation_timeout_ms: int = DEFAULT_NAVIGATION_TIMEOUT_MS,
+                        **wait_options) -> ReadinessResult:
+    """Navigate to DOMContentLoaded, then apply the readiness strategy"""
+    await page.goto(url, wait_until='domcontentloaded', timeout=navigation_timeout_ms)
+    return await wait_until_ready(page, strategy, **wait_options)
@@ -0,0 +1,287 @@
+"""
+Parsed Page
+Author: Prakhar Madnani
+One HTML parse per response with lazily computed views shared by every extractor
+"""
+
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+PARSER_LXML = 'lxml'
+PARSER_SELECTOLAX = 'selectolax'
+PARSER_HTML = 'html.parser'
+
+# Text inside these tags never renders, so it is not part of the visible text
+NON_TEXT_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'head', 'title'})
+
+
+@dataclass(frozen=True)
+class Anchor:
+    """A link on the page"""
+    href: str
+    text: str
+
+
+@dataclass
+class PageScan:
+    """Raw views produced by a parser backend in one pass"""
+    title: str = ''
+    meta: List[Dict[str, str]] = field(default_factory=list)
+    anchors: List[Anchor] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+    json_ld: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    tags: Set[str] = field(default_factory=set)
+    ids: Set[str] = field(default_factory=set)
+    attributes: Set[str] = field(default_factory=set)
+
+    def add_text(self, text: Optional[str]):
+        if text:
+            text = text.strip()
+            if text:
+                self.texts.append(text)
+
+    def add_element(self, tag: str, attrs: Dict):
+        self.tags.add(tag)
+        self.attributes.update(attrs)
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+
+
+def _collapse(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def _scan_html_parser(html: str) -> PageScan:
+    soup = BeautifulSoup(html, 'html.parser')
+    scan = PageScan(title=_collapse(soup.title.get_text()) if soup.title else '')
+
+    for tag in soup.find_all(['meta', 'a', 'script']):
+        if tag.name == 'meta':
+            scan.meta.append(tag.attrs)
+        elif tag.name == 'a':
+            if tag.get('href') is not None:
+                scan.anchors.append(Anchor(tag['href'].strip(), tag.get_text(' ', strip=True)))
+        elif tag.get('src'):
+            scan.scripts.append(tag['src'])
+        elif (tag.get('type') or '').lower() == 'application/ld+json':
+            scan.json_ld.append(tag.string or '')
+
+    stack = [soup.body or soup]
+    while stack:
+        node = stack.pop()
+        # Exact type check skips comments, doctypes and script/style strings
+        if type(node) is NavigableString:
+            scan.add_text(node)
+        elif isinstance(node, Tag) and node.name not in NON_TEXT_TAGS:
+            scan.add_element(node.name, node.attrs)
+            stack.extend(reversed(node.contents))
+    return scan
+
+
+def _scan_lxml(html: str) -> PageScan:
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ValueError:
+        # Documents that start with an XML encoding declaration must be parsed from bytes
+        root = lxml.html.document_fromstring(
+            html.encode('utf-8'), parser=lxml.html.HTMLParser(encoding='utf-8')
+        )
+    title = root.find('.//title')
+    scan = PageScan(title=_collapse(title.text_content()) if title is not None else '')
+
+    for element in root.iter('meta', 'a', 'script'):
+        if element.tag == 'meta':
+            scan.meta.append(dict(element.attrib))
+        elif element.tag == 'a':
+            href = element.get('href')
+            if href is not None:
+                text = ' '.join(part.strip() for part in element.itertext() if part.strip())
+                scan.anchors.append(Anchor(href.strip(), text))
+        elif element.get('src'):
+            scan.scripts.append(element.get('src'))
+        elif (element.get('type') or '').lower() == 'application/ld+json':
+            scan.json_ld.append(element.text or '')
+
+    body = root.find('body')
+    stack = [body if body is not None else root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            scan.add_text(node)
+            continue
+        # Comments and processing instructions have a non-string tag
+        if not isinstance(node.tag, str) or node.tag in NON_TEXT_TAGS:
+            continue
+        scan.add_element(node.tag, node.attrib)
+        scan.add_text(node.text)
+        for child in reversed(node):
+            if child.tail:
+                stack.append(child.tail)
+            stack.append(child)
+    return scan
+
+
+def _scan_selectolax(html: str) -> PageScan:
+    tree = LexborHTMLParser(html)
+    title = tree.css_first('title')
+    scan = PageScan(title=_collapse(title.text()) if title is not None else '')
+
+    for node in tree.css('meta, a, script'):
+        attrs = {key: value or '' for key, value in node.attributes.items()}
+        if node.tag == 'meta':
+            scan.meta.append(attrs)
+        elif node.tag == 'a':
+            if 'href' in node.attributes:
+                scan.anchors.append(Anchor(attrs['href'].strip(), node.text(separator=' ', strip=True)))
+        elif attrs.get('src'):
+            scan.scripts.append(attrs['src'])
+        elif attrs.get('type', '').lower() == 'application/ld+json':
+            scan.json_ld.append(node.text())
+
+    stack = [tree.body] if tree.body is not None else []
+    while stack:
+        node = stack.pop()
+        if node.tag == '-text':
+            scan.add_text(node.text_content)
+        elif not node.tag.startswith('-') and node.tag not in NON_TEXT_TAGS:
+            scan.add_element(node.tag, node.attributes)
+            stack.extend(reversed(list(node.iter(include_text=True))))
+    return scan
+
+
+_SCANNERS: Dict[str, Callable[[str], PageScan]] = {PARSER_HTML: _scan_html_parser}
+if LXML_AVAILABLE:
+    _SCANNERS[PARSER_LXML] = _scan_lxml
+if SELECTOLAX_AVAILABLE:
+    _SCANNERS[PARSER_SELECTOLAX] = _scan_selectolax
+
+# Fastest first; html.parser is always available as the pure-Python fallback
+PARSER_BACKENDS = [name for name in (PARSER_SELECTOLAX, PARSER_LXML, PARSER_HTML) if name in _SCANNERS]
+DEFAULT_PARSER = os.environ.get('LEADGEN_PARSER', PARSER_LXML if LXML_AVAILABLE else PARSER_HTML)
+
+
+def resolve_parser(backend: Optional[str] = None) -> str:
+    """Map a requested backend to an installed one, falling back to html.parser"""
+    backend = backend or DEFAULT_PARSER
+    return backend if backend in _SCANNERS else PARSER_HTML
+
+
+class ParsedPage:
+    """An HTML document parsed once; each view is computed on first access and then reused"""
+
+    def __init__(self, html: str, url: str = '', backend: Optional[str] = None):
+        self.html = html or ''
+        self.url = url
+        self.backend = resolve_parser(backend)
+
+    @cached_property
+    def _scan(self) -> PageScan:
+        if not self.html.strip():
+            return PageScan()
+        return _SCANNERS[self.backend](self.html)
+
+    @property
+    def title(self) -> str:
+        return self._scan.title
+
+    @cached_property
+    def meta(self) -> Dict[str, str]:
+        """Meta tag content keyed by lowercased name, property or http-equiv; first tag wins"""
+        meta = {}
+        for attrs in self._scan.meta:
+            key = attrs.get('name') or attrs.get('property') or attrs.get('http-equiv')
+            if key and attrs.get('content') is not None:
+                meta.setdefault(key.lower(), attrs['content'])
+        return meta
+
+    @property
+    def description(self) -> str:
+        return self.meta.get('description', '')
+
+    @cached_property
+    def visible_text(self) -> str:
+        """Rendered text of the body; scripts, styles, noscript and templates are excluded"""
+        return ' '.join(self._scan.texts)
+
+    @cached_property
+    def text_lower(self) -> str:
+        return self.visible_text.lower()
+
+    @property
+    def anchors(self) -> List[Anchor]:
+        return self._scan.anchors
+
+    @cached_property
+    def hrefs(self) -> List[str]:
+        return [anchor.href for anchor in self.anchors]
+
+    def hrefs_with_scheme(self, scheme: str) -> List[str]:
+        """Targets of links such as mailto: or tel:, with the scheme and any query removed"""
+        prefix = f"{scheme}:"
+        return [
+            href[len(prefix):].split('?')[0].strip()
+            for href in self.hrefs if href.lower().startswith(prefix)
+        ]
+
+    @property
+    def script_srcs(self) -> List[str]:
+        return self._scan.scripts
+
+    def has_element(self, tag: Optional[str] = None, id: Optional[str] = None,
+                    attribute: Optional[str] = None) -> bool:
+        """Whether the body contains a tag name, an element id or an attribute name"""
+        scan = self._scan
+        return bool((tag and tag in scan.tags) or (id and id in scan.ids) or
+                    (attribute and attribute in scan.attributes))
+
+    @cached_property
+    def json_ld(self) -> List[Dict]:
+        """Every JSON-LD object on the page, with top-level lists and @graph flattened"""
+        blocks = []
+        for source in self._scan.json_ld:
+            try:
+                data = json.loads(source)
+            except ValueError:
+                continue
+            items = data if isinstance(data, list) else [data]
+            for item in items:
+                if isinstance(item, dict):
+                    blocks.append(item)
+                    blocks.extend(node for node in item.get('@graph', []) if isinstance(node, dict))
+        return blocks
+
+    def json_ld_values(self, key: str) -> List[Any]:
+        """All values stored under ``key`` anywhere in the JSON-LD blocks"""
+        values = []
+        queue = deque(self.json_ld)
+        while queue:
+            node = queue.popleft()
+            if isinstance(node, dict):
+                for name, value in node.items():
+                    if name == key:
+                        values.extend(value if isinstance(value, list) else [value])
+                    elif name != '@graph' and isinstance(value, (dict, list)):
+                        # @graph nodes are already top-level entries of json_ld
+                        queue.append(value)
+            elif isinstance(node, list):
+                queue.extend(node)
+        return values
@@ -0,0 +1,147 @@
+"""
+Streaming Lead Pipeline
+Author: Prakhar Madnani
+Generator stages from raw domain input to qualified leads, with bounded queues so memory stays flat
+"""
+
+import itertools
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from dns_preflight import DnsPreflight
+from enrichment_engine import EnrichmentEngine, EnrichmentResult
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_PREFLIGHT_BATCH = 128
+
+_END = object()
+
+
+def normalize_domain(raw: str) -> str:
+    """Strip whitespace and the URL scheme from one line of user input"""
+    return raw.strip().replace('https://', '').replace('http://', '')
+
+
+def normalize(lines: Iterable[str]) -> Iterator[str]:
+    """Normalize stage: one clean domain per non-empty input line"""
+    for line in lines:
+        if not isinstance(line, str):
+            continue
+        domain = normalize_domain(line)
+        if domain:
+            yield domain
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def preflight(domains: Iterable[str], dns_preflight: DnsPreflight,
+              batch_size: int = DEFAULT_PREFLIGHT_BATCH) -> Iterator[str]:
+    """Resolve stage: warm the DNS cache one batch ahead; dead hosts then fail fast in the fetch stage"""
+    for batch in batched(domains, batch_size):
+        dns_preflight.check(batch)
+        yield from batch
+
+
+def buffered(items: Iterable, maxsize: int = DEFAULT_QUEUE_SIZE) -> Iterator:
+    """Run an upstream stage on its own thread, at most ``maxsize`` items ahead of the consumer"""
+    channel: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                channel.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, name='pipeline-stage', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = channel.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+@dataclass
+class PipelineEvent:
+    """One domain leaving the pipeline, successful or not"""
+    result: EnrichmentResult
+    lead: Any = None
+    qualified: bool = False
+
+    @property
+    def domain(self) -> str:
+        return self.result.domain
+
+    @property
+    def company_info(self):
+        return self.result.company_info
+
+
+class LeadPipeline:
+    """input -> normalize -> resolve -> fetch/parse/extract -> score -> filter, pulled lazily by a sink.
+
+    Each stage is a generator. The resolve stage runs ahead on its own thread
+    behind a bounded queue, and the enrichment stage keeps at most
+    ``2 * max_workers`` domains in flight, so nothing upstream of the sink
+    grows with the length of the input.
+    """
+
+    def __init__(self, engine: EnrichmentEngine, build_lead: Callable[[str, dict], Any],
+                 accept: Optional[Callable[[Any], bool]] = None,
+                 dns_preflight: Optional[DnsPreflight] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 preflight_batch: int = DEFAULT_PREFLIGHT_BATCH):
+        self.engine = engine
+        self.build_lead = build_lead
+        self.accept = accept
+        self.dns_preflight = dns_preflight
+        self.queue_size = queue_size
+        self.preflight_batch = preflight_batch
+
+    def domains(self, lines: Iterable[str]) -> Iterator[str]:
+        domains = normalize(lines)
+        if self.dns_preflight is not None:
+            domains = buffered(preflight(domains, self.dns_preflight, self.preflight_batch), self.queue_size)
+        return domains
+
+    def score(self, result: EnrichmentResult) -> PipelineEvent:
+        if not result.ok:
+            return PipelineEvent(result)
+        try:
+            lead = self.build_lead(result.domain, result.company_info)
+        except Exception as e:
+            return PipelineEvent(EnrichmentResult(result.domain, {'domain': result.domain, 'error': str(e)},
+                                                  result.elapsed))
+        return PipelineEvent(result, lead, self.accept(lead) if self.accept else True)
+
+    def run(self, lines: Iterable[str], use_playwright: bool = False, **extract_options) -> Iterator[PipelineEvent]:
+        """Yield an event per domain in completion order; extra options go to ``extract_company_info``"""
+        for result in self.engine.enrich(self.domains(lines), use_playwright, **extract_options):
+            yield self.score(result)
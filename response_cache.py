@@ -0,0 +1,219 @@
+"""
+HTTP Response Cache
+Author: Prakhar Madnani
+Persistent SQLite-backed cache for homepage fetches with conditional revalidation
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = os.environ.get('LEADGEN_CACHE_DIR', '.lead_cache')
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Hop-by-hop and per-connection headers are meaningless once stored
+_SKIPPED_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'set-cookie', 'content-encoding',
+                    'content-length'}
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a URL has never been cached"""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lowercase scheme/host, no default port, no fragment, sorted query"""
+    parts = urlsplit(url if '://' in url else f"https://{url}")
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class ResponseCache:
+    """Stores response bodies and validators on disk and revalidates them with conditional GETs"""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_CACHE_BYTES, offline: bool = False):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, 'http_cache.sqlite3')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                final_url TEXT,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL,
+                last_access REAL,
+                size INTEGER,
+                truncated INTEGER DEFAULT 0
+            )
+        """)
+        # Caches written before the flag existed get the column; their rows read as complete
+        if 'truncated' not in {row[1] for row in self._conn.execute('PRAGMA table_info(responses)')}:
+            self._conn.execute('ALTER TABLE responses ADD COLUMN truncated INTEGER DEFAULT 0')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        self._conn.commit()
+
+    def _load(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, final_url, headers, body, etag, last_modified, expires_at, truncated '
+                'FROM responses WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), key))
+            self._conn.commit()
+        status, final_url, headers, body, etag, last_modified, expires_at, truncated = row
+        return {
+            'status': status, 'final_url': final_url, 'headers': json.loads(headers),
+            'body': body, 'etag': etag, 'last_modified': last_modified, 'expires_at': expires_at,
+            'truncated': bool(truncated)
+        }
+
+    def _store(self, key: str, response: requests.Response):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        body = response.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.status_code, response.url, json.dumps(headers), body,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 now + self.ttl, now, len(body), int(getattr(response, 'truncated', False)))
+            )
+            self._conn.commit()
+            self.stats['stored'] += 1
+            self._evict_locked()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _touch(self, key: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET expires_at = ?, last_access = ? WHERE url = ?',
+                (now + self.ttl, now, key)
+            )
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so eviction does not run on every subsequent store
+        target = int(self.max_bytes * 0.9)
+        for url, size in self._conn.execute(
+            'SELECT url, size FROM responses ORDER BY last_access ASC'
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
+            self.stats['evicted'] += 1
+        self._conn.commit()
+
+    @staticmethod
+    def _to_response(entry: Dict, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.url = entry['final_url'] or url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        # A body cut off at the byte cap stays marked as partial when served from the cache
+        response.truncated = entry['truncated']
+        response.from_cache = True
+        return response
+
+    def get(self, session, url: str, timeout: float = 10, offline: Optional[bool] = None,
+            **request_options) -> requests.Response:
+        """Return a fresh cached response, a revalidated one, or fetch and store a new one.
+
+        ``session`` is a requests.Session or anything with the same ``get``
+        signature; extra keyword arguments are passed through to it.
+        ``offline`` overrides the cache's own setting for this call, so callers
+        sharing one cache can each choose.
+        """
+        offline = self.offline if offline is None else offline
+        key = normalize_url(url)
+        entry = self._load(key)
+
+        if entry is not None and (offline or time.time() < entry['expires_at']):
+            self._count('hits')
+            return self._to_response(entry, url)
+
+        if offline:
+            self._count('misses')
+            raise CacheMissError(f"{url} is not cached (offline mode)")
+
+        conditional = {}
+        if entry is not None:
+            if entry['etag']:
+                conditional['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                conditional['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, timeout=timeout, headers=conditional, **request_options)
+
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            self._touch(key)
+            return self._to_response(entry, url)
+
+        self._count('misses')
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if response.status_code == 200 and 'no-store' not in cache_control:
+            self._store(key, response)
+        response.from_cache = False
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache in the cache directory, opened once and shared by every rerun and the CLI"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
@@ -0,0 +1,143 @@
+"""
+Enrichment Result Cache
+Author: Prakhar Madnani
+SQLite store of final company_info dicts keyed by domain, method and extractor version
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from response_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_RESULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MEMORY_ENTRIES = 10000
+
+
+def extractor_fingerprint(sources: Iterable) -> str:
+    """Hash the source code of the given classes, functions or modules.
+
+    Any edit to extraction code changes the fingerprint, so results produced
+    by older code are never served.
+    """
+    digest = hashlib.sha1()
+    for obj in sources:
+        try:
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(repr(obj).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class EnrichmentResultCache:
+    """Two-level cache: an in-process LRU in front of a persistent SQLite table"""
+
+    def __init__(self, version: str, path: Optional[str] = None,
+                 ttl: float = DEFAULT_RESULT_TTL_SECONDS,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.version = version
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, 'results.sqlite3')
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                domain TEXT,
+                method TEXT,
+                version TEXT,
+                company_info TEXT,
+                expires_at REAL,
+                PRIMARY KEY (domain, method, version)
+            )
+        """)
+        # Entries from other extractor versions can never be served again
+        self._conn.execute('DELETE FROM results WHERE version != ? OR expires_at < ?',
+                           (version, time.time()))
+        self._conn.commit()
+
+    def get(self, domain: str, method: str) -> Optional[Dict]:
+        key = (domain.lower(), method)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                return dict(entry[1])
+
+            row = self._conn.execute(
+                'SELECT company_info, expires_at FROM results '
+                'WHERE domain = ? AND method = ? AND version = ? AND expires_at > ?',
+                (key[0], method, self.version, now)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            company_info = json.loads(row[0])
+            self._remember(key, row[1], company_info)
+            self.stats['hits'] += 1
+            return dict(company_info)
+
+    def put(self, domain: str, method: str, company_info: Dict):
+        key = (domain.lower(), method)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (key[0], method, self.version, json.dumps(company_info), expires_at)
+            )
+            self._conn.commit()
+            self._remember(key, expires_at, dict(company_info))
+            self.stats['stored'] += 1
+
+    def _remember(self, key, expires_at: float, company_info: Dict):
+        self._memory[key] = (expires_at, company_info)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def hit_rate(self, since: Optional[Dict] = None) -> float:
+        """Hit rate overall, or since a previous snapshot of ``stats``"""
+        since = since or {}
+        hits = self.stats['hits'] - since.get('hits', 0)
+        misses = self.stats['misses'] - since.get('misses', 0)
+        lookups = hits + misses
+        return hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute('DELETE FROM results')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_caches: Dict[str, EnrichmentResultCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_result_cache(version: str) -> EnrichmentResultCache:
+    """Process-wide cache for one extractor version, so its in-memory entries outlive Streamlit reruns"""
+    with _shared_lock:
+        cache = _shared_caches.get(version)
+        if cache is None:
+            cache = _shared_caches[version] = EnrichmentResultCache(version)
+        return cache
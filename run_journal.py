@@ -0,0 +1,298 @@
+"""
+Run Journal
+Author: Prakhar Madnani
+Durable SQLite journal of batch runs: per-domain status and results, so interrupted runs resume where they stopped
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from response_cache import DEFAULT_CACHE_DIR
+from pipeline import PipelineEvent, batched, normalize
+
+STATUS_PENDING = 'pending'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+RUN_RUNNING = 'running'
+RUN_COMPLETED = 'completed'
+RUN_INTERRUPTED = 'interrupted'
+
+DEFAULT_COMMIT_EVERY = 200
+DEFAULT_COMMIT_INTERVAL_SECONDS = 2.0
+SPOOL_BATCH = 5000
+READ_PAGE = 1000
+# Domains per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+
+
+def new_run_id() -> str:
+    """Sortable, human-readable run ID such as 20240501-142233-9f3a"""
+    return time.strftime('%Y%m%d-%H%M%S') + '-' + secrets.token_hex(2)
+
+
+@dataclass
+class RunSummary:
+    """One journaled run and how far it got"""
+    run_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    label: str = ''
+    settings: Dict = field(default_factory=dict)
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    qualified: int = 0
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.finished
+
+    @property
+    def resumable(self) -> bool:
+        return self.pending > 0
+
+
+class RunJournal:
+    """Records every domain of a batch run as pending, done or failed, with its result.
+
+    Domains are spooled to SQLite before any work starts, so the input never
+    has to be read again. Results are committed in small batches; a crash
+    loses at most the last uncommitted batch, and those domains are simply
+    still pending when the run is resumed.
+    """
+
+    def __init__(self, path: Optional[str] = None, commit_every: int = DEFAULT_COMMIT_EVERY,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL_SECONDS):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, 'runs.sqlite3')
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._unsaved = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        # Per-run status counts, valid until the run's updated_at moves; every commit advances it
+        self._counts: Dict[str, Tuple[float, Dict[str, int], int]] = {}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                status TEXT,
+                label TEXT,
+                settings TEXT,
+                total INTEGER,
+                created_at REAL,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_domains (
+                run_id TEXT,
+                seq INTEGER,
+                domain TEXT,
+                status TEXT,
+                qualified INTEGER DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                elapsed REAL,
+                PRIMARY KEY (run_id, seq),
+                UNIQUE (run_id, domain)
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS run_domains_status ON run_domains (run_id, status)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS run_domains_domain ON run_domains (domain, status)')
+        self._conn.commit()
+
+    def start_run(self, lines: Iterable[str], settings: Optional[Dict] = None, label: str = '') -> str:
+        """Spool the normalized input into a new run and return its ID; duplicate domains are kept once"""
+        run_id = new_run_id()
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT INTO runs VALUES (?, ?, ?, ?, 0, ?, ?)',
+                               (run_id, RUN_RUNNING, label, json.dumps(settings or {}), now, now))
+            seq = 0
+            for batch in batched(normalize(lines), SPOOL_BATCH):
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO run_domains (run_id, seq, domain, status) VALUES (?, ?, ?, ?)',
+                    [(run_id, seq + i, domain, STATUS_PENDING) for i, domain in enumerate(batch)]
+                )
+                seq += len(batch)
+            total = self._conn.execute('SELECT COUNT(*) FROM run_domains WHERE run_id = ?', (run_id,)).fetchone()[0]
+            self._conn.execute('UPDATE runs SET total = ? WHERE run_id = ?', (total, run_id))
+            self._conn.commit()
+        return run_id
+
+    def pending(self, run_id: str) -> Iterator[str]:
+        """Unfinished domains in input order, paged from SQLite so the run never sits in memory"""
+        last_seq = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT seq, domain FROM run_domains WHERE run_id = ? AND seq > ? AND status = ? '
+                    'ORDER BY seq LIMIT ?', (run_id, last_seq, STATUS_PENDING, READ_PAGE)
+                ).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            for _, domain in rows:
+                yield domain
+
+    def record(self, run_id: str, event: PipelineEvent, result: Optional[Dict] = None):
+        """Mark one domain done or failed; ``result`` defaults to the lead's fields. Committed with the next batch"""
+        if event.lead is None:
+            values = (STATUS_FAILED, 0, None, event.company_info.get('error', ''))
+        else:
+            if result is None:
+                result = asdict(event.lead) if is_dataclass(event.lead) else event.lead
+            values = (STATUS_DONE, int(event.qualified), json.dumps(result), None)
+        with self._lock:
+            self._conn.execute(
+                'UPDATE run_domains SET status = ?, qualified = ?, result = ?, error = ?, elapsed = ? '
+                'WHERE run_id = ? AND domain = ?', values + (event.result.elapsed, run_id, event.domain)
+            )
+            self._unsaved += 1
+            if (self._unsaved >= self.commit_every or
+                    time.monotonic() - self._last_commit >= self.commit_interval):
+                self._commit(run_id)
+
+    def _commit(self, run_id: str):
+        self._conn.execute('UPDATE runs SET updated_at = ? WHERE run_id = ?', (time.time(), run_id))
+        self._conn.commit()
+        self._unsaved = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self, run_id: str):
+        with self._lock:
+            self._commit(run_id)
+
+    def finish(self, run_id: str, status: Optional[str] = None):
+        """Commit outstanding results and close the run; completed only if nothing is left pending"""
+        with self._lock:
+            if status is None:
+                left = self._conn.execute('SELECT 1 FROM run_domains WHERE run_id = ? AND status = ? LIMIT 1',
+                                          (run_id, STATUS_PENDING)).fetchone()
+                status = RUN_INTERRUPTED if left else RUN_COMPLETED
+            self._conn.execute('UPDATE runs SET status = ? WHERE run_id = ?', (status, run_id))
+            self._commit(run_id)
+
+    def reopen(self, run_id: str):
+        with self._lock:
+            self._conn.execute('UPDATE runs SET status = ? WHERE run_id = ?', (RUN_RUNNING, run_id))
+            self._commit(run_id)
+
+    def _summaries(self, where: str = '', params: Tuple = (), limit: int = -1) -> List[RunSummary]:
+        with self._lock:
+            runs = self._conn.execute(
+                'SELECT run_id, status, created_at, updated_at, label, settings, total FROM runs '
+                f'{where} ORDER BY created_at DESC LIMIT ?', params + (limit,)
+            ).fetchall()
+            summaries = []
+            for run_id, status, created_at, updated_at, label, settings, total in runs:
+                cached = self._counts.get(run_id)
+                if cached is not None and cached[0] == updated_at:
+                    _, counts, qualified = cached
+                else:
+                    counts = dict(self._conn.execute(
+                        'SELECT status, COUNT(*) FROM run_domains WHERE run_id = ? GROUP BY status', (run_id,)
+                    ).fetchall())
+                    qualified = self._conn.execute(
+                        'SELECT COUNT(*) FROM run_domains WHERE run_id = ? AND status = ? AND qualified = 1',
+                        (run_id, STATUS_DONE)
+                    ).fetchone()[0]
+                    self._counts[run_id] = (updated_at, counts, qualified)
+                summaries.append(RunSummary(
+                    run_id, status, created_at, updated_at, label, json.loads(settings or '{}'), total,
+                    counts.get(STATUS_DONE, 0), counts.get(STATUS_FAILED, 0), qualified
+                ))
+        return summaries
+
+    def runs(self, limit: int = 50) -> List[RunSummary]:
+        """Most recent runs first"""
+        return self._summaries(limit=limit)
+
+    def run(self, run_id: str) -> Optional[RunSummary]:
+        summaries = self._summaries('WHERE run_id = ?', (run_id,))
+        return summaries[0] if summaries else None
+
+    def results(self, run_id: Optional[str] = None, qualified_only: bool = True) -> Iterator[Dict]:
+        """Stored lead dicts in input order; without a run ID, the latest result per domain across all runs"""
+        if run_id is None:
+            query = ('SELECT d.rowid, d.result FROM run_domains d WHERE d.rowid > ? AND d.status = ? '
+                     'AND NOT EXISTS (SELECT 1 FROM run_domains n WHERE n.domain = d.domain '
+                     'AND n.status = d.status AND n.rowid > d.rowid)')
+            key, params = 'd.rowid', ()
+        else:
+            query = 'SELECT seq, result FROM run_domains WHERE seq > ? AND status = ? AND run_id = ?'
+            key, params = 'seq', (run_id,)
+        if qualified_only:
+            query += ' AND qualified = 1'
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(f'{query} ORDER BY {key} LIMIT ?',
+                                          (last, STATUS_DONE) + params + (READ_PAGE,)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, result in rows:
+                yield json.loads(result)
+
+    def results_for(self, run_id: str, domains: Iterable[str]) -> Dict[str, Dict]:
+        """Stored lead dicts of selected domains of a run, by domain"""
+        found = {}
+        for batch in batched(domains, LOOKUP_BATCH):
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT domain, result FROM run_domains WHERE run_id = ? AND status = ? "
+                    f"AND domain IN ({', '.join('?' * len(batch))})", (run_id, STATUS_DONE, *batch)
+                ).fetchall()
+            found.update((domain, json.loads(result)) for domain, result in rows)
+        return found
+
+    def failures(self, run_id: str) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT domain, error FROM run_domains WHERE run_id = ? AND status = ? ORDER BY seq',
+                (run_id, STATUS_FAILED)
+            ).fetchall()
+
+    def delete_run(self, run_id: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM run_domains WHERE run_id = ?', (run_id,))
+            self._conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+            self._conn.commit()
+            self._counts.pop(run_id, None)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+_shared_journal: Optional[RunJournal] = None
+_shared_lock = threading.Lock()
+
+
+def get_run_journal() -> RunJournal:
+    """Process-wide journal in the cache directory"""
+    global _shared_journal
+    with _shared_lock:
+        if _shared_journal is None:
+            _shared_journal = RunJournal()
+        return _shared_journal
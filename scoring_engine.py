@@ -0,0 +1,198 @@
+"""
+Scoring Engine
+Author: Prakhar Madnani
+Vectorized lead scoring: feature columns for a whole batch, scored with NumPy from a configurable weight table
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_WEIGHTS_PATH = os.environ.get(
+    'LEADGEN_SCORING_WEIGHTS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'scoring_weights.json')
+)
+DEFAULT_PROFILE = 'lead_generator'
+
+# Numeric features, one column each in FeatureBatch.values
+NUMERIC_FEATURES = ('emails', 'phones', 'linkedin', 'social', 'description_length', 'tech_count',
+                    'high_value', 'industry_known')
+FEATURE_INDEX = {name: i for i, name in enumerate(NUMERIC_FEATURES)}
+# Layout of the per-lead vector kept with each lead; industry travels as the lead's own field
+VECTOR_FEATURES = NUMERIC_FEATURES + ('size',)
+# Categorical features, stored as codes into a vocabulary
+CATEGORICAL_FEATURES = ('industry', 'size')
+SIZE_BUCKETS = ('', 'Large', 'Medium', 'Small')
+UNKNOWN_INDUSTRIES = ('', 'Other')
+
+
+def _count_items(value) -> int:
+    """Entries in a list, or comma-separated entries in a non-blank string"""
+    if isinstance(value, str):
+        return len(value.split(',')) if value.strip() else 0
+    return len(value) if value else 0
+
+
+def _social_count(info: Dict) -> int:
+    social = info.get('social_media') or {}
+    if isinstance(social, str):
+        social = json.loads(social or '{}')
+    return len(social)
+
+
+def _size_bucket(employee_count: str) -> int:
+    for code, bucket in enumerate(SIZE_BUCKETS[1:], 1):
+        if bucket in (employee_count or ''):
+            return code
+    return 0
+
+
+@dataclass
+class FeatureBatch:
+    """Scoring inputs for many leads: a numeric matrix plus categorical codes, one row per lead"""
+    values: np.ndarray
+    industry: np.ndarray
+    size: np.ndarray
+    industries: List[str] = field(default_factory=lambda: [''])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, FEATURE_INDEX[name]]
+
+    def codes(self, name: str) -> np.ndarray:
+        return self.industry if name == 'industry' else self.size
+
+    def vocabulary(self, name: str) -> Sequence[str]:
+        return self.industries if name == 'industry' else SIZE_BUCKETS
+
+    def vectors(self) -> np.ndarray:
+        """One stored feature vector per row, laid out as VECTOR_FEATURES"""
+        return np.column_stack([self.values, self.size]).astype(np.float32)
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, industry: np.ndarray, industries: Sequence[str]) -> 'FeatureBatch':
+        """Rebuild a batch from stored vectors and industry codes, without the original pages"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, len(VECTOR_FEATURES))
+        return cls(np.asfortranarray(vectors[:, :-1]), np.asarray(industry, dtype=np.int32),
+                   vectors[:, -1].astype(np.int32), list(industries))
+
+
+class _LinearRule:
+    """min(feature * per_unit, cap)"""
+
+    def __init__(self, feature: str, per_unit: float, cap: float = np.inf):
+        self.index = FEATURE_INDEX[feature]
+        self.per_unit = np.float32(per_unit)
+        self.cap = np.float32(cap)
+
+    def add_to(self, total: np.ndarray, batch: FeatureBatch):
+        points = batch.values[:, self.index] * self.per_unit
+        total += np.minimum(points, self.cap, out=points)
+
+
+class _TierRule:
+    """Points of the first tier whose feature reaches its minimum, else the default"""
+
+    def __init__(self, tiers: List[Dict], default: float = 0):
+        self.tiers = [(FEATURE_INDEX[tier['feature']], tier.get('min', 1), tier['points']) for tier in tiers]
+        self.default = default
+
+    def add_to(self, total: np.ndarray, batch: FeatureBatch):
+        points = np.full(len(batch), self.default, dtype=np.float32)
+        # Lowest priority first, so earlier tiers overwrite later ones where both match
+        for index, minimum, tier_points in reversed(self.tiers):
+            points[batch.values[:, index] >= minimum] = tier_points
+        total += points
+
+
+class _LookupRule:
+    """Points per category of a categorical feature, else the default"""
+
+    def __init__(self, feature: str, points: Dict[str, float], default: float = 0):
+        if feature not in CATEGORICAL_FEATURES:
+            raise ValueError(f"'{feature}' is not a categorical feature")
+        self.feature = feature
+        self.points = points
+        self.default = default
+
+    def add_to(self, total: np.ndarray, batch: FeatureBatch):
+        table = np.array([self.points.get(value, self.default) for value in batch.vocabulary(self.feature)],
+                         dtype=np.float32)
+        total += table[batch.codes(self.feature)]
+
+
+def _compile_rule(rule: Dict):
+    if 'tiers' in rule:
+        return _TierRule(rule['tiers'], rule.get('default', 0))
+    if 'points' in rule:
+        return _LookupRule(rule['feature'], rule['points'], rule.get('default', 0))
+    return _LinearRule(rule['feature'], rule['per_unit'], rule.get('cap', np.inf))
+
+
+class ScoringEngine:
+    """Scores whole batches of leads with array operations; each profile is a named weight table"""
+
+    def __init__(self, profiles: Dict[str, Dict[str, Dict]], max_score: float = 100,
+                 high_value_domains: Iterable[str] = ()):
+        self.max_score = max_score
+        self.high_value_domains = frozenset(high_value_domains)
+        self.weights = profiles
+        self.profiles = {name: {rule_name: _compile_rule(rule) for rule_name, rule in rules.items()
+                                if not rule_name.startswith('_')}
+                         for name, rules in profiles.items()}
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'ScoringEngine':
+        with open(path or DEFAULT_WEIGHTS_PATH, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config['profiles'], max_score=config.get('max_score', 100),
+                   high_value_domains=config.get('high_value_domains', []))
+
+    def with_profile(self, name: str, rules: Dict[str, Dict]) -> 'ScoringEngine':
+        """Copy of this engine with one profile replaced, for tuning weights interactively"""
+        return ScoringEngine({**self.weights, name: rules}, self.max_score, self.high_value_domains)
+
+    def features(self, company_infos: Iterable[Dict], domains: Optional[Iterable[str]] = None) -> FeatureBatch:
+        """Extract the feature columns once; rescoring with other weights reuses them"""
+        infos = list(company_infos)
+        domains = list(domains) if domains is not None else [info.get('domain', '') for info in infos]
+        industries = {'': 0}
+        # Column-major, so every rule reads its feature as one contiguous column
+        values = np.zeros((len(infos), len(NUMERIC_FEATURES)), dtype=np.float32, order='F')
+        industry = np.zeros(len(infos), dtype=np.int32)
+        size = np.zeros(len(infos), dtype=np.int32)
+        for row, (info, domain) in enumerate(zip(infos, domains)):
+            name = info.get('industry') or ''
+            industry[row] = industries.setdefault(name, len(industries))
+            size[row] = _size_bucket(info.get('employee_count'))
+            values[row] = (
+                _count_items(info.get('emails')),
+                _count_items(info.get('phones')),
+                bool(info.get('linkedin')),
+                _social_count(info),
+                len(info.get('description') or ''),
+                _count_items(info.get('technology_stack')),
+                domain in self.high_value_domains,
+                name not in UNKNOWN_INDUSTRIES
+            )
+        return FeatureBatch(values, industry, size, list(industries))
+
+    def score(self, batch: FeatureBatch, profile: str = DEFAULT_PROFILE) -> np.ndarray:
+        """Scores for every row of the batch under one profile's weights"""
+        total = np.zeros(len(batch), dtype=np.float32)
+        for rule in self.profiles[profile].values():
+            rule.add_to(total, batch)
+        return np.clip(total, 0, self.max_score, out=total)
+
+    def score_one(self, company_info: Dict, domain: Optional[str] = None, profile: str = DEFAULT_PROFILE) -> float:
+        domains = None if domain is None else [domain]
+        return float(self.score(self.features([company_info], domains), profile)[0])
+
+
+# Loaded once at import and shared by every app and the CLI
+SCORING = ScoringEngine.load()
@@ -8,6 +8,128 @@ import subprocess
 import sys
 import importlib
 import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+@contextmanager
+def serve_pages(pages):
+    """Serve ``{path: (status, headers, body)}`` on localhost and yield the base URL"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers, body = pages.get(self.path, (404, {}, b''))
+            self.send_response(status)
+            for name, value in {'Content-Length': str(len(body)), **headers}.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class FakeContext:
+    """Stands in for a Playwright BrowserContext; records its route handler and closing"""
+    def __init__(self, browser):
+        self.browser = browser
+        self.handler = None
+        self.closed = False
+    
+    async def route(self, pattern, handler):
+        self.handler = handler
+    
+    async def new_page(self):
+        return object()
+    
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    """Stands in for a Chromium browser; hands out FakeContexts"""
+    def __init__(self, args):
+        self.args = args
+        self.contexts = []
+        self.closed = False
+    
+    def is_connected(self):
+        return not self.closed
+    
+    async def new_context(self, **options):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+    
+    async def close(self):
+        self.closed = True
+
+class FakePlaywright:
+    """Stands in for a started Playwright driver; ``chromium.launch`` returns FakeBrowsers"""
+    def __init__(self):
+        self.chromium = self
+        self.browsers = []
+        self.stopped = False
+    
+    async def launch(self, headless=True, args=None):
+        self.browsers.append(FakeBrowser(args))
+        return self.browsers[-1]
+    
+    async def stop(self):
+        self.stopped = True
+
+class FakeRequest:
+    """Stands in for a Playwright Request as seen by a route handler"""
+    def __init__(self, resource_type, url, navigation=False, parent_frame=None):
+        self.resource_type = resource_type
+        self.url = url
+        self.navigation = navigation
+        self.frame = type('Frame', (), {'parent_frame': parent_frame})()
+    
+    def is_navigation_request(self):
+        return self.navigation
+
+class FakeRoute:
+    """Stands in for a Playwright Route; remembers whether it was aborted or continued"""
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+    
+    async def abort(self):
+        self.outcome = 'abort'
+    
+    async def continue_(self):
+        self.outcome = 'continue'
+
+class FakePage:
+    """Stands in for a Playwright Page; ``evaluate`` reports signals found among ``elements``"""
+    def __init__(self, elements=(), redirects=False, network_idle=True):
+        self.elements = set(elements)
+        self.redirects = redirects
+        self.network_idle = network_idle
+        self.calls = []
+    
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.calls.append(('goto', url, wait_until, timeout))
+    
+    async def evaluate(self, script, args):
+        self.calls.append(('evaluate', args['selector']))
+        if self.redirects:
+            raise RuntimeError("Execution context was destroyed")
+        signals = [selector.strip() for selector in args['selector'].split(',')]
+        return 'signals' if self.elements.intersection(signals) else 'dom_quiet'
+    
+    async def wait_for_load_state(self, state, timeout=None):
+        self.calls.append(('load_state', state, timeout))
+        if state == 'networkidle' and not self.network_idle:
+            raise TimeoutError("networkidle")
+    
+    async def wait_for_timeout(self, ms):
+        self.calls.append(('sleep', ms))
 
 def test_dependencies():
     """Test if required packages are installed"""
@@ -65,6 +187,1126 @@ def test_demo_script():
         print(f"❌ Demo script error: {str(e)}")
         return False
 
+def test_enrichment_engine():
+    """Test concurrent engine returns every domain in completion order"""
+    print("\n⚡ Testing Enrichment Engine...")
+    
+    try:
+        import time
+        from enrichment_engine import EnrichmentEngine
+        
+        class SlowEnricher:
+            def extract_company_info(self, domain, use_playwright=False):
+                time.sleep(0.2 if domain == 'slow.com' else 0.01)
+                return {'domain': domain}
+        
+        engine = EnrichmentEngine(SlowEnricher(), max_workers=4, per_host_limit=1)
+        order = [r.domain for r in engine.enrich(['slow.com', 'a.com', 'b.com', 'c.com'])]
+        
+        if sorted(order) == ['a.com', 'b.com', 'c.com', 'slow.com'] and order[-1] == 'slow.com':
+            print("✅ Results arrive in completion order")
+            return True
+        print(f"❌ Unexpected order: {order}")
+        return False
+    except Exception as e:
+        print(f"❌ Enrichment engine error: {str(e)}")
+        return False
+
+def test_parser_parity():
+    """Test every installed parser backend produces the same page views"""
+    print("\n🧩 Testing Parser Backend Parity...")
+    
+    try:
+        import glob
+        from parsed_page import ParsedPage, PARSER_BACKENDS, PARSER_HTML
+        
+        def views(page):
+            return (page.title, page.meta, page.visible_text, page.anchors, page.script_srcs,
+                    page.json_ld, page.has_element(id='root'), page.has_element(id='__next'))
+        
+        corpus = sorted(glob.glob(os.path.join('sample_data', 'html_corpus', '*.html')))
+        mismatches = []
+        for path in corpus:
+            with open(path, encoding='utf-8') as f:
+                html = f.read()
+            expected = views(ParsedPage(html, backend=PARSER_HTML))
+            for backend in PARSER_BACKENDS:
+                if views(ParsedPage(html, backend=backend)) != expected:
+                    mismatches.append(f"{os.path.basename(path)} ({backend})")
+        
+        with open(os.path.join('sample_data', 'html_corpus', 'hidden_content.html'), encoding='utf-8') as f:
+            hidden = ParsedPage(f.read())
+        if 'script-only@' in hidden.visible_text or 'template-only@' in hidden.visible_text:
+            mismatches.append("hidden_content.html leaks script or template text")
+        
+        if corpus and not mismatches:
+            print(f"✅ {len(PARSER_BACKENDS)} backends agree on {len(corpus)} pages: {', '.join(PARSER_BACKENDS)}")
+            return True
+        print(f"❌ Parser mismatches: {mismatches or 'empty corpus'}")
+        return False
+    except Exception as e:
+        print(f"❌ Parser parity error: {str(e)}")
+        return False
+
+def test_auto_escalation():
+    """Test Auto mode escalates only JS shells and reports the extraction method actually used"""
+    print("\n🪜 Testing Auto Escalation...")
+    
+    try:
+        import glob
+        from email_validation import MODE_SYNTAX, get_email_validator
+        from lead_enricher import LeadEnricher
+        from parsed_page import ParsedPage
+        
+        corpus = {}
+        for path in sorted(glob.glob(os.path.join('sample_data', 'html_corpus', '*.html'))):
+            with open(path, 'rb') as f:
+                corpus[f"/{os.path.basename(path)}"] = (200, {'Content-Type': 'text/html; charset=utf-8'}, f.read())
+        shells = {'/spa_shell.html': 'spa_root', '/next_shell.html': 'spa_root', '/thin_no_anchors.html': 'no_anchors'}
+        
+        class StubBrowserEnricher(LeadEnricher):
+            def _extract_with_playwright(self, domain):
+                rendered.append(domain)
+                if domain.endswith('/next_shell.html'):
+                    raise RuntimeError('browser crashed')
+                return {'domain': domain, 'title': 'Rendered', 'extraction_method': 'Playwright'}
+        
+        rendered, warnings = [], []
+        enricher = StubBrowserEnricher()
+        enricher.use_result_cache = enricher.use_response_cache = False
+        enricher.email_validator = get_email_validator(MODE_SYNTAX)
+        enricher.warn = warnings.append
+        
+        detected = {path: enricher._detect_js_shell(ParsedPage(body.decode('utf-8')))
+                    for path, (_, _, body) in corpus.items()}
+        with serve_pages(corpus) as base:
+            infos = {path: enricher.extract_company_info(f"{base}{path}", auto_escalate=True) for path in corpus}
+        
+        detect_ok = {path: reason for path, reason in detected.items() if reason} == shells
+        escalated_ok = (sorted(path[len(base):] for path in rendered) == sorted(shells) and
+                        infos['/spa_shell.html']['extraction_method'] == 'Playwright' and
+                        infos['/thin_no_anchors.html']['escalation_reason'] == 'no_anchors')
+        # A failed escalation keeps the static result and says so
+        fallback_ok = (infos['/next_shell.html']['extraction_method'] == 'BeautifulSoup' and
+                       'escalation_reason' not in infos['/next_shell.html'] and len(warnings) == 1)
+        static_ok = all(info['extraction_method'] == 'BeautifulSoup' and 'escalation_reason' not in info
+                        for path, info in infos.items() if path not in shells)
+        
+        if detect_ok and escalated_ok and fallback_ok and static_ok:
+            print(f"✅ {len(shells)} of {len(corpus)} pages escalated, methods reported as used")
+            return True
+        print(f"❌ Escalation differs: detect={detect_ok} escalated={escalated_ok} fallback={fallback_ok} "
+              f"static={static_ok} {detected}")
+        return False
+    except Exception as e:
+        print(f"❌ Auto escalation error: {str(e)}")
+        return False
+
+def test_keyword_matcher():
+    """Test one automaton pass matches per-keyword counting and honours word boundaries"""
+    print("\n🔤 Testing Keyword Matcher...")
+    
+    try:
+        import keyword_matcher
+        from keyword_matcher import KEYWORDS, KeywordMatcher
+        
+        text = "we maintain an ai platform for payments. pay by card, ai-driven checkout software."
+        counts = KEYWORDS.count(text)
+        expected = {term: text.count(term) for term in KEYWORDS.matcher.terms
+                    if term not in KEYWORDS.matcher.whole_words}
+        substring_ok = all(counts[term] == count for term, count in expected.items())
+        boundary_ok = counts['ai'] == 2 and counts['pay'] == 1
+        strict_ok = KeywordMatcher(['main'], word_boundary=True).count(text)['main'] == 0
+        
+        # Without pyahocorasick the per-keyword scan must count the same
+        available = keyword_matcher.AHOCORASICK_AVAILABLE
+        keyword_matcher.AHOCORASICK_AVAILABLE = False
+        try:
+            scanning = KeywordMatcher(KEYWORDS.matcher.terms, KEYWORDS.matcher.whole_words)
+        finally:
+            keyword_matcher.AHOCORASICK_AVAILABLE = available
+        strict_ok = strict_ok and scanning.count(text) == counts
+        
+        if substring_ok and boundary_ok and strict_ok:
+            print(f"✅ {len(KEYWORDS.matcher.terms)} keywords counted in one pass")
+            return True
+        print(f"❌ Keyword counts differ: substring={substring_ok} boundary={boundary_ok} strict={strict_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Keyword matcher error: {str(e)}")
+        return False
+
+def test_contact_scanner():
+    """Test one pass finds emails, phones and social profiles and stays linear on long tokens"""
+    print("\n📇 Testing Contact Scanner...")
+    
+    try:
+        import time
+        from contact_scanner import scan_links, scan_text
+        
+        scan = scan_text("Mail sales@acme.io or call (415) 555-0142 / +1-415-555-0199. "
+                         "Follow linkedin.com/company/acme and twitter.com/intent/tweet")
+        scan_links(['/about', 'https://uk.linkedin.com/in/someone', 'https://www.instagram.com/acme'], scan)
+        found_ok = (scan.emails == ['sales@acme.io'] and
+                    scan.phones == ['(415) 555-0142', '+1-415-555-0199'] and
+                    scan.social == {'linkedin': 'https://linkedin.com/company/acme',
+                                    'instagram': 'https://www.instagram.com/acme'})
+        
+        start = time.perf_counter()
+        scan_text('v1.a-' * 20000)
+        linear_ok = time.perf_counter() - start < 0.5
+        
+        if found_ok and linear_ok:
+            print("✅ Contacts found in a single pass")
+            return True
+        print(f"❌ Contact scan differs: found={found_ok} linear={linear_ok} {scan}")
+        return False
+    except Exception as e:
+        print(f"❌ Contact scanner error: {str(e)}")
+        return False
+
+def test_email_validation():
+    """Test syntax-only mode stays offline and each domain is looked up once per batch"""
+    print("\n📧 Testing Email Validation...")
+    
+    try:
+        from email_validation import MODE_DELIVERABILITY, MODE_SYNTAX, EmailValidator
+        
+        class RecordingValidator(EmailValidator):
+            lookups = []
+            
+            def _lookup(self, domain, domain_i18n):
+                self.lookups.append(domain)
+                return 'no MX' if domain == 'dead.io' else None
+        
+        emails = [f"person{i}@acme.io" for i in range(30)] + ['ops@dead.io', 'broken@', 'cto@zeta.dev']
+        offline = RecordingValidator(MODE_SYNTAX).valid(emails)
+        offline_ok = len(offline) == 32 and not RecordingValidator.lookups
+        
+        online = RecordingValidator(MODE_DELIVERABILITY)
+        first, second = online.valid(emails), online.valid(emails)
+        cached_ok = (first == second and len(first) == 31 and 'ops@dead.io' not in first and
+                     sorted(RecordingValidator.lookups) == ['acme.io', 'dead.io', 'zeta.dev'])
+        
+        if offline_ok and cached_ok:
+            print("✅ One MX lookup per domain, none offline")
+            return True
+        print(f"❌ Email validation differs: offline={offline_ok} cached={cached_ok} {RecordingValidator.lookups}")
+        return False
+    except Exception as e:
+        print(f"❌ Email validation error: {str(e)}")
+        return False
+
+def test_http_errors():
+    """Test error and rate-limit pages come back as errors and never reach the result cache"""
+    print("\n🚫 Testing HTTP Error Pages...")
+    
+    try:
+        import tempfile
+        from email_validation import MODE_SYNTAX, get_email_validator
+        from lead_enricher import LeadEnricher
+        from result_cache import EnrichmentResultCache
+        
+        html = {'Content-Type': 'text/html'}
+        error_page = b'<html><title>Error response</title><body>Error code 404. Developer API and SDK docs</body></html>'
+        pages = {'/missing': (404, html, error_page), '/busy': (429, html, b'<p>Too many requests</p>'),
+                 '/down': (503, html, b'<p>Service unavailable</p>'),
+                 '/ok': (200, html, b'<html><title>Acme</title><body>Developer API and SDK docs</body></html>')}
+        
+        with tempfile.TemporaryDirectory() as directory, serve_pages(pages) as base:
+            enricher = LeadEnricher()
+            enricher.use_response_cache = False
+            enricher.email_validator = get_email_validator(MODE_SYNTAX)
+            enricher.result_cache = EnrichmentResultCache('test', path=os.path.join(directory, 'results.sqlite3'))
+            infos = {path: enricher.extract_company_info(f"{base}{path}") for path in pages}
+            stored = enricher.result_cache.stats['stored']
+            enricher.result_cache.close()
+        
+        errors = sorted(path for path, info in infos.items() if 'error' in info)
+        if errors == ['/busy', '/down', '/missing'] and 'HTTP 404' in infos['/missing']['error'] and stored == 1:
+            print(f"✅ {len(errors)} error pages rejected, only the 200 page cached")
+            return True
+        print(f"❌ Error pages differ: errors={errors} stored={stored}")
+        return False
+    except Exception as e:
+        print(f"❌ HTTP error page error: {str(e)}")
+        return False
+
+def test_http_body_limits():
+    """Test the byte cap, the content-type gate and charset sniffing on streamed homepages"""
+    print("\n📦 Testing HTTP Body Limits...")
+    
+    try:
+        from http_client import HttpClient, UnsupportedContentTypeError, sniff_encoding
+        
+        latin = '<html><head><meta charset="iso-8859-1"><title>Café</title></head><body>Crème brûlée</body></html>'
+        pages = {'/big': (200, {'Content-Type': 'text/html'}, b'<p>' + b'x' * 500000 + b'</p>'),
+                 '/report.pdf': (200, {'Content-Type': 'application/pdf'}, b'%PDF-1.7' + b'0' * 500000),
+                 '/missing.json': (404, {'Content-Type': 'application/json'}, b'{"error": "not found"}'),
+                 '/latin': (200, {'Content-Type': 'text/html'}, latin.encode('iso-8859-1'))}
+        
+        client = HttpClient()
+        with serve_pages(pages) as base:
+            capped = client.fetch_page(f"{base}/big", max_bytes=64 * 1024)
+            rejected = []
+            for path in ('/report.pdf', '/missing.json'):
+                try:
+                    client.fetch_page(f"{base}{path}")
+                except UnsupportedContentTypeError as e:
+                    rejected.append(str(e))
+            sniffed = client.fetch_page(f"{base}/latin")
+        client.close()
+        
+        capped_ok = capped.truncated and capped.size == 64 * 1024
+        rejected_ok = len(rejected) == 2 and 'application/pdf' in rejected[0]
+        charset_ok = (sniffed.encoding == 'iso8859-1' and 'Crème brûlée' in sniffed.text and
+                      sniff_encoding('text/html; charset=utf-8', latin.encode('iso-8859-1')) == 'utf-8' and
+                      sniff_encoding('', b'\xef\xbb\xbf<p>hi</p>') == 'utf-8-sig' and
+                      sniff_encoding('text/html', b'<p>hi</p>') == 'utf-8')
+        
+        if capped_ok and rejected_ok and charset_ok:
+            print("✅ Bodies capped, non-HTML responses rejected, charsets sniffed")
+            return True
+        print(f"❌ Body limits differ: capped={capped_ok} rejected={rejected_ok} {rejected} charset={charset_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Body limits error: {str(e)}")
+        return False
+
+def test_response_cache():
+    """Test fresh hits, 304 revalidation, size eviction, offline mode and partial bodies in the response cache"""
+    print("\n🗄️ Testing Response Cache...")
+    
+    try:
+        import io
+        import sqlite3
+        import tempfile
+        import requests
+        from requests.adapters import BaseAdapter
+        from requests.structures import CaseInsensitiveDict
+        from http_client import FetchedPage, HttpClient
+        from response_cache import CacheMissError, ResponseCache
+        
+        class StubAdapter(BaseAdapter):
+            """Serves fixed pages and answers a matching If-None-Match with 304"""
+            def __init__(self, pages):
+                super().__init__()
+                self.pages = pages
+                self.sent = []
+            
+            def send(self, request, **kwargs):
+                self.sent.append(request)
+                status, headers, body = self.pages[request.url]
+                if headers.get('ETag') and request.headers.get('If-None-Match') == headers['ETag']:
+                    status, body = 304, b''
+                response = requests.Response()
+                response.status_code, response.url, response.request = status, request.url, request
+                response.headers = CaseInsensitiveDict(headers)
+                response.raw = io.BytesIO(body)
+                return response
+            
+            def close(self):
+                pass
+        
+        html = {'Content-Type': 'text/html'}
+        validators = {**html, 'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+        adapter = StubAdapter({'http://a.test/': (200, validators, b'a' * 400),
+                               'http://b.test/': (200, html, b'b' * 400), 'http://c.test/': (200, html, b'c' * 400),
+                               'http://big.test/': (200, html, b'x' * 5000)})
+        client = HttpClient()
+        client.session.mount('http://', adapter)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            # Fresh entries are served without a request; LRU entries go once the size cap is passed
+            cache = ResponseCache(os.path.join(directory, 'fresh.sqlite3'), ttl=60, max_bytes=1000)
+            first, second = cache.get(client, 'http://a.test/'), cache.get(client, 'http://a.test/')
+            hit_ok = len(adapter.sent) == 1 and second.from_cache and second.content == first.content
+            cache.get(client, 'http://b.test/')
+            cache.get(client, 'http://c.test/')
+            try:
+                cache.get(client, 'http://a.test/', offline=True)
+                evicted_ok = False
+            except CacheMissError:
+                evicted_ok = cache.stats['evicted'] == 1 and cache.get(client, 'http://c.test/').from_cache
+            cache.close()
+            
+            # Expired entries revalidate with their validators; offline mode serves them as they are
+            cache = ResponseCache(os.path.join(directory, 'stale.sqlite3'), ttl=0)
+            cache.get(client, 'http://a.test/')
+            sent = len(adapter.sent)
+            revalidated = cache.get(client, 'http://a.test/')
+            conditional = adapter.sent[-1].headers
+            revalidate_ok = (len(adapter.sent) == sent + 1 and cache.stats['revalidated'] == 1 and
+                             revalidated.content == b'a' * 400 and conditional.get('If-None-Match') == '"v1"' and
+                             'If-Modified-Since' in conditional)
+            offline_hit = cache.get(client, 'http://a.test/', offline=True)
+            try:
+                cache.get(client, 'http://never.test/', offline=True)
+                offline_ok = False
+            except CacheMissError:
+                offline_ok = offline_hit.from_cache and len(adapter.sent) == sent + 1
+            
+            # A body cut off at the byte cap is still partial when it comes back from the cache
+            cache.get(client, 'http://big.test/', max_bytes=1000)
+            cached = FetchedPage.from_response(cache.get(client, 'http://big.test/', offline=True))
+            truncated_ok = cached.truncated and cached.size == 1000
+            cache.close()
+            
+            # Caches from before the truncated flag are upgraded in place
+            path = os.path.join(directory, 'old.sqlite3')
+            conn = sqlite3.connect(path)
+            conn.execute('CREATE TABLE responses (url TEXT PRIMARY KEY, status INTEGER, final_url TEXT, headers TEXT, '
+                         'body BLOB, etag TEXT, last_modified TEXT, expires_at REAL, last_access REAL, size INTEGER)')
+            conn.execute("INSERT INTO responses VALUES ('http://a.test/', 200, 'http://a.test/', '{}', x'61', "
+                         "NULL, NULL, 0, 0, 1)")
+            conn.commit()
+            conn.close()
+            cache = ResponseCache(path)
+            upgraded = cache.get(client, 'http://a.test/', offline=True)
+            upgrade_ok = upgraded.content == b'a' and not upgraded.truncated
+            cache.close()
+        client.close()
+        
+        if hit_ok and evicted_ok and revalidate_ok and offline_ok and truncated_ok and upgrade_ok:
+            print("✅ Hits, 304 revalidation, eviction, offline mode and partial bodies behave")
+            return True
+        print(f"❌ Response cache differs: hit={hit_ok} evicted={evicted_ok} revalidate={revalidate_ok} "
+              f"offline={offline_ok} truncated={truncated_ok} upgrade={upgrade_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Response cache error: {str(e)}")
+        return False
+
+def test_streaming_pipeline():
+    """Test the pipeline streams every domain through without holding the input"""
+    print("\n🚰 Testing Streaming Pipeline...")
+    
+    try:
+        from enrichment_engine import EnrichmentEngine
+        from pipeline import LeadPipeline
+        
+        class StubEnricher:
+            def extract_company_info(self, domain, use_playwright=False, **options):
+                if domain.startswith('down'):
+                    return {'domain': domain, 'error': 'unreachable'}
+                return {'domain': domain, 'score': int(domain[4:].split('.')[0])}
+        
+        consumed = []
+        
+        def lines(count):
+            for i in range(count):
+                consumed.append(i)
+                yield f"https://{'down' if i % 10 == 0 else 'site'}{i}.com\n"
+        
+        engine = EnrichmentEngine(StubEnricher(), max_workers=4)
+        pipeline = LeadPipeline(engine, build_lead=lambda domain, info: info['score'],
+                                accept=lambda score: score % 2 == 0)
+        events = pipeline.run(lines(1000))
+        first = next(events)
+        lazy_ok = len(consumed) <= 2 * engine.max_workers + 1
+        rest = list(events)
+        
+        qualified = sorted(event.lead for event in [first] + rest if event.qualified)
+        errors = sum(1 for event in [first] + rest if not event.result.ok)
+        counts_ok = len(rest) + 1 == 1000 and errors == 100 and len(qualified) == 400
+        
+        if lazy_ok and counts_ok:
+            print("✅ 1000 domains streamed with a bounded window")
+            return True
+        print(f"❌ Pipeline differs: lazy={lazy_ok} counts={counts_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Pipeline error: {str(e)}")
+        return False
+
+def test_batch_cli():
+    """Test the headless CLI reads CSV and stdin and writes NDJSON leads"""
+    print("\n🖥️ Testing Batch CLI...")
+    
+    try:
+        import io
+        import json
+        from lead_cli import build_parser, read_domains, run
+        
+        class StubEnricher:
+            offline = True
+            
+            def extract_company_info(self, domain, use_playwright=False, **options):
+                if domain.startswith('down'):
+                    return {'domain': domain, 'error': 'unreachable'}
+                return {'domain': domain, 'title': domain, 'emails': [f"hello@{domain}"]}
+        
+        csv_domains = list(read_domains(['sample_data/sample_domains.csv']))
+        stdin_domains = list(read_domains(['-'], stdin=io.StringIO("up1.com\ndown1.com\nup2.com\n")))
+        
+        args = build_parser().parse_args(['--include-errors', '--require-email', '--progress-interval', '0'])
+        out, err = io.StringIO(), io.StringIO()
+        meter = run(args, StubEnricher(), stdin_domains, out, err)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        
+        read_ok = len(csv_domains) > 0 and 'domain' not in csv_domains and len(stdin_domains) == 3
+        output_ok = (len(records) == 3 and sum('error' in record for record in records) == 1 and
+                     meter.qualified == 2 and 'processed' in err.getvalue())
+        
+        if read_ok and output_ok:
+            print(f"✅ {len(csv_domains)} CSV domains read, {meter.qualified} leads written as NDJSON")
+            return True
+        print(f"❌ CLI differs: read={read_ok} output={output_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ CLI error: {str(e)}")
+        return False
+
+def test_run_journal():
+    """Test an interrupted run resumes with only its unfinished domains"""
+    print("\n📒 Testing Run Journal...")
+    
+    try:
+        import tempfile
+        from enrichment_engine import EnrichmentEngine
+        from pipeline import LeadPipeline
+        from run_journal import RunJournal, RUN_COMPLETED
+        
+        class StubEnricher:
+            def __init__(self):
+                self.seen = []
+            
+            def extract_company_info(self, domain, use_playwright=False, **options):
+                self.seen.append(domain)
+                if domain.startswith('down'):
+                    return {'domain': domain, 'error': 'unreachable'}
+                return {'domain': domain}
+        
+        with tempfile.TemporaryDirectory() as directory:
+            journal = RunJournal(os.path.join(directory, 'runs.sqlite3'), commit_every=5)
+            run_id = journal.start_run([f"{'down' if i % 4 == 0 else 'site'}{i}.com\n" for i in range(100)])
+            
+            enricher = StubEnricher()
+            pipeline = LeadPipeline(EnrichmentEngine(enricher, max_workers=2), build_lead=lambda domain, info: {'domain': domain})
+            for count, event in enumerate(pipeline.run(journal.pending(run_id)), 1):
+                journal.record(run_id, event)
+                if count == 60:
+                    break
+            journal.finish(run_id)
+            interrupted = journal.run(run_id)
+            
+            enricher.seen.clear()
+            for event in pipeline.run(journal.pending(run_id)):
+                journal.record(run_id, event)
+            journal.finish(run_id)
+            finished = journal.run(run_id)
+            journal.close()
+        
+        resume_ok = interrupted.resumable and len(enricher.seen) == interrupted.pending
+        counts_ok = finished.status == RUN_COMPLETED and finished.done == 75 and finished.failed == 25
+        
+        if resume_ok and counts_ok:
+            print(f"✅ Resumed {interrupted.pending} of {finished.total} domains after an interrupted run")
+            return True
+        print(f"❌ Journal differs: resume={resume_ok} counts={counts_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Journal error: {str(e)}")
+        return False
+
+def test_lead_table():
+    """Test the columnar lead table round-trips leads and merges categories"""
+    print("\n🗃️ Testing Lead Table...")
+    
+    try:
+        from lead_enricher import Lead
+        from lead_table import LeadTable
+        
+        leads = [Lead(f"Company {i}", f"c{i}.com", email=f"info@c{i}.com" if i % 2 else '',
+                      industry=['Finance', 'Healthcare', ''][i % 3], confidence_score=float(i))
+                 for i in range(300)]
+        table = LeadTable.from_leads(leads[:200])
+        for lead in leads[200:]:
+            table.append(lead, 'Playwright')
+        
+        other = LeadTable.from_records([{'company_name': 'Other Co', 'domain': 'other.com', 'industry': 'Retail',
+                                         'confidence_score': 99, 'extraction_method': 'BeautifulSoup'}])
+        merged = table.take(table.flag('has_email')).concat(other)
+        
+        round_trip_ok = list(table.leads()) == leads
+        columns_ok = (table.category_counts('industry') == {'Finance': 100, 'Healthcare': 100, '': 100} and
+                      table.category_counts('extraction_method') == {'': 200, 'Playwright': 100})
+        merge_ok = (len(merged) == 151 and merged.lead(150).industry == 'Retail' and
+                    merged.category_counts('industry')['Finance'] == 50)
+        
+        if round_trip_ok and columns_ok and merge_ok:
+            print(f"✅ {len(table)} leads stored column-wise, {merged.nbytes // 1024} KB after merge")
+            return True
+        print(f"❌ Table differs: round_trip={round_trip_ok} columns={columns_ok} merge={merge_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Lead table error: {str(e)}")
+        return False
+
+def test_scoring_engine():
+    """Test batch scoring matches single-lead scoring and follows the weight table"""
+    print("\n🧮 Testing Scoring Engine...")
+    
+    try:
+        from scoring_engine import SCORING
+        
+        infos = [
+            {'domain': 'stripe.com', 'emails': ['a@stripe.com'], 'phones': ['555-123-4567'],
+             'linkedin': 'https://linkedin.com/company/stripe', 'industry': 'Fintech',
+             'technology_stack': 'React, AWS', 'description': 'x' * 120},
+            {'domain': 'example.com', 'industry': 'Other'},
+            {'domain': 'acme.io', 'emails': ['a@acme.io', 'b@acme.io', 'c@acme.io', 'd@acme.io'],
+             'social_media': '{"linkedin": "l", "twitter": "t"}', 'industry': 'Healthcare',
+             'employee_count': 'Medium (100-1000 employees)', 'technology_stack': 'a,b,c,d,e,f'}
+        ]
+        batch = SCORING.features(infos)
+        
+        expected = {
+            'lead_generator': [100, 5, 40 + 10 + 5],
+            'enhanced': [8 + 15 + 4 + 20 + 5, 0, 25 + 10 + 10 + 15 + 7],
+            'demo': [10 + 20 + 15 + 15 + 10 + 10, 0, 30 + 15 + 10]
+        }
+        batch_ok = all(list(SCORING.score(batch, profile)) == scores for profile, scores in expected.items())
+        single_ok = all(SCORING.score_one(info, profile='enhanced') == score
+                        for info, score in zip(infos, expected['enhanced']))
+        
+        if batch_ok and single_ok:
+            print(f"✅ {len(infos)} leads scored under {len(SCORING.profiles)} weight profiles")
+            return True
+        print(f"❌ Scores differ: batch={batch_ok} single={single_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Scoring error: {str(e)}")
+        return False
+
+def test_lead_filtering():
+    """Test indexed column filtering agrees with the per-lead filter, including after new rows arrive"""
+    print("\n🔎 Testing Lead Filtering...")
+    
+    try:
+        from lead_enricher import Lead, LeadFilter
+        from lead_table import LeadTable
+        
+        def make_lead(i):
+            return Lead(f"Company {i}", f"c{i}.com", email='a@c.com' if i % 2 else '', phone='555' if i % 3 else '',
+                        industry=['Fintech', 'Healthcare', 'Other', ''][i % 4], confidence_score=float(i * 7 % 101))
+        
+        table = LeadTable.from_leads(make_lead(i) for i in range(500))
+        filters = [LeadFilter(), LeadFilter(50), LeadFilter(100), LeadFilter(30, ('Fintech', 'Retail')),
+                   LeadFilter(20, ('Healthcare', 'Other'), require_email=True, require_phone=True)]
+        
+        def agrees():
+            leads = list(table.leads())
+            return all(list(table.mask(f)) == [f(lead) for lead in leads] for f in filters)
+        
+        before_ok = agrees()
+        index = table.index()
+        table.append(make_lead(500))
+        after_ok = agrees() and table.index() is not index and len(table.index().above(100)) == 5
+        streamed = LeadTable.from_records_where(table.leads(), filters[-1], chunk_size=64)
+        after_ok = after_ok and list(streamed.text('domain')) == list(table.text('domain')[table.mask(filters[-1])])
+        
+        if before_ok and after_ok:
+            print(f"✅ {len(filters)} filters agree on {len(table)} leads")
+            return True
+        print(f"❌ Filtering differs: before={before_ok} after={after_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Filtering error: {str(e)}")
+        return False
+
+def test_lead_analytics():
+    """Test incremental aggregates match a full recount after leads are added and removed"""
+    print("\n📊 Testing Lead Analytics...")
+    
+    try:
+        from lead_analytics import LeadAggregates
+        from lead_enricher import Lead, LeadFilter
+        from lead_table import LeadTable
+        
+        leads = [Lead(f"Company {i}", f"c{i}.com", email='a@c.com' if i % 2 else '', phone='555' if i % 5 else '',
+                      industry=['Fintech', 'Healthcare', ''][i % 3], confidence_score=float(i % 101),
+                      technology_stack=['React, AWS', 'AWS', ''][i % 3]) for i in range(400)]
+        table = LeadTable.from_leads(leads)
+        
+        streamed = LeadAggregates()
+        for lead in leads:
+            streamed.add(lead)
+        for lead in leads[300:]:
+            streamed.remove(lead)
+        
+        loose, strict = table.mask(LeadFilter(20)), table.mask(LeadFilter(60, ('Fintech',), require_email=True))
+        narrowed = LeadAggregates.from_table(table, loose)
+        narrowed.remove_rows(table, loose & ~strict)
+        narrowed.add_rows(table, strict & ~loose)
+        
+        stream_ok = streamed.snapshot() == LeadAggregates.from_table(table, slice(0, 300)).snapshot()
+        filter_ok = narrowed.snapshot() == LeadAggregates.from_table(table, strict).snapshot()
+        top_ok = streamed.top_technologies(1) == [('AWS', 200)] and sum(streamed.score_histogram) == 300
+        
+        if stream_ok and filter_ok and top_ok:
+            print(f"✅ Aggregates kept in step: {streamed.format()}")
+            return True
+        print(f"❌ Aggregates differ: stream={stream_ok} filter={filter_ok} top={top_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Analytics error: {str(e)}")
+        return False
+
+def test_dns_outage():
+    """Test NXDOMAIN answers are only persisted as dead hosts while the resolver is known to work"""
+    print("\n🛰️ Testing DNS Outage Handling...")
+    
+    try:
+        import socket
+        import tempfile
+        import dns_preflight
+        from dns_preflight import DnsCache
+        
+        def resolver(working):
+            def getaddrinfo(host, port, type=0):
+                if working and host != 'gone.invalid':
+                    return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', port))]
+                raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+            return getaddrinfo
+        
+        original = dns_preflight.socket.getaddrinfo
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'dns.sqlite3')
+                dns_preflight.socket.getaddrinfo = resolver(False)
+                outage = DnsCache(path).resolve('gone.invalid')
+                dns_preflight.socket.getaddrinfo = resolver(True)
+                after_outage = DnsCache(path).dead_reason('gone.invalid')
+                dead = DnsCache(path).resolve('gone.invalid')
+                persisted = DnsCache(path).dead_reason('gone.invalid')
+        finally:
+            dns_preflight.socket.getaddrinfo = original
+        
+        outage_ok = outage == ([], None) and after_outage is None
+        dead_ok = dead[1] is not None and persisted == dead[1]
+        if outage_ok and dead_ok:
+            print("✅ Outage answers stay unpersisted; confirmed dead hosts are remembered")
+            return True
+        print(f"❌ DNS handling differs: outage={outage_ok} dead={dead_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ DNS error: {str(e)}")
+        return False
+
+def test_dns_address_fallback():
+    """Test pre-resolved connections move on to the next address when the first is unreachable"""
+    print("\n🔀 Testing DNS Address Fallback...")
+    
+    try:
+        import socket
+        import tempfile
+        import requests
+        import dns_preflight
+        from dns_preflight import DnsCache, PreResolvedAdapter
+        
+        def resolver(addresses):
+            def getaddrinfo(host, port, type=0):
+                return [(socket.AF_INET6 if ':' in address else socket.AF_INET, socket.SOCK_STREAM, 6, '',
+                         (address, port)) for address in addresses[host]]
+            return getaddrinfo
+        
+        # Nothing listens on IPv6 loopback, so the first address of multi.test refuses the connection
+        addresses = {'multi.test': ['::1', '127.0.0.1'], 'down.test': ['::1']}
+        with tempfile.TemporaryDirectory() as directory, serve_pages({'/': (200, {}, b'up')}) as base:
+            dns_cache = DnsCache(os.path.join(directory, 'dns.sqlite3'))
+            original = dns_preflight.socket.getaddrinfo
+            dns_preflight.socket.getaddrinfo = resolver(addresses)
+            try:
+                resolved = [dns_cache.resolve(host)[0] for host in addresses]
+            finally:
+                dns_preflight.socket.getaddrinfo = original
+            
+            session = requests.Session()
+            session.mount('http://', PreResolvedAdapter(dns_cache, max_retries=0))
+            port = base.rsplit(':', 1)[1]
+            body = session.get(f"http://multi.test:{port}/", timeout=5).text
+            try:
+                session.get(f"http://down.test:{port}/", timeout=5)
+                all_down_ok = False
+            except requests.ConnectionError:
+                all_down_ok = True
+            dns_cache.close()
+        
+        if resolved == list(addresses.values()) and body == 'up' and all_down_ok:
+            print("✅ Connected through the second address after the first refused; "
+                  "all-unreachable hosts still raise")
+            return True
+        print(f"❌ Fallback failed: resolved={resolved} body={body!r} all_down_raised={all_down_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ DNS fallback error: {str(e)}")
+        return False
+
+def test_analytics_tab():
+    """Test the Analytics tab renders aggregate charts alongside extraction stats from a run"""
+    print("\n📈 Testing Analytics Tab...")
+    
+    try:
+        from streamlit.testing.v1 import AppTest
+        from lead_analytics import LeadAggregates
+        from lead_enricher import Lead
+        from lead_table import LeadTable
+        
+        leads = LeadTable.from_leads(Lead(f"Company {i}", f"c{i}.com", email='a@c.com', industry='Fintech',
+                                          confidence_score=float(i * 10), technology_stack='React, AWS')
+                                     for i in range(10))
+        app = AppTest.from_file('lead_generator.py', default_timeout=60)
+        app.session_state['leads'] = leads
+        app.session_state['lead_stats'] = LeadAggregates.from_table(leads)
+        app.session_state['extraction_stats'] = {'playwright': 0, 'beautifulsoup': 10, 'errors': 1,
+                                                 'http_requests': 12, 'new_connections': 3}
+        app.run()
+        
+        labels = {metric.label: metric.value for metric in app.metric}
+        if not app.exception and labels.get('Total Leads') == '10' and labels.get('BeautifulSoup') == '10':
+            print("✅ Analytics tab rendered lead aggregates and extraction stats")
+            return True
+        print(f"❌ Analytics tab failed: {[e.value for e in app.exception]}")
+        return False
+    except Exception as e:
+        print(f"❌ Analytics tab error: {str(e)}")
+        return False
+
+def test_run_refilter():
+    """Test a run holds a compact projection plus qualified leads and re-filters with an indexed mask"""
+    print("\n🔁 Testing Run Re-filtering...")
+    
+    try:
+        import tempfile
+        import run_journal
+        from streamlit.testing.v1 import AppTest
+        from enrichment_engine import EnrichmentEngine
+        from lead_analytics import LeadAggregates
+        from lead_enricher import Lead, LeadFilter
+        from lead_table import LeadTable
+        from pipeline import LeadPipeline
+        
+        class StubEnricher:
+            def extract_company_info(self, domain, use_playwright=False, **options):
+                return {'domain': domain}
+        
+        def build(domain, info):
+            return Lead(f"Company {domain}", domain, email=f"hi@{domain}", description='About us ' * 50,
+                        confidence_score=float(int(domain[4:-4]) * 37 % 40) * 2.5)
+        
+        strict = LeadFilter(50)
+        original = run_journal._shared_journal
+        with tempfile.TemporaryDirectory() as directory:
+            # The app reads the shared journal; point it at a scratch file, not the user's run history
+            journal = run_journal._shared_journal = run_journal.RunJournal(os.path.join(directory, 'runs.sqlite3'))
+            try:
+                run_id = journal.start_run([f"site{i}.com" for i in range(40)])
+                pipeline = LeadPipeline(EnrichmentEngine(StubEnricher(), max_workers=2), accept=strict,
+                                        build_lead=build)
+                for event in pipeline.run(journal.pending(run_id)):
+                    journal.record(run_id, event)
+                journal.finish(run_id)
+                
+                projection = LeadTable.projection()
+                qualified = LeadTable.from_records_where(journal.results(run_id, qualified_only=False), strict,
+                                                         projection=projection)
+                mask = projection.mask(strict)
+                state = {'enriched_leads': projection, 'enriched_run': run_id, 'enriched_count': len(projection),
+                         'leads': qualified, 'leads_filter': strict, 'leads_mask': mask,
+                         'lead_stats': LeadAggregates.from_table(projection, mask)}
+                app = AppTest.from_file('lead_generator.py', default_timeout=60)
+                for key, value in state.items():
+                    app.session_state[key] = value
+                app.run()
+                full = LeadTable.from_records(journal.results(run_id, qualified_only=False))
+            finally:
+                run_journal._shared_journal = original
+                journal.close()
+        
+        # The sidebar starts with no filters: kept rows are reused, the other 20 read back in projection order
+        leads = app.session_state['leads']
+        held_ok = len(qualified) == 20 and projection.nbytes * 4 < full.nbytes
+        order_ok = (list(leads.text('company_name')) == [f"Company {domain}" for domain in projection.text('domain')]
+                    and list(leads.scores) == list(projection.scores) and leads.flag('has_email').all())
+        stats_ok = app.session_state['lead_stats'].count == 40 and app.session_state['enriched_leads'] is projection
+        if not app.exception and held_ok and order_ok and stats_ok:
+            print(f"✅ {len(qualified)} qualified leads held beside a {projection.nbytes // 1024} KB projection; "
+                  f"{len(leads)} after a filter change")
+            return True
+        print(f"❌ Re-filtering failed: held={held_ok} order={order_ok} stats={stats_ok} "
+              f"{[e.value for e in app.exception]}")
+        return False
+    except Exception as e:
+        print(f"❌ Re-filtering error: {str(e)}")
+        return False
+
+def test_browser_pool():
+    """Test the browser pool reuses browsers, recycles them after their page budget and closes cleanly"""
+    print("\n🧭 Testing Browser Pool...")
+    
+    try:
+        import browser_pool
+        from browser_pool import BrowserPool, get_browser_pool
+        
+        async def context_of(session):
+            return session.context
+        
+        fake = FakePlaywright()
+        pool = BrowserPool(browsers=1, max_pages_per_browser=2)
+        pool._ensure_started()
+        pool._pool._playwright = fake
+        available, browser_pool.PLAYWRIGHT_AVAILABLE = browser_pool.PLAYWRIGHT_AVAILABLE, True
+        try:
+            contexts = [pool.run(context_of, domain=f"d{i}.com", timeout=10) for i in range(5)]
+            stats = pool.stats
+            pool.close()
+        finally:
+            browser_pool.PLAYWRIGHT_AVAILABLE = available
+        
+        owners = [fake.browsers.index(context.browser) for context in contexts]
+        reuse_ok = owners == [0, 0, 1, 1, 2] and stats == {'browsers_launched': 3, 'pages_served': 5}
+        isolated_ok = len(set(map(id, contexts))) == 5 and all(context.closed for context in contexts)
+        close_ok = all(browser.closed for browser in fake.browsers) and fake.stopped and pool._thread is None
+        
+        # Pools are shared per option set, so one caller's launch args never leak into another's
+        web_args = browser_pool.DEFAULT_LAUNCH_ARGS + ['--disable-web-security']
+        plain = get_browser_pool()
+        insecure = get_browser_pool(launch_args=web_args)
+        keyed_ok = (plain is get_browser_pool() and insecure is get_browser_pool(launch_args=list(web_args))
+                    and plain is not insecure)
+        
+        if reuse_ok and isolated_ok and close_ok and keyed_ok:
+            print(f"✅ 5 pages over {stats['browsers_launched']} browsers with a 2-page budget; "
+                  f"contexts isolated, close() stops everything, pools keyed by options")
+            return True
+        print(f"❌ Pool mismatch: owners={owners} stats={stats} isolated={isolated_ok} "
+              f"closed={close_ok} keyed={keyed_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Browser pool error: {str(e)}")
+        return False
+
+def test_resource_blocking():
+    """Test pooled contexts abort heavy resources and trackers but never the page itself"""
+    print("\n🚫 Testing Resource Blocking...")
+    
+    try:
+        import asyncio
+        import browser_pool
+        from browser_pool import AsyncBrowserPool, ResourceBlockingPolicy
+        
+        requests_seen = [
+            (FakeRequest('document', 'https://doubleclick.net/', navigation=True), 'continue'),
+            (FakeRequest('document', 'https://doubleclick.net/ad', navigation=True, parent_frame=object()), 'abort'),
+            (FakeRequest('image', 'https://acme.com/logo.png'), 'abort'),
+            (FakeRequest('stylesheet', 'https://acme.com/site.css'), 'abort'),
+            (FakeRequest('script', 'https://www.google-analytics.com/analytics.js'), 'abort'),
+            (FakeRequest('script', 'https://acme.com/static/react.js'), 'continue'),
+            (FakeRequest('xhr', 'https://notgoogle-analytics.com/api'), 'continue'),
+        ]
+        
+        async def browse(policy):
+            pool = AsyncBrowserPool(blocking_policy=policy)
+            pool._playwright = FakePlaywright()
+            routes = [FakeRoute(request) for request, _ in requests_seen]
+            async with pool.session('acme.com') as session:
+                if session.context.handler is not None:
+                    for route in routes:
+                        await session.context.handler(route)
+            await pool.close()
+            return session, [route.outcome for route in routes]
+        
+        available, browser_pool.PLAYWRIGHT_AVAILABLE = browser_pool.PLAYWRIGHT_AVAILABLE, True
+        try:
+            session, outcomes = asyncio.run(browse(ResourceBlockingPolicy()))
+            disabled, disabled_outcomes = asyncio.run(browse(ResourceBlockingPolicy(enabled=False)))
+        finally:
+            browser_pool.PLAYWRIGHT_AVAILABLE = available
+        
+        expected = [outcome for _, outcome in requests_seen]
+        blocking_ok = outcomes == expected and session.blocked_requests == expected.count('abort')
+        counted_ok = session.blocked_by_type == {'document': 1, 'image': 1, 'stylesheet': 1, 'script': 1}
+        # Blocked scripts still count as evidence for technology detection
+        scripts_ok = session.script_urls == ['https://www.google-analytics.com/analytics.js',
+                                             'https://acme.com/static/react.js']
+        disabled_ok = disabled.context.handler is None and disabled_outcomes == [None] * len(requests_seen)
+        
+        if blocking_ok and counted_ok and scripts_ok and disabled_ok:
+            print(f"✅ {session.blocked_requests}/{len(requests_seen)} requests aborted, main document kept, "
+                  f"script URLs recorded, disabled policy installs no route")
+            return True
+        print(f"❌ Blocking mismatch: outcomes={outcomes} by_type={session.blocked_by_type} "
+              f"scripts={session.script_urls} disabled={disabled_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Resource blocking error: {str(e)}")
+        return False
+
+def test_page_readiness():
+    """Test each readiness strategy against a fake page, including SPA shells that only ship layout"""
+    print("\n⏱️ Testing Page Readiness...")
+    
+    try:
+        import asyncio
+        from page_readiness import goto_and_wait, wait_until_ready
+        
+        def ready(page, *args, **kwargs):
+            return asyncio.run(wait_until_ready(page, *args, **kwargs))
+        
+        shell = FakePage(elements={'footer', 'div#root'})
+        navigated = asyncio.run(goto_and_wait(shell, 'https://acme.com', navigation_timeout_ms=1234))
+        goto_ok = shell.calls[0] == ('goto', 'https://acme.com', 'domcontentloaded', 1234)
+        # A pre-hydration footer must not count as content, or the shell is extracted empty
+        shell_ok = navigated.reason == 'dom_quiet' and 'footer' not in shell.calls[1][1]
+        
+        signalled = ready(FakePage(elements={'a[href^="mailto:"]'}))
+        signal_ok = signalled.reason == 'signals' and signalled.as_dict()['readiness'] == 'adaptive'
+        
+        redirect = FakePage(redirects=True)
+        redirect_ok = (ready(redirect, max_wait_ms=900).reason == 'navigated' and
+                       redirect.calls[-1] == ('load_state', 'domcontentloaded', 900))
+        
+        busy = FakePage(network_idle=False)
+        idle_ok = (ready(FakePage(), 'networkidle').reason == 'networkidle' and
+                   ready(busy, 'networkidle', max_wait_ms=700).reason == 'timeout' and
+                   busy.calls == [('load_state', 'networkidle', 700)])
+        
+        sleeper = FakePage()
+        fixed_ok = ready(sleeper, 'fixed', fixed_wait_ms=250).reason == 'fixed' and sleeper.calls == [('sleep', 250)]
+        fallback_ok = ready(FakePage(), 'bogus').strategy == 'adaptive'
+        
+        if goto_ok and shell_ok and signal_ok and redirect_ok and idle_ok and fixed_ok and fallback_ok:
+            print("✅ SPA shell waits for quiet despite its footer; signals, redirects, networkidle "
+                  "and fixed waits behave")
+            return True
+        print(f"❌ Readiness mismatch: goto={goto_ok} shell={navigated.reason} signals={signal_ok} "
+              f"redirect={redirect_ok} networkidle={idle_ok} fixed={fixed_ok} fallback={fallback_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Page readiness error: {str(e)}")
+        return False
+
+def test_http_client_settings():
+    """Test changing pool settings resizes the one shared client and closes the pool it replaces"""
+    print("\n🔌 Testing HTTP Client Settings...")
+    
+    try:
+        from http_client import HTTP2_AVAILABLE, HttpClientConfig, get_http_client
+        
+        client = get_http_client(pool_maxsize=4)
+        with serve_pages({'/': (200, {}, b'ok')}) as base:
+            client.get(base, timeout=5)
+            old_adapter = client.session.get_adapter(base)
+            pooled_before = len(old_adapter.poolmanager.pools)
+            resized = get_http_client(pool_maxsize=8)
+            bare = get_http_client()
+            bare_size = bare.config.pool_maxsize
+            new_adapter = client.session.get_adapter(base)
+            toggled = get_http_client(pool_maxsize=8, http2=True)
+        get_http_client(HttpClientConfig())
+        
+        shared_ok = client is resized is bare is toggled
+        resized_ok = new_adapter is not old_adapter and new_adapter._pool_maxsize == 8 and bare_size == 8
+        closed_ok = pooled_before > 0 and len(old_adapter.poolmanager.pools) == 0
+        http2_ok = toggled.http2 == HTTP2_AVAILABLE
+        
+        if shared_ok and resized_ok and closed_ok and http2_ok:
+            print(f"✅ One client resized in place, replaced pool closed; HTTP/2 "
+                  f"{'on' if toggled.http2 else 'unavailable without httpx'}")
+            return True
+        print(f"❌ Client settings mismatch: shared={shared_ok} resized={resized_ok} closed={closed_ok} "
+              f"http2={http2_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ HTTP client error: {str(e)}")
+        return False
+
+def test_shared_resources():
+    """Test enrichers share process-wide clients and caches instead of building their own"""
+    print("\n♻️ Testing Shared Resources...")
+    
+    try:
+        import time
+        from lead_enricher import LeadEnricher
+        
+        first = LeadEnricher()
+        start_time = time.time()
+        second = LeadEnricher()
+        elapsed = time.time() - start_time
+        
+        shared = [name for name in ('http', 'browser_pool', 'response_cache', 'result_cache', 'email_validator')
+                  if getattr(first, name) is getattr(second, name)]
+        if len(shared) != 5:
+            print(f"❌ Only shared: {', '.join(shared)}")
+            return False
+        
+        # Single-domain enhanced calls go through the process-wide pool, one asyncio.run each
+        import asyncio
+        import enhanced_lead_generator
+        from browser_pool import BrowserPool
+        
+        class StubPool(BrowserPool):
+            domains = []
+            
+            def run(self, func, domain="", timeout=None):
+                self.domains.append(domain)
+                return {'domain': domain, 'title': domain.title()}
+        
+        stub = StubPool()
+        original = enhanced_lead_generator.get_browser_pool
+        enhanced_lead_generator.get_browser_pool = lambda: stub
+        try:
+            leads = [asyncio.run(enhanced_lead_generator.process_domain_enhanced(domain))
+                     for domain in ('a.com', 'b.com')]
+        finally:
+            enhanced_lead_generator.get_browser_pool = original
+        
+        if stub.domains != ['a.com', 'b.com'] or [lead.company_name for lead in leads] != ['A.Com', 'B.Com']:
+            print(f"❌ Enhanced calls did not reuse the shared pool: {stub.domains}")
+            return False
+        
+        print(f"✅ {len(shared)} resources shared; a new enricher takes {elapsed * 1000:.2f} ms; "
+              f"enhanced calls reuse one browser pool")
+        return True
+    except Exception as e:
+        print(f"❌ Resource error: {str(e)}")
+        return False
+
+def test_rescoring():
+    """Test stored feature vectors rescore leads under new weights without the original pages"""
+    print("\n🎚️ Testing Rescoring...")
+    
+    try:
+        from lead_enricher import LeadFilter, build_lead
+        from lead_table import LeadTable
+        from scoring_engine import SCORING
+        
+        infos = [{'emails': ['a@c.com'] * (i % 3), 'phones': ['555-123-4567'] if i % 2 else [],
+                  'industry': ['Fintech', 'Other', ''][i % 3], 'description': 'x' * (i * 10)} for i in range(30)]
+        leads = [build_lead(f"c{i}.com", info) for i, info in enumerate(infos)]
+        table = LeadTable.from_leads(leads)
+        table.append({'company_name': 'Legacy', 'domain': 'legacy.com', 'confidence_score': 42})
+        
+        rules = dict(SCORING.weights['lead_generator'], email={'feature': 'emails', 'per_unit': 30, 'cap': 60})
+        tuned = SCORING.with_profile('lead_generator', rules)
+        rescored = table.rescore(tuned)
+        
+        expected = list(tuned.score(tuned.features(infos, [lead.domain for lead in leads]))) + [42]
+        scores_ok = (list(rescored.scores) == expected and
+                     list(table.scores[:-1]) == [lead.confidence_score for lead in leads])
+        lead_filter = LeadFilter(50, require_phone=True)
+        mask_ok = list(rescored.mask(lead_filter)) == [lead_filter(lead) for lead in rescored.leads()]
+        
+        if scores_ok and mask_ok:
+            print(f"✅ {len(table)} leads rescored, {int(rescored.mask(lead_filter).sum())} qualify under new weights")
+            return True
+        print(f"❌ Rescoring differs: scores={scores_ok} mask={mask_ok}")
+        return False
+    except Exception as e:
+        print(f"❌ Rescoring error: {str(e)}")
+        return False
+
 def check_file_structure():
     """Check essential files"""
     print("\n📁 Checking Essential Files...")
@@ -94,7 +1336,33 @@ def main():
         ("Dependencies", test_dependencies),
         ("File Structure", check_file_structure),
         ("Main App", test_main_app),
-        ("Demo Script", test_demo_script)
+        ("Demo Script", test_demo_script),
+        ("Enrichment Engine", test_enrichment_engine),
+        ("Parser Parity", test_parser_parity),
+        ("Auto Escalation", test_auto_escalation),
+        ("Keyword Matcher", test_keyword_matcher),
+        ("Contact Scanner", test_contact_scanner),
+        ("Email Validation", test_email_validation),
+        ("HTTP Error Pages", test_http_errors),
+        ("HTTP Body Limits", test_http_body_limits),
+        ("Response Cache", test_response_cache),
+        ("Streaming Pipeline", test_streaming_pipeline),
+        ("Batch CLI", test_batch_cli),
+        ("Run Journal", test_run_journal),
+        ("Lead Table", test_lead_table),
+        ("Scoring Engine", test_scoring_engine),
+        ("Rescoring", test_rescoring),
+        ("Lead Filtering", test_lead_filtering),
+        ("Lead Analytics", test_lead_analytics),
+        ("Analytics Tab", test_analytics_tab),
+        ("Run Re-filtering", test_run_refilter),
+        ("DNS Outage", test_dns_outage),
+        ("DNS Address Fallback", test_dns_address_fallback),
+        ("Browser Pool", test_browser_pool),
+        ("Resource Blocking", test_resource_blocking),
+        ("Page Readiness", test_page_readiness),
+        ("HTTP Client Settings", test_http_client_settings),
+        ("Shared Resources", test_shared_resources)
     ]
     
     passed = 0